@@ -3,160 +3,259 @@ LangGraph to AI SDK Event Adapter
 
 This module converts LangGraph conversation events to AI SDK compatible format
 for streaming to the frontend. Based on the AI SDK Stream Protocol specification.
+
+Several conversations run at once, so every frame of a conversation event
+carries its conversation_id next to the type.
 """
 
 import json
-from typing import Dict, Any, AsyncGenerator
+from typing import Dict, Any, AsyncGenerator, Callable, Optional
 import asyncio
 import logging
 
+from events import TextDelta
+
 logger = logging.getLogger(__name__)
 
-class LangGraphToAISDKAdapter:
-    """Adapter to convert LangGraph conversation events to AI SDK stream format"""
+# Compact JSON encoder shared by every frame
+_encode_json = json.JSONEncoder(separators=(",", ":")).encode
 
-    def __init__(self):
-        self.active_participant = None
-        self.message_buffer = ""
-
-    async def convert_event(self, langgraph_event: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Convert LangGraph event to AI SDK compatible format
-
-        AI SDK Stream Protocol: https://ai-sdk.dev/docs/ai-sdk-ui/stream-protocol
-
-        Expected AI SDK event types:
-        - text-start: Start of text generation
-        - text-delta: Incremental text content
-        - text-done: End of text generation
-        - tool-call: Tool execution start
-        - tool-result: Tool execution result
-        - error: Error occurred
-        """
-        event_type = langgraph_event.get("type", "unknown")
-        event_data = langgraph_event.get("data", {})
-
-        if event_type == "conversation_start":
-            return {
-                "type": "conversation-start",
-                "data": {
-                    "topic": event_data.get("topic"),
-                    "participants": event_data.get("participants", [])
-                }
-            }
+class Frame:
+    """An encoded AI SDK event, built once per event and shared by every client queue
 
-        elif event_type == "conversation_status":
-            return {
-                "type": "conversation_status",
-                "data": {
-                    "active": event_data.get("active"),
-                    "paused": event_data.get("paused"),
-                    "participants": event_data.get("participants", []),
-                    "topic": event_data.get("topic"),
-                }
-            }
+    payload is the JSON text sent to SSE and JSON WebSocket clients; the msgpack
+    encoding for binary WebSocket clients is produced on first use from the
+    source message (never by decoding payload) and cached.
+    """
 
-        elif event_type == "speaker_scheduled":
-            self.active_participant = event_data.get("next_speaker")
-            return {
-                "type": "speaker-change",
-                "data": {
-                    "participant": self.active_participant,
-                    "turn": event_data.get("turn", 0)
-                }
-            }
+    __slots__ = ("type", "payload", "_message", "_packed")
 
-        elif event_type == "ai_thinking_start":
-            return {
-                "type": "thinking-start",
-                "data": {
-                    "participant": event_data.get("participant"),
-                    "model": event_data.get("model")
-                }
-            }
+    def __init__(self, event_type: str, payload: str, message: Optional[Dict[str, Any]] = None):
+        self.type = event_type
+        self.payload = payload
+        self._message = message
+        self._packed: Optional[bytes] = None
 
-        elif event_type == "ai_response_start":
-            self.message_buffer = ""
-            return {
-                "type": "text-start",
-                "data": {
-                    "participant": event_data.get("participant")
-                }
-            }
+    def message(self) -> Dict[str, Any]:
+        """The frame as a dict, as encoded in payload"""
+        return self._message
 
-        elif event_type == "ai_response_stream":
-            content_chunk = event_data.get("content", "")
-            self.message_buffer += content_chunk
-            return {
-                "type": "text-delta",
-                "data": {
-                    "textDelta": content_chunk,
-                    "participant": event_data.get("participant")
-                }
-            }
+    def packed(self) -> bytes:
+        if self._packed is None:
+            import ormsgpack  # only needed once a msgpack client connects
 
-        elif event_type == "ai_response_complete":
-            result = {
-                "type": "text-done",
-                "data": {
-                    "participant": event_data.get("participant"),
-                    "content": event_data.get("content"),
-                    "finishReason": "stop"
-                }
-            }
-            self.message_buffer = ""
-            return result
-
-        elif event_type == "human_message_added":
-            return {
-                "type": "user-message",
-                "data": {
-                    "content": event_data.get("content")
-                }
-            }
+            self._packed = ormsgpack.packb(self.message())
+        return self._packed
 
-        elif event_type == "turn_complete":
-            return {
-                "type": "turn-complete",
-                "data": {
-                    "turn": event_data.get("turn"),
-                    "totalMessages": event_data.get("total_messages")
-                }
-            }
 
-        elif event_type == "ai_response_error":
-            return {
-                "type": "error",
-                "data": {
-                    "error": event_data.get("error"),
-                    "participant": event_data.get("participant")
-                }
-            }
+class TextDeltaFrame(Frame):
+    """text-delta frame that keeps its fields rather than a message dict
 
-        elif event_type == "conversation_end":
-            return {
-                "type": "conversation-end",
-                "data": {
-                    "message": event_data.get("message"),
-                    "participants": event_data.get("participants", []),
-                    "topic": event_data.get("topic"),
-                }
-            }
+    Text deltas are the bulk of the stream; the dict is only built for msgpack clients.
+    """
 
+    __slots__ = ("content", "participant", "conversation_id")
+
+    def __init__(self, content: str, participant: Optional[str], conversation_id: Optional[str]):
+        attribution = "" if conversation_id is None else f'"conversation_id":{_encode_json(conversation_id)},'
+        super().__init__("text-delta", (
+            f'{{"type":"text-delta",{attribution}"data":{{"textDelta":{_encode_json(content)},'
+            f'"participant":{_encode_json(participant)}}}}}'
+        ))
+        self.content = content
+        self.participant = participant
+        self.conversation_id = conversation_id
+
+    def message(self) -> Dict[str, Any]:
+        message: Dict[str, Any] = {"type": "text-delta"}
+        if self.conversation_id is not None:
+            message["conversation_id"] = self.conversation_id
+        message["data"] = {"textDelta": self.content, "participant": self.participant}
+        return message
+
+def encode_frame(event_type: str, data: Dict[str, Any], conversation_id: Optional[str] = None) -> Frame:
+    """Encode an AI SDK event of the given type, attributed to its conversation if it has one"""
+    if conversation_id is None:
+        message = {"type": event_type, "data": data}
+    else:
+        message = {"type": event_type, "conversation_id": conversation_id, "data": data}
+    return Frame(event_type, _encode_json(message), message)
+
+class LangGraphToAISDKAdapter:
+    """Adapter to convert LangGraph conversation events to AI SDK stream format
+
+    AI SDK Stream Protocol: https://ai-sdk.dev/docs/ai-sdk-ui/stream-protocol
+
+    Expected AI SDK event types:
+    - text-start: Start of text generation
+    - text-delta: Incremental text content
+    - text-done: End of text generation
+    - tool-call: Tool execution start
+    - tool-result: Tool execution result
+    - error: Error occurred
+
+    Conversion goes through a per-type dispatch table built once; text-delta
+    frames are written straight from the TextDelta fields without any
+    intermediate dicts.
+    """
+
+    def __init__(self):
+        self.active_participant = None
+        self._encoders: Dict[str, Callable[[Any], Frame]] = {
+            "conversation_start": self._conversation_start,
+            "conversation_status": self._conversation_status,
+            "speaker_scheduled": self._speaker_scheduled,
+            "ai_thinking_start": self._thinking_start,
+            "ai_response_start": self._text_start,
+            "ai_response_stream": self._text_delta,
+            "ai_response_complete": self._text_done,
+            "human_message_added": self._user_message,
+            "turn_complete": self._turn_complete,
+            "ai_response_error": self._error,
+            "conversation_end": self._conversation_end,
+            "messages_committed": self._messages_committed,
+            "tool_call": self._tool_call,
+            "tool_output": self._tool_output,
+            "tool_result": self._tool_result,
+        }
+
+    def encode_event(self, langgraph_event: Any) -> Frame:
+        """Convert a LangGraph event (typed event or dict) into an encoded AI SDK frame"""
+        event_type = langgraph_event.get("type", "unknown")
+        encoder = self._encoders.get(event_type)
+        if encoder is None:
+            return self._generic(event_type, langgraph_event.get("data", {}), langgraph_event.get("conversation_id"))
+        return encoder(langgraph_event)
+
+    async def convert_event(self, langgraph_event: Any) -> Dict[str, Any]:
+        """Convert LangGraph event to an AI SDK compatible dict (off the hot path)"""
+        return json.loads(self.encode_event(langgraph_event).payload)
+
+    def _conversation_start(self, event) -> Frame:
+        event_data = event.get("data", {})
+        return encode_frame("conversation-start", {
+            "topic": event_data.get("topic"),
+            "participants": event_data.get("participants", [])
+        }, event.get("conversation_id"))
+
+    def _conversation_status(self, event) -> Frame:
+        event_data = event.get("data", {})
+        return encode_frame("conversation_status", {
+            "active": event_data.get("active"),
+            "paused": event_data.get("paused"),
+            "participants": event_data.get("participants", []),
+            "topic": event_data.get("topic"),
+        }, event.get("conversation_id"))
+
+    def _speaker_scheduled(self, event) -> Frame:
+        event_data = event.get("data", {})
+        self.active_participant = event_data.get("next_speaker")
+        return encode_frame("speaker-change", {
+            "participant": self.active_participant,
+            "turn": event_data.get("turn", 0)
+        }, event.get("conversation_id"))
+
+    def _thinking_start(self, event) -> Frame:
+        event_data = event.get("data", {})
+        return encode_frame("thinking-start", {
+            "participant": event_data.get("participant"),
+            "model": event_data.get("model")
+        }, event.get("conversation_id"))
+
+    def _text_start(self, event) -> Frame:
+        return encode_frame("text-start", {
+            "participant": event.get("data", {}).get("participant")
+        }, event.get("conversation_id"))
+
+    def _text_delta(self, event) -> Frame:
+        if isinstance(event, TextDelta):
+            content, participant, conversation_id = event.content, event.participant, event.conversation_id
         else:
-            # Generic conversation event
-            return {
-                "type": "conversation-event",
-                "data": {
-                    "eventType": event_type,
-                    "participant": event_data.get("participant"),
-                    "data": event_data
-                }
-            }
+            event_data = event.get("data", {})
+            content, participant = event_data.get("content", ""), event_data.get("participant")
+            conversation_id = event.get("conversation_id")
+        return TextDeltaFrame(content, participant, conversation_id)
+
+    def _text_done(self, event) -> Frame:
+        event_data = event.get("data", {})
+        return encode_frame("text-done", {
+            "participant": event_data.get("participant"),
+            "content": event_data.get("content"),
+            "finishReason": event_data.get("finish_reason", "stop")
+        }, event.get("conversation_id"))
+
+    def _user_message(self, event) -> Frame:
+        return encode_frame("user-message", {
+            "content": event.get("data", {}).get("content")
+        }, event.get("conversation_id"))
+
+    def _turn_complete(self, event) -> Frame:
+        event_data = event.get("data", {})
+        return encode_frame("turn-complete", {
+            "turn": event_data.get("turn"),
+            "totalMessages": event_data.get("total_messages")
+        }, event.get("conversation_id"))
+
+    def _error(self, event) -> Frame:
+        event_data = event.get("data", {})
+        return encode_frame("error", {
+            "error": event_data.get("error"),
+            "participant": event_data.get("participant")
+        }, event.get("conversation_id"))
+
+    def _conversation_end(self, event) -> Frame:
+        event_data = event.get("data", {})
+        return encode_frame("conversation-end", {
+            "message": event_data.get("message"),
+            "participants": event_data.get("participants", []),
+            "topic": event_data.get("topic"),
+        }, event.get("conversation_id"))
+
+    def _messages_committed(self, event) -> Frame:
+        # Sequence numbers only: clients stitch the live stream onto a /messages snapshot
+        event_data = event.get("data", {})
+        first_seq = event_data.get("first_seq", 0)
+        return encode_frame("messages-committed", {
+            "firstSeq": first_seq,
+            "lastSeq": first_seq + len(event_data.get("messages", [])) - 1
+        }, event.get("conversation_id"))
+
+    def _tool_call(self, event) -> Frame:
+        event_data = event.get("data", {})
+        return encode_frame("tool-call", {
+            "toolCallId": event_data.get("tool_call_id"),
+            "toolName": event_data.get("tool_name"),
+            "args": event_data.get("args", {}),
+            "participant": event_data.get("participant")
+        }, event.get("conversation_id"))
+
+    def _tool_output(self, event) -> Frame:
+        event_data = event.get("data", {})
+        return encode_frame("tool-output", {
+            "toolCallId": event_data.get("tool_call_id"),
+            "stream": event_data.get("stream"),
+            "text": event_data.get("text")
+        }, event.get("conversation_id"))
+
+    def _tool_result(self, event) -> Frame:
+        event_data = event.get("data", {})
+        return encode_frame("tool-result", {
+            "toolCallId": event_data.get("tool_call_id"),
+            "participant": event_data.get("participant"),
+            "result": {key: value for key, value in event_data.items() if key not in ("tool_call_id", "participant")}
+        }, event.get("conversation_id"))
+
+    def _generic(self, event_type: str, event_data: Dict[str, Any], conversation_id: Optional[str]) -> Frame:
+        # Generic conversation event
+        return encode_frame("conversation-event", {
+            "eventType": event_type,
+            "participant": event_data.get("participant"),
+            "data": event_data
+        }, conversation_id)
 
     def format_for_sse(self, ai_sdk_event: Dict[str, Any]) -> str:
         """Format AI SDK event for Server-Sent Events"""
-        return json.dumps(ai_sdk_event)
+        return _encode_json(ai_sdk_event)
 
 class ConversationEventStreamer:
     """Manages streaming of conversation events to SSE clients"""
@@ -164,28 +263,38 @@ class ConversationEventStreamer:
     def __init__(self):
         self.adapter = LangGraphToAISDKAdapter()
         self.clients = []
+        # Client queue -> the only conversation it receives events for (absent: all conversations)
+        self.scopes: Dict[asyncio.Queue, str] = {}
 
-    def add_client(self, queue: asyncio.Queue):
-        """Add SSE client queue"""
+    def add_client(self, queue: asyncio.Queue, conversation_id: Optional[str] = None):
+        """Add SSE client queue, optionally limited to one conversation's events"""
         self.clients.append(queue)
+        if conversation_id:
+            self.scopes[queue] = conversation_id
 
     def remove_client(self, queue: asyncio.Queue):
         """Remove SSE client queue"""
         if queue in self.clients:
             self.clients.remove(queue)
+        self.scopes.pop(queue, None)
 
-    async def handle_langgraph_event(self, langgraph_event: Dict[str, Any]):
+    async def handle_langgraph_event(self, langgraph_event: Any):
         """Convert and broadcast LangGraph event to all clients"""
         try:
-            # Convert to AI SDK format
-            ai_sdk_event = await self.adapter.convert_event(langgraph_event)
+            # Convert and encode once; every client receives the same frame
+            frame = self.adapter.encode_event(langgraph_event)
 
-            logger.info(f"Broadcasting event: {ai_sdk_event['type']}")
+            logger.debug("Broadcasting event: %s", frame.type)
+
+            conversation_id = langgraph_event.get("conversation_id")
 
             # Broadcast to all connected clients
             for client_queue in self.clients.copy():  # Copy to avoid modification during iteration
+                scope = self.scopes.get(client_queue)
+                if scope is not None and scope != conversation_id:
+                    continue
                 try:
-                    await client_queue.put(ai_sdk_event)
+                    await client_queue.put(frame)
                 except Exception as e:
                     logger.error(f"Error sending to client: {e}")
                     self.remove_client(client_queue)
@@ -193,19 +302,24 @@ class ConversationEventStreamer:
         except Exception as e:
             logger.error(f"Error handling LangGraph event: {e}")
 
+    async def close(self):
+        """Wake every client with the end-of-stream marker (None) on shutdown"""
+        for client_queue in self.clients.copy():
+            await client_queue.put(None)
+
     async def generate_sse_stream(self, client_queue: asyncio.Queue) -> AsyncGenerator[str, None]:
         """Generate SSE formatted stream for a client"""
+        # Only a stream scoped to one conversation ends with it; an unscoped one runs until shutdown
+        scoped = client_queue in self.scopes
         try:
             while True:
-                # Wait for event from conversation graph
-                ai_sdk_event = await client_queue.get()
-
-                # Format for SSE
-                sse_data = self.adapter.format_for_sse(ai_sdk_event)
-                yield sse_data
+                # Wait for event from conversation graph (already encoded)
+                frame = await client_queue.get()
+                if frame is None:
+                    break
+                yield frame.payload
 
-                # End stream if conversation ends
-                if ai_sdk_event.get("type") == "conversation-end":
+                if scoped and frame.type == "conversation-end":
                     break
 
         except asyncio.CancelledError:
@@ -0,0 +1,285 @@
+"""
+Admission Control and Load Shedding
+
+Keeps a burst of new work from degrading the conversations already running:
+- at most ADMISSION_MAX_CONVERSATIONS conversations (branches included) run
+  at once; further starts wait in a FIFO queue, and a freed slot is handed
+  straight to the oldest waiter, so later arrivals cannot overtake it
+- the queue is bounded (ADMISSION_MAX_QUEUE) and waits are bounded
+  (ADMISSION_QUEUE_TIMEOUT_SECONDS); a start that cannot be admitted gets 503
+  with Retry-After, its queue position and an estimated wait derived from how
+  long recent conversations held their slot
+- stream subscribers (SSE and WebSocket) are capped in total and per
+  conversation
+- event-loop lag is sampled continuously; while it exceeds
+  ADMISSION_SHED_LAG_MS new starts and new subscribers are shed, so the
+  loop's time goes to the conversations already admitted
+
+Each running conversation has at most one provider stream in flight (plus a
+hedge), so the conversation limit also bounds concurrent provider calls.
+
+Slots are released from the event stream: conversation_end (stopped),
+conversation_finished (ran to completion or failed, emitted by the executor)
+or conversation_spilled (parked on disk while paused). A spilled conversation
+whose run resumes on rehydration (conversation_rehydrated) takes its slot back
+without queueing, since it was already admitted; until enough conversations
+finish the limit can then be exceeded, and new starts queue meanwhile.
+
+Configuration (environment):
+- ADMISSION_MAX_CONVERSATIONS: concurrently running conversations (0 = unlimited)
+- ADMISSION_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT_SECONDS: start queue length and wait
+- ADMISSION_MAX_SUBSCRIBERS, ADMISSION_MAX_SUBSCRIBERS_PER_CONVERSATION: stream clients (0 = unlimited)
+- ADMISSION_SHED_LAG_MS: event-loop lag above which new work is shed (0 disables shedding)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# How often the event loop's lag is sampled
+LAG_SAMPLE_SECONDS = 0.1
+
+# Smoothing of the lag and slot-hold-time moving averages
+LAG_SMOOTHING = 0.3
+HOLD_SMOOTHING = 0.2
+
+# Assumed slot hold time before any conversation has finished
+DEFAULT_HOLD_SECONDS = 60.0
+
+# Events after which a conversation no longer needs its slot
+RELEASING_EVENTS = frozenset({"conversation_end", "conversation_finished", "conversation_spilled"})
+
+
+@dataclass(frozen=True, slots=True)
+class AdmissionConfig:
+    max_conversations: int = 50
+    max_queue: int = 100
+    queue_timeout_seconds: float = 30.0
+    max_subscribers: int = 500
+    max_subscribers_per_conversation: int = 50
+    shed_lag_seconds: float = 0.2
+
+    @classmethod
+    def from_env(cls) -> "AdmissionConfig":
+        return cls(
+            max_conversations=int(os.getenv("ADMISSION_MAX_CONVERSATIONS", "50")),
+            max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "100")),
+            queue_timeout_seconds=float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "30")),
+            max_subscribers=int(os.getenv("ADMISSION_MAX_SUBSCRIBERS", "500")),
+            max_subscribers_per_conversation=int(os.getenv("ADMISSION_MAX_SUBSCRIBERS_PER_CONVERSATION", "50")),
+            shed_lag_seconds=float(os.getenv("ADMISSION_SHED_LAG_MS", "200")) / 1000,
+        )
+
+
+class AdmissionRejected(Exception):
+    """Work refused for now; retry_after (seconds) is sent as the Retry-After header."""
+
+    def __init__(self, reason: str, retry_after: float, **details: Any) -> None:
+        super().__init__(f"Request rejected: {reason}")
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.details = details
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"reason": self.reason, "retry_after": self.retry_after, **self.details}
+
+
+class AdmissionController:
+    """Conversation slots with a fair wait queue, subscriber caps and lag-based shedding."""
+
+    def __init__(self, config: Optional[AdmissionConfig] = None) -> None:
+        self.config = config or admission_config
+        # conversation id -> monotonic time its slot was granted
+        self.running: Dict[str, float] = {}
+        self.waiters: Deque[asyncio.Future] = deque()
+        # Slots handed to waiters that have not resumed yet
+        self.reserved = 0
+        self.subscribers: Dict[Optional[str], int] = {}
+        self.lag = 0.0
+        self.hold_seconds = DEFAULT_HOLD_SECONDS
+        self.counters: Dict[str, int] = {"admitted": 0, "enqueued": 0, "rejected": 0, "shed": 0}
+        self._monitor_task: Optional[asyncio.Task] = None
+
+    @property
+    def shedding(self) -> bool:
+        return bool(self.config.shed_lag_seconds) and self.lag > self.config.shed_lag_seconds
+
+    def _has_slot(self) -> bool:
+        return not self.config.max_conversations or len(self.running) + self.reserved < self.config.max_conversations
+
+    def estimated_wait(self, position: int) -> float:
+        """Seconds until the waiter at 1-based position gets a slot, from recent slot hold times"""
+        slots = self.config.max_conversations or 1
+        return math.ceil(position / slots) * self.hold_seconds
+
+    def _reject(self, reason: str, retry_after: float, **details: Any) -> AdmissionRejected:
+        self.counters["shed" if reason == "overloaded" else "rejected"] += 1
+        logger.warning(f"Admission rejected ({reason}); retry after {retry_after:.1f}s")
+        return AdmissionRejected(reason, retry_after, **details)
+
+    async def admit(self, conversation_id: str, wait: bool = True) -> Dict[str, Any]:
+        """Reserve a slot for a new conversation, queueing for one if wait is set"""
+        if self.shedding:
+            raise self._reject("overloaded", LAG_SAMPLE_SECONDS * 10, lag_ms=round(self.lag * 1000, 1))
+
+        if self._has_slot() and not self.waiters:
+            self.running[conversation_id] = time.monotonic()
+            self.counters["admitted"] += 1
+            return {"queued": False, "position": 0, "waited": 0.0}
+
+        position = len(self.waiters) + 1
+        if not wait or len(self.waiters) >= self.config.max_queue:
+            raise self._reject(
+                "queue_full" if wait else "at_capacity",
+                self.estimated_wait(position),
+                position=position,
+                estimated_wait=round(self.estimated_wait(position), 1),
+            )
+
+        queued_at = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        self.counters["enqueued"] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.config.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            # The client went away while queued
+            self._abandon(waiter)
+            raise
+        if not waiter.done():
+            position = self._position(waiter)
+            self._abandon(waiter)
+            raise self._reject(
+                "queue_timeout",
+                self.estimated_wait(position),
+                position=position,
+                estimated_wait=round(self.estimated_wait(position), 1),
+            )
+
+        self.reserved -= 1
+        self.running[conversation_id] = time.monotonic()
+        self.counters["admitted"] += 1
+        return {"queued": True, "position": position, "waited": round(time.monotonic() - queued_at, 3)}
+
+    def _position(self, waiter: asyncio.Future) -> int:
+        try:
+            return self.waiters.index(waiter) + 1
+        except ValueError:
+            return 1
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        """Leave the queue; a slot already handed to this waiter goes to the next one"""
+        if waiter.done() and not waiter.cancelled():
+            self.reserved -= 1
+            self._grant_next()
+            return
+        waiter.cancel()
+        try:
+            self.waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _grant_next(self) -> None:
+        """Hand a free slot to the oldest waiter still in line"""
+        while self.waiters and self._has_slot():
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                # Reserved now, so another release cannot grant the same slot twice
+                self.reserved += 1
+                waiter.set_result(None)
+                return
+
+    def release(self, conversation_id: Optional[str]) -> None:
+        """Free a conversation's slot (idempotent)"""
+        granted_at = self.running.pop(conversation_id, None)
+        if granted_at is None:
+            return
+        held = time.monotonic() - granted_at
+        self.hold_seconds += HOLD_SMOOTHING * (held - self.hold_seconds)
+        self._grant_next()
+
+    def readmit(self, conversation_id: Optional[str]) -> None:
+        """Give a rehydrated conversation its slot back, over the limit if need be (idempotent)"""
+        if conversation_id is not None and conversation_id not in self.running:
+            self.running[conversation_id] = time.monotonic()
+
+    async def handle_event(self, event: Mapping[str, Any]) -> None:
+        event_type = event.get("type")
+        if event_type in RELEASING_EVENTS:
+            self.release(event.get("conversation_id"))
+        elif event_type == "conversation_rehydrated" and event.get("data", {}).get("resumed"):
+            self.readmit(event.get("conversation_id"))
+
+    def open_subscriber(self, conversation_id: Optional[str] = None) -> None:
+        """Count a new stream client, or raise AdmissionRejected if a cap is reached or the loop is overloaded"""
+        if self.shedding:
+            raise self._reject("overloaded", LAG_SAMPLE_SECONDS * 10, lag_ms=round(self.lag * 1000, 1))
+        total = sum(self.subscribers.values())
+        if self.config.max_subscribers and total >= self.config.max_subscribers:
+            raise self._reject("too_many_subscribers", 5)
+        per_conversation = self.config.max_subscribers_per_conversation
+        if conversation_id and per_conversation and self.subscribers.get(conversation_id, 0) >= per_conversation:
+            raise self._reject("too_many_conversation_subscribers", 5, conversation_id=conversation_id)
+        self.subscribers[conversation_id] = self.subscribers.get(conversation_id, 0) + 1
+
+    def close_subscriber(self, conversation_id: Optional[str] = None) -> None:
+        remaining = self.subscribers.get(conversation_id, 0) - 1
+        if remaining > 0:
+            self.subscribers[conversation_id] = remaining
+        else:
+            self.subscribers.pop(conversation_id, None)
+
+    def start(self) -> Optional[asyncio.Task]:
+        """Start sampling event-loop lag (needed for shedding)"""
+        if self.config.shed_lag_seconds and self._monitor_task is None:
+            self._monitor_task = asyncio.create_task(self._monitor_lag())
+        return self._monitor_task
+
+    async def _monitor_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + LAG_SAMPLE_SECONDS
+            await asyncio.sleep(LAG_SAMPLE_SECONDS)
+            # How late the loop got round to waking us: time other callbacks held it
+            lag = max(0.0, loop.time() - expected)
+            self.lag += LAG_SMOOTHING * (lag - self.lag)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": len(self.running),
+            "max_conversations": self.config.max_conversations,
+            "queued": len(self.waiters),
+            "estimated_wait": round(self.estimated_wait(len(self.waiters) + 1), 1) if self.waiters else 0.0,
+            "subscribers": sum(self.subscribers.values()),
+            "conversation_subscribers": {
+                conversation_id: count for conversation_id, count in self.subscribers.items() if conversation_id
+            },
+            "lag_ms": round(self.lag * 1000, 1),
+            "shedding": self.shedding,
+            "mean_hold_seconds": round(self.hold_seconds, 1),
+            **self.counters,
+        }
+
+    async def close(self) -> None:
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            await asyncio.gather(self._monitor_task, return_exceptions=True)
+            self._monitor_task = None
+        for waiter in self.waiters:
+            waiter.cancel()
+        self.waiters.clear()
+
+
+admission_config = AdmissionConfig.from_env()
+admission_controller = AdmissionController(admission_config)
@@ -0,0 +1,331 @@
+"""
+Conversation Analytics
+
+Live analytics are updated incrementally from the event stream (O(1) work per
+event) so status endpoints never recompute from message history:
+- turns and approximate tokens per speaker
+- mention graph (who addresses whom)
+- response latency distributions (time to first token, full response time)
+- participation balance, derived on read from the per-speaker turn counts
+  over the conversation's participant list (so silent participants count)
+- topic drift, from the per-response scores the graph streams (topic_drift.py)
+
+Ended conversations keep their analytics for late readers, but only the
+ANALYTICS_RETAIN_ENDED most recently ended ones.
+
+batch_report() is the offline counterpart: a vectorized NumPy pass over stored
+transcripts for cross-conversation reports.
+
+Usage:
+    python analytics.py ../data/transcripts/*.json ../data/transcripts/batch/*.jsonl
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import sys
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional
+
+import numpy as np
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 30.0, 60.0)
+
+# Rough characters-per-token ratio used for live token estimates
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(content: str) -> int:
+    return math.ceil(len(content) / CHARS_PER_TOKEN)
+
+
+# Events after which a conversation's analytics stop changing (apart from a stopped response's tail)
+ENDING_EVENTS = frozenset({"conversation_end", "conversation_finished"})
+
+
+def participation_balance(turn_counts: Iterable[int], participants: Optional[int] = None) -> float:
+    """Normalized entropy of turn shares: 1.0 is perfectly balanced, 0.0 is one speaker.
+
+    Normalised over `participants` (at least the number of counts), so a
+    participant who has not spoken yet lowers the balance; with several
+    participants and every turn taken by one of them the balance is 0.0.
+    """
+    counts = np.asarray(list(turn_counts), dtype=float)
+    participant_count = max(participants or 0, counts.size)
+    if participant_count < 2 or counts.sum() == 0:
+        return 1.0
+    shares = counts / counts.sum()
+    nonzero = shares[shares > 0]
+    return float(-(nonzero * np.log(nonzero)).sum() / np.log(participant_count))
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency distribution with constant-time updates."""
+
+    __slots__ = ("buckets", "count", "total", "minimum", "maximum")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.minimum = min(self.minimum, seconds)
+        self.maximum = max(self.maximum, seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket containing the requested percentile."""
+        if not self.count:
+            return None
+        threshold = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= threshold:
+                return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.maximum
+        return self.maximum
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4) if self.count else None,
+            "min": round(self.minimum, 4) if self.count else None,
+            "max": round(self.maximum, 4) if self.count else None,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+        }
+
+
+class ConversationAnalytics:
+    """Running aggregates for one conversation."""
+
+    def __init__(self) -> None:
+        self.turns_per_speaker: Counter = Counter()
+        self.tokens_per_speaker: Counter = Counter()
+        self.mentions: Counter = Counter()
+        self.human_messages = 0
+        self.time_to_first_token = LatencyHistogram()
+        self.response_time = LatencyHistogram()
+        self._response_started_at: Optional[float] = None
+        self._first_token_seen = False
+        self.latest_drift: Optional[Mapping[str, Any]] = None
+        self.drift_per_speaker: Counter = Counter()
+        self.scored_turns_per_speaker: Counter = Counter()
+        self.participants: List[str] = []
+
+    def on_participants(self, event: Mapping[str, Any]) -> None:
+        self.participants = list(event["data"].get("participants") or [])
+
+    def on_response_start(self, event: Mapping[str, Any]) -> None:
+        self._response_started_at = event.get("timestamp")
+        self._first_token_seen = False
+
+    def on_response_stream(self, event: Mapping[str, Any]) -> None:
+        if self._first_token_seen or self._response_started_at is None:
+            return
+        self._first_token_seen = True
+        self.time_to_first_token.record(event["timestamp"] - self._response_started_at)
+
+    def on_response_complete(self, event: Mapping[str, Any]) -> None:
+        data = event["data"]
+        speaker = data.get("participant")
+        self.turns_per_speaker[speaker] += 1
+        self.tokens_per_speaker[speaker] += estimate_tokens(data.get("content") or "")
+        if self._response_started_at is not None and event.get("timestamp") is not None:
+            self.response_time.record(event["timestamp"] - self._response_started_at)
+        self._response_started_at = None
+
+    def on_next_speaker(self, event: Mapping[str, Any]) -> None:
+        data = event["data"]
+        self.mentions[(data.get("participant"), data.get("next_speaker"))] += 1
+
+    def on_human_message(self, event: Mapping[str, Any]) -> None:
+        self.human_messages += 1
+
+    def on_topic_drift(self, event: Mapping[str, Any]) -> None:
+        data = event["data"]
+        self.latest_drift = data
+        if data.get("drift") is not None:
+            self.drift_per_speaker[data.get("participant")] += data["drift"]
+            self.scored_turns_per_speaker[data.get("participant")] += 1
+
+    def _drift_snapshot(self) -> Optional[Dict[str, Any]]:
+        if self.latest_drift is None:
+            return None
+        return {
+            "centroid_drift": self.latest_drift.get("centroid_drift"),
+            "latest_drift": self.latest_drift.get("drift"),
+            "off_topic": self.latest_drift.get("off_topic", False),
+            "mean_drift_per_speaker": {
+                speaker: round(total / self.scored_turns_per_speaker[speaker], 4)
+                for speaker, total in self.drift_per_speaker.items()
+            },
+        }
+
+    def balance(self) -> float:
+        # Current participants (silent ones included) plus anyone who spoke before leaving
+        speakers = dict.fromkeys([*self.participants, *self.turns_per_speaker])
+        return participation_balance([self.turns_per_speaker[speaker] for speaker in speakers])
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "turns_per_speaker": dict(self.turns_per_speaker),
+            "tokens_per_speaker": dict(self.tokens_per_speaker),
+            "participation_balance": round(self.balance(), 4),
+            "mention_graph": [
+                {"from": source, "to": target, "count": count}
+                for (source, target), count in self.mentions.items()
+            ],
+            "human_messages": self.human_messages,
+            "topic_drift": self._drift_snapshot(),
+            "time_to_first_token": self.time_to_first_token.snapshot(),
+            "response_time": self.response_time.snapshot(),
+        }
+
+
+# Event type -> ConversationAnalytics handler; every other event type costs one dict miss
+EVENT_HANDLERS: Dict[str, Callable[[ConversationAnalytics, Mapping[str, Any]], None]] = {
+    "conversation_start": ConversationAnalytics.on_participants,
+    "participants_changed": ConversationAnalytics.on_participants,
+    "ai_response_start": ConversationAnalytics.on_response_start,
+    "ai_response_stream": ConversationAnalytics.on_response_stream,
+    "ai_response_complete": ConversationAnalytics.on_response_complete,
+    "next_speaker_detected": ConversationAnalytics.on_next_speaker,
+    "human_message_added": ConversationAnalytics.on_human_message,
+    "topic_drift": ConversationAnalytics.on_topic_drift,
+}
+
+
+class LiveAnalytics:
+    """Per-conversation analytics fed from the conversation event stream."""
+
+    def __init__(self, retain_ended: Optional[int] = None) -> None:
+        self.conversations: Dict[str, ConversationAnalytics] = {}
+        self.retain_ended = int(os.getenv("ANALYTICS_RETAIN_ENDED", "100")) if retain_ended is None else retain_ended
+        # Ended conversations still held, least recently ended first
+        self.ended: OrderedDict[str, None] = OrderedDict()
+
+    async def handle_event(self, event: Mapping[str, Any]) -> None:
+        event_type = event.get("type")
+        if event_type in ENDING_EVENTS:
+            self.end(event.get("conversation_id"))
+            return
+        handler = EVENT_HANDLERS.get(event_type)
+        if handler is None:
+            return
+        conversation_id = event.get("conversation_id")
+        analytics = self.conversations.get(conversation_id)
+        if analytics is None:
+            analytics = self.conversations[conversation_id] = ConversationAnalytics()
+        handler(analytics, event)
+
+    def snapshot(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        analytics = self.conversations.get(conversation_id)
+        return analytics.snapshot() if analytics else None
+
+    def end(self, conversation_id: str) -> None:
+        """Mark a conversation ended, discarding the oldest ended ones beyond retain_ended"""
+        if conversation_id not in self.conversations:
+            return
+        self.ended[conversation_id] = None
+        self.ended.move_to_end(conversation_id)
+        while len(self.ended) > self.retain_ended:
+            self.discard(next(iter(self.ended)))
+
+    def discard(self, conversation_id: str) -> None:
+        self.conversations.pop(conversation_id, None)
+        self.ended.pop(conversation_id, None)
+
+
+def _iter_transcripts(paths: Iterable[Path]) -> Iterator[Mapping[str, Any]]:
+    for path in paths:
+        if path.suffix == ".jsonl":
+            with path.open("r", encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+        else:
+            yield json.loads(path.read_text())
+
+
+def batch_report(paths: Iterable[Path]) -> Dict[str, Any]:
+    """Cross-conversation report over stored transcripts (JSON or batch JSONL)."""
+    speaker_ids: Dict[str, int] = {}
+    conversation_index: List[int] = []
+    speaker_index: List[int] = []
+    message_lengths: List[int] = []
+    participant_counts: List[int] = []
+    conversations = 0
+
+    for transcript in _iter_transcripts(paths):
+        for message in transcript.get("messages", []):
+            speaker = (message.get("metadata") or {}).get("participant")
+            # AI turns only: human messages and tool output (participant "Sandbox") are not speakers
+            if not speaker or message.get("role") != "ai":
+                continue
+            conversation_index.append(conversations)
+            speaker_index.append(speaker_ids.setdefault(speaker, len(speaker_ids)))
+            message_lengths.append(len(message.get("content") or ""))
+        participant_counts.append(len(transcript.get("participants") or ()))
+        conversations += 1
+
+    if not speaker_index:
+        return {"conversations": conversations, "messages": 0, "speakers": {}}
+
+    conversation_array = np.asarray(conversation_index)
+    speaker_array = np.asarray(speaker_index)
+    length_array = np.asarray(message_lengths, dtype=float)
+    speaker_count = len(speaker_ids)
+
+    turns = np.bincount(speaker_array, minlength=speaker_count)
+    characters = np.bincount(speaker_array, weights=length_array, minlength=speaker_count)
+
+    # conversations x speakers turn matrix -> normalized entropy per conversation
+    matrix = np.zeros((conversations, speaker_count))
+    np.add.at(matrix, (conversation_array, speaker_array), 1)
+    # Normalised over the transcript's participant list, or the speakers seen if it has none
+    present = np.maximum((matrix > 0).sum(axis=1), np.asarray(participant_counts))
+    totals = matrix.sum(axis=1, keepdims=True)
+    shares = np.divide(matrix, totals, out=np.zeros_like(matrix), where=totals > 0)
+    entropy = -(shares * np.log(shares, out=np.zeros_like(shares), where=shares > 0)).sum(axis=1)
+    balanced = present > 1
+    balance = np.ones(conversations)
+    balance[balanced] = entropy[balanced] / np.log(present[balanced])
+    balance_values = balance[totals[:, 0] > 0]
+
+    return {
+        "conversations": conversations,
+        "messages": int(speaker_array.size),
+        "speakers": {
+            name: {
+                "turns": int(turns[index]),
+                "mean_characters": round(float(characters[index] / turns[index]), 1),
+                "approx_tokens": int(np.ceil(characters[index] / CHARS_PER_TOKEN)),
+            }
+            for name, index in speaker_ids.items()
+        },
+        "participation_balance": {
+            "mean": round(float(balance_values.mean()), 4),
+            "p10": round(float(np.percentile(balance_values, 10)), 4),
+            "min": round(float(balance_values.min()), 4),
+        },
+    }
+
+
+live_analytics = LiveAnalytics()
+
+
+if __name__ == "__main__":
+    print(json.dumps(batch_report(Path(arg) for arg in sys.argv[1:]), indent=2))
@@ -0,0 +1,192 @@
+"""
+Headless Batch Conversation Runner
+
+Drives ConversationGraph directly (no FastAPI, no SSE) for offline evaluation
+sweeps over topics x participant lineups:
+- bounded concurrency via an asyncio semaphore
+- one JSONL record per finished conversation, written through TranscriptStore
+- progress reporting as conversations complete
+- resume-after-crash: jobs already recorded as "ok" in the output are skipped
+- a job is "ok" only if its transcript has a completed AI turn and no failed
+  one; the graph turns provider failures (cache misses in replay mode
+  included) into placeholder messages, so returning is not enough
+
+Usage:
+    python batch_runner.py --topics topics.txt --lineup Alice,Bob,Charlie \\
+        --lineup Bob,Charlie --concurrency 16 --max-turns 6 --output batch/sweep.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+# Load environment variables before the modules below read their configuration
+load_dotenv()
+
+from langchain_core.messages import BaseMessage
+
+from conversation_graph import DEFAULT_MAX_TURNS, ConversationGraph
+from storage import TranscriptStore, transcript_store
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class BatchJob:
+    """One conversation of a sweep."""
+
+    topic: str
+    participants: Tuple[str, ...]
+
+    @property
+    def job_id(self) -> str:
+        key = f"{self.topic}\x1f{','.join(self.participants)}"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def build_jobs(topics: Iterable[str], lineups: Iterable[Sequence[str]]) -> List[BatchJob]:
+    """Cross product of topics and participant lineups."""
+    lineups = [tuple(lineup) for lineup in lineups]
+    return [BatchJob(topic, lineup) for topic in topics for lineup in lineups]
+
+
+def completed_job_ids(output: str | Path, store: TranscriptStore = transcript_store) -> set[str]:
+    """Jobs that already finished successfully in a previous (possibly crashed) run."""
+    return {
+        record["job_id"]
+        for record in store.iter_jsonl(output)
+        if record.get("status") == "ok" and "job_id" in record
+    }
+
+
+# Finish reasons of AI turns that ran to their end
+COMPLETED_FINISH_REASONS = frozenset({"stop", "length"})
+
+
+def transcript_error(messages: Sequence[BaseMessage], turn_errors: Sequence[str]) -> Optional[str]:
+    """Why a finished conversation does not count as a successful job, or None"""
+    turns = [message for message in messages if message.type == "ai"]
+    failed = [message for message in turns if message.additional_kwargs.get("error")]
+    if failed or turn_errors:
+        detail = f": {turn_errors[0]}" if turn_errors else ""
+        return f"{max(len(failed), len(turn_errors))} of {len(turns)} AI turns failed{detail}"
+    if not any(message.additional_kwargs.get("finish_reason") in COMPLETED_FINISH_REASONS for message in turns):
+        return "No AI turn completed"
+    return None
+
+
+async def run_job(job: BatchJob, max_turns: int, store: TranscriptStore) -> dict:
+    """Run one conversation to completion and serialise the result."""
+    graph = ConversationGraph(max_turns=max_turns)
+    turn_errors: List[str] = []
+
+    async def record_turn_error(event: Mapping[str, Any]) -> None:
+        turn_errors.append(f"{event['data'].get('participant')}: {event['data'].get('error')}")
+
+    graph.add_event_callback(record_turn_error, ["ai_response_error"])
+    started = time.monotonic()
+    try:
+        await graph.start_conversation(job.topic, list(job.participants))
+        error = transcript_error((graph.current_state or {}).get("messages", []), turn_errors)
+    except Exception as e:
+        error = str(e)
+    status = "error" if error else "ok"
+    if error:
+        logger.error(f"Batch job {job.job_id} failed: {error}")
+
+    state = graph.current_state or {}
+    return {
+        "job_id": job.job_id,
+        "status": status,
+        "error": error,
+        "topic": job.topic,
+        "participants": list(job.participants),
+        "turns": state.get("turn_count", 0),
+        "duration_seconds": round(time.monotonic() - started, 3),
+        "messages": store.serialise_messages(state.get("messages", [])),
+    }
+
+
+async def run_batch(
+    jobs: Sequence[BatchJob],
+    output: str | Path,
+    concurrency: int = 8,
+    max_turns: int = DEFAULT_MAX_TURNS,
+    resume: bool = True,
+    store: TranscriptStore = transcript_store,
+    on_progress: Optional[Callable[[int, int, dict], None]] = None,
+) -> dict:
+    """Run jobs concurrently under a semaphore, appending each result to the JSONL output."""
+    skipped = completed_job_ids(output, store) if resume else set()
+    pending = [job for job in jobs if job.job_id not in skipped]
+    total = len(pending)
+    semaphore = asyncio.Semaphore(concurrency)
+    summary = {"total": len(jobs), "skipped": len(jobs) - total, "ok": 0, "error": 0}
+    done = 0
+
+    logger.info(f"Batch: {total} conversations to run, {summary['skipped']} already complete")
+
+    async def run_bounded(job: BatchJob) -> None:
+        nonlocal done
+        async with semaphore:
+            record = await run_job(job, max_turns, store)
+        # Written as soon as a job finishes so a crash loses at most the in-flight jobs
+        store.append_jsonl(output, record)
+        done += 1
+        summary[record["status"]] += 1
+        if on_progress:
+            on_progress(done, total, record)
+        else:
+            logger.info(
+                f"[{done}/{total}] {record['status']} {job.job_id} "
+                f"({record['turns']} turns, {record['duration_seconds']}s) {job.topic!r}"
+            )
+
+    await asyncio.gather(*(run_bounded(job) for job in pending))
+    return summary
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run conversations headlessly for offline evaluation")
+    parser.add_argument("--topics", required=True, type=Path, help="Text file with one topic per line")
+    parser.add_argument(
+        "--lineup",
+        action="append",
+        required=True,
+        help="Comma-separated participants; repeat for several lineups",
+    )
+    parser.add_argument("--output", default="batch/results.jsonl", help="JSONL output (relative to data/transcripts)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS)
+    parser.add_argument("--no-resume", action="store_true", help="Re-run jobs already present in the output")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    # Per-node graph logging is noise at batch scale
+    logging.getLogger("conversation_graph").setLevel(logging.WARNING)
+
+    topics = [line.strip() for line in args.topics.read_text().splitlines() if line.strip()]
+    lineups = [[name.strip() for name in lineup.split(",") if name.strip()] for lineup in args.lineup]
+    jobs = build_jobs(topics, lineups)
+
+    summary = asyncio.run(run_batch(
+        jobs,
+        args.output,
+        concurrency=args.concurrency,
+        max_turns=args.max_turns,
+        resume=not args.no_resume,
+    ))
+    logger.info(f"Batch finished: {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Copy-on-write message logs for conversation branching
+
+A MessageLog is an immutable view over a conversation's messages. Appending
+returns a new view that shares storage with the old one, and forking at a
+message index creates a branch that references its parent's prefix instead
+of copying it. Dozens of branches of one long conversation therefore cost
+only their divergent suffixes.
+
+Each view is (parent, parent_len, items, length): the visible messages are
+the first parent_len messages of the parent followed by the first length
+entries of items. The items list may be shared with later versions; a view
+appends in place only when it is the newest version of that list and copies
+its slice otherwise.
+"""
+
+from __future__ import annotations
+
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, overload
+
+from langchain_core.messages import BaseMessage
+
+
+class MessageLog(Sequence[BaseMessage]):
+    """Persistent, prefix-sharing sequence of conversation messages."""
+
+    __slots__ = ("_parent", "_parent_len", "_items", "_length")
+
+    def __init__(self, messages: Iterable[BaseMessage] = ()) -> None:
+        self._parent: Optional[MessageLog] = None
+        self._parent_len = 0
+        self._items: List[BaseMessage] = list(messages)
+        self._length = len(self._items)
+
+    @classmethod
+    def _view(
+        cls,
+        parent: Optional[MessageLog],
+        parent_len: int,
+        items: List[BaseMessage],
+        length: int,
+    ) -> MessageLog:
+        log = cls.__new__(cls)
+        log._parent = parent
+        log._parent_len = parent_len
+        log._items = items
+        log._length = length
+        return log
+
+    def fork(self, index: int) -> MessageLog:
+        """Branch sharing the first `index` messages of this log."""
+        if not 0 <= index <= len(self):
+            raise ValueError(f"Fork index {index} out of range for {len(self)} messages")
+        if index <= self._parent_len and self._parent is not None:
+            # Fork point lies inside our own shared prefix: point at that directly
+            return MessageLog._view(self._parent, index, [], 0)
+        return MessageLog._view(self, index, [], 0)
+
+    @property
+    def shared_prefix_length(self) -> int:
+        """Number of messages borrowed from the parent log."""
+        return self._parent_len
+
+    def suffix(self) -> List[BaseMessage]:
+        """Messages owned by this log (not shared with a parent)."""
+        return self._items[:self._length]
+
+    def __len__(self) -> int:
+        return self._parent_len + self._length
+
+    @overload
+    def __getitem__(self, index: int) -> BaseMessage: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[BaseMessage]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("MessageLog index out of range")
+        if index < self._parent_len:
+            return self._parent[index]
+        return self._items[index - self._parent_len]
+
+    def __iter__(self) -> Iterator[BaseMessage]:
+        if self._parent is not None:
+            yield from islice(self._parent, self._parent_len)
+        yield from islice(self._items, self._length)
+
+    def __add__(self, other: Iterable[BaseMessage]) -> MessageLog:
+        extra = list(other)
+        if len(self._items) == self._length:
+            # Newest version of the shared list: extend it in place
+            items = self._items
+        else:
+            items = self._items[:self._length]
+        items.extend(extra)
+        return MessageLog._view(self._parent, self._parent_len, items, self._length + len(extra))
+
+    def __radd__(self, other: Iterable[BaseMessage]) -> List[BaseMessage]:
+        return [*other, *self]
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (MessageLog, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"MessageLog(len={len(self)}, shared_prefix={self._parent_len})"
@@ -5,16 +5,29 @@ This module implements the core conversation flow using LangGraph:
 - Turn management between AI participants
 - Conversation state management
 - Event streaming for real-time updates
+- Code execution for participants with the "python" tool (sandbox.py)
+- Excerpts of attached shared documents, retrieved per turn (documents.py)
 """
 
-from typing import TypedDict, List, Dict, Any, Optional
+from typing import TypedDict, List, Dict, Any, Optional, Deque, Tuple
+from collections import deque
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
 import asyncio
 import json
-from participants import create_participant_llm, get_participant_info
+import uuid
+from participant_registry import participant_registry
+from response_cache import response_cache
+from hedging import HedgedStream, model_key
+from slo_controller import GenerationController
+from events import ConversationEvent, Event, EventBus, Subscription, TextDelta
+from branching import MessageLog
+from mentions import ParticipantNameIndex, StreamingMentionDetector, find_mention
+from storage import transcript_store
+from topic_drift import ConversationDrift
+from documents import document_store
+from sandbox import SandboxResult, extract_code_blocks, sandbox_config, sandbox_pool
 import logging
-import re
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,14 +45,43 @@ class ConversationState(TypedDict):
     preferred_bias_remaining: int
     round_robin_pointer: int
 
+# Turn cap for a conversation (demo limit)
+DEFAULT_MAX_TURNS = 15
+
+# Recent messages (with the topic) that make up the document retrieval query
+DOCUMENT_QUERY_MESSAGES = 4
+
+# Graph steps per turn: scheduler, pause_check, ai_response, tool_execution, human_check, end_turn
+STEPS_PER_TURN = 6
+
 class ConversationGraph:
-    def __init__(self):
+    def __init__(self, max_turns: int = DEFAULT_MAX_TURNS):
+        self.max_turns = max_turns
+        # Per-turn max_tokens and the effective turn cap under the configured latency/budget SLOs
+        self.generation = GenerationController(max_turns)
         self.graph = self._build_graph()
-        self.event_callbacks = []
+        self.events = EventBus()
         self.current_state = None
         self.current_participants: List[str] = []
         self.current_topic: Optional[str] = None
-        self.mention_pattern = re.compile(r"@([A-Za-z0-9_-]+)")
+        # Running topic-drift model, scored as each response completes
+        self.topic_drift: Optional[ConversationDrift] = None
+        # Ids of shared documents (documents.py) whose relevant chunks are added to each prompt
+        self.documents: List[str] = []
+        self.participant_names = ParticipantNameIndex()
+        # Human messages posted by the API; drained by the graph at turn boundaries
+        self.human_inbox: Deque[HumanMessage] = deque()
+        self.human_message_sequence = 0
+        # ("add" | "remove", name) requests applied at the next turn boundary
+        self.participant_changes: Deque[Tuple[str, str]] = deque()
+        # Cooperative cancellation of the in-flight provider stream
+        self._stream_task: Optional[asyncio.Task] = None
+        self.stream_cancel_reason: Optional[str] = None
+        self._first_token_at: Optional[float] = None
+        # True while the graph is parked in the pause loop, the only point where it may be spilled
+        self.waiting_for_resume = False
+        # Set by restore() so a rehydrated paused conversation does not announce its pause twice
+        self.rehydrated = False
 
     def _build_graph(self):
         """Build the LangGraph conversation flow"""
@@ -49,36 +91,47 @@ class ConversationGraph:
         graph.add_node("scheduler", self._schedule_next_speaker)
         graph.add_node("pause_check", self._check_pause_status)
         graph.add_node("ai_response", self._generate_ai_response)
+        graph.add_node("tool_execution", self._execute_tools)
         graph.add_node("human_check", self._check_human_input)
         graph.add_node("end_turn", self._end_turn)
 
         # Define flow
-        graph.set_entry_point("scheduler")
+        graph.set_conditional_entry_point(self._route_entry)
         graph.add_edge("scheduler", "pause_check")
         graph.add_conditional_edges("pause_check", self._route_after_pause_check)
-        graph.add_edge("ai_response", "human_check")
+        graph.add_conditional_edges("ai_response", self._route_after_ai_response)
+        graph.add_edge("tool_execution", "human_check")
         graph.add_conditional_edges("human_check", self._route_after_human_check)
         graph.add_edge("end_turn", "scheduler")
 
         return graph.compile()
 
-    def add_event_callback(self, callback):
-        """Add callback for streaming events"""
-        self.event_callbacks.append(callback)
+    def _route_entry(self, state: ConversationState):
+        """New conversations start at the scheduler; a rehydrated paused one re-enters its pause wait"""
+        if state.get("conversation_paused", False) and state.get("current_speaker"):
+            return "pause_check"
+        return "scheduler"
+
+    def add_event_callback(self, callback, event_types: Optional[List[str]] = None) -> Subscription:
+        """Subscribe to streaming events (all types unless event_types is given); returns the handle"""
+        return self.events.subscribe(callback, event_types)
 
     async def _emit_event(self, event_type: str, data: Dict[str, Any]):
-        """Emit event to all callbacks"""
-        event = {
-            "type": event_type,
-            "data": data,
-            "timestamp": asyncio.get_event_loop().time()
-        }
+        """Emit event to its subscribers; not built at all when nobody subscribed to the type"""
+        if self.events.wants(event_type):
+            await self._dispatch_event(ConversationEvent(event_type, data, asyncio.get_running_loop().time()))
+
+    async def _commit_messages(self, previous_messages: List[BaseMessage], new_messages: List[BaseMessage]):
+        """Announce messages appended to the conversation, numbered by their 1-based position"""
+        if not self.events.wants("messages_committed"):
+            return
+        await self._emit_event("messages_committed", {
+            "first_seq": len(previous_messages) + 1,
+            "messages": transcript_store.serialise_messages(new_messages)
+        })
 
-        for callback in self.event_callbacks:
-            try:
-                await callback(event)
-            except Exception as e:
-                logger.error(f"Error in event callback: {e}")
+    async def _dispatch_event(self, event: Event):
+        await self.events.publish(event)
 
     def _extract_preferred_target(
         self,
@@ -87,17 +140,7 @@ class ConversationGraph:
         current_speaker: Optional[str],
     ) -> Optional[str]:
         """Identify the next preferred speaker based on @mentions in the latest message."""
-        if not content:
-            return None
-
-        matches = self.mention_pattern.findall(content)
-        if not matches:
-            return None
-
-        for match in matches:
-            if match in participants and match != current_speaker:
-                return match
-        return None
+        return find_mention(content, self.participant_names.resolve(participants), current_speaker)
 
     def _apply_preferred_speaker(
         self,
@@ -108,7 +151,10 @@ class ConversationGraph:
         """Update state with a preferred next speaker when one is mentioned explicitly."""
         participants = state.get("participants", [])
         target = self._extract_preferred_target(content, participants, current_speaker)
+        return self._set_preferred_speaker(state, target)
 
+    def _set_preferred_speaker(self, state: ConversationState, target: Optional[str]) -> ConversationState:
+        """Record an already-detected mention target as the preferred next speaker."""
         if target:
             state["preferred_next_speaker"] = target
             state["preferred_bias_remaining"] = 1
@@ -176,9 +222,7 @@ class ConversationGraph:
             "preferred_bias_remaining": preferred_bias,
         }
 
-        self.current_state = updated_state
-
-        return updated_state
+        return self._publish_state(updated_state)
 
     async def _generate_ai_response(self, state: ConversationState) -> ConversationState:
         """Generate AI response for current speaker"""
@@ -186,19 +230,25 @@ class ConversationGraph:
         messages = state["messages"]
 
         try:
-            # Get participant configuration
-            participant_info = get_participant_info(current_speaker)
-            llm = create_participant_llm(current_speaker)
+            # Compiled once per participant configuration: client, prompt prefix, token budget
+            participant = participant_registry.compiled(current_speaker)
+
+            if self.generation.config.enabled:
+                plan = self.generation.plan_turn(participant)
+                await self._emit_event("generation_decision", self.generation.describe_plan(participant, plan))
+                participant = self.generation.apply(participant, plan)
 
             await self._emit_event("ai_thinking_start", {
                 "participant": current_speaker,
-                "model": participant_info["model"]
+                "model": participant.model
             })
 
             # Prepare messages with system prompt
-            conversation_messages = [
-                HumanMessage(content=participant_info["system_prompt"])
-            ] + messages
+            conversation_messages = [*participant.prompt_prefix, *messages]
+
+            excerpts = self._document_context(state)
+            if excerpts is not None:
+                conversation_messages.insert(len(participant.prompt_prefix), excerpts)
 
             # Add topic context if this is early in conversation
             if state.get("topic") and len(messages) < 2:
@@ -210,42 +260,90 @@ class ConversationGraph:
                 "participant": current_speaker
             })
 
-            response_content = ""
-            async for chunk in llm.astream(conversation_messages):
-                if chunk.content:
-                    response_content += chunk.content
-                    await self._emit_event("ai_response_stream", {
-                        "participant": current_speaker,
-                        "content": chunk.content,
-                        "full_content": response_content
-                    })
-
-            # Create final message
-            ai_message = AIMessage(
-                content=response_content,
-                additional_kwargs={"participant": current_speaker}
+            partial_chunks: List[str] = []
+            mention_detector = StreamingMentionDetector(
+                self.participant_names.resolve(state.get("participants", [])),
+                exclude=current_speaker,
             )
+            finish_reason = "stop"
+            winner = participant
+            loop = asyncio.get_running_loop()
+            turn_started = loop.time()
+            self._first_token_at = None
+            if self.stream_cancel_reason:
+                # Cancelled before the provider call was even made
+                finish_reason = self.stream_cancel_reason
+            else:
+                self._stream_task = asyncio.create_task(
+                    self._stream_response(
+                        participant, conversation_messages, current_speaker, partial_chunks, mention_detector
+                    )
+                )
+                try:
+                    winner = await self._stream_task or winner
+                except asyncio.CancelledError:
+                    # Only swallow our own cooperative cancellation, never a task-level cancel
+                    if self.stream_cancel_reason is None or asyncio.current_task().cancelling():
+                        raise
+                    finish_reason = self.stream_cancel_reason
+                finally:
+                    self._stream_task = None
+
+            response_content = "".join(partial_chunks)
+            model = winner.model
+
+            if self.generation.config.enabled and (finish_reason == "stop" or response_content):
+                cap_decision = self.generation.record_turn(
+                    state.get("turn_count", 0) + 1,
+                    model_key(winner),
+                    response_content,
+                    self._first_token_at - turn_started if self._first_token_at is not None else None,
+                    loop.time() - turn_started,
+                    completed=finish_reason == "stop",
+                )
+                if cap_decision:
+                    await self._emit_event("generation_decision", cap_decision)
 
             await self._emit_event("ai_response_complete", {
                 "participant": current_speaker,
-                "content": response_content
+                "content": response_content,
+                "finish_reason": finish_reason,
+                "model": model
             })
 
+            if finish_reason != "stop" and not response_content:
+                # Nothing was generated, so there is no partial message to record
+                return self._publish_state({**state})
+
+            # Create final message; its drift score is stored with it (and so with the transcript)
+            drift = self.topic_drift.observe(response_content) if self.topic_drift else None
+            ai_message = AIMessage(
+                content=response_content,
+                additional_kwargs={
+                    "participant": current_speaker,
+                    "finish_reason": finish_reason,
+                    "model": model,
+                    **({"topic_drift": drift} if drift else {}),
+                }
+            )
+
             updated_state: ConversationState = {
                 **state,
                 "messages": messages + [ai_message],
                 "turn_count": state.get("turn_count", 0) + 1
             }
+            await self._commit_messages(messages, [ai_message])
+            if drift:
+                await self._emit_event("topic_drift", {
+                    "participant": current_speaker,
+                    "turn": updated_state["turn_count"],
+                    **drift,
+                })
 
-            updated_state = self._apply_preferred_speaker(
-                updated_state,
-                response_content,
-                current_speaker,
-            )
-
-            self.current_state = updated_state
+            # Mentions were detected while streaming; only a held-back trailing one remains
+            updated_state = self._set_preferred_speaker(updated_state, mention_detector.flush())
 
-            return updated_state
+            return self._publish_state(updated_state)
 
         except Exception as e:
             logger.error(f"Error generating AI response for {current_speaker}: {e}")
@@ -267,38 +365,275 @@ class ConversationGraph:
                 "messages": messages + [error_message],
                 "turn_count": state.get("turn_count", 0) + 1
             }
+            await self._commit_messages(messages, [error_message])
 
-            self.current_state = fallback_state
+            return self._publish_state(fallback_state)
 
-            return fallback_state
+    def _document_context(self, state: ConversationState) -> Optional[HumanMessage]:
+        """The attached documents' chunks most relevant to the topic and the latest messages"""
+        if not self.documents:
+            return None
+        recent = state["messages"][-DOCUMENT_QUERY_MESSAGES:]
+        query = " ".join([state.get("topic") or "", *(message.content for message in recent)])
+        excerpts = document_store.retrieve(self.documents, query)
+        if not excerpts:
+            return None
+        sections = [
+            f"[{excerpt.name}, part {excerpt.chunk + 1} of {excerpt.chunks}]\n{excerpt.text.strip()}"
+            for excerpt in excerpts
+        ]
+        return HumanMessage(content="Relevant excerpts from shared documents:\n\n" + "\n\n".join(sections))
+
+    def attach_documents(self, document_ids: List[str]) -> bool:
+        """Make shared documents available to every participant from the next turn on"""
+        for document_id in document_ids:
+            document_store.get(document_id)  # raises ValueError for unknown documents
+        self.documents = list(dict.fromkeys([*self.documents, *document_ids]))
+        return True
+
+    def _pending_code_blocks(self, state: ConversationState) -> List[str]:
+        """Code blocks of a just-completed response whose speaker has the python tool"""
+        messages = state["messages"]
+        if not sandbox_config.enabled or not messages:
+            return []
+        last = messages[-1]
+        if last.type != "ai" or last.additional_kwargs.get("finish_reason") != "stop":
+            return []
+        try:
+            tools = participant_registry.compiled(last.additional_kwargs.get("participant")).tools
+        except Exception:
+            return []
+        if "python" not in tools:
+            return []
+        return extract_code_blocks(last.content, sandbox_config.max_blocks_per_message)
+
+    async def _execute_tools(self, state: ConversationState) -> ConversationState:
+        """Run the response's code blocks on the warm sandbox pool and add their output to the conversation"""
+        current_speaker = state["current_speaker"]
+        messages = state["messages"]
+        results: List[HumanMessage] = []
+
+        for code in self._pending_code_blocks(state):
+            tool_call_id = f"call_{uuid.uuid4().hex[:12]}"
+            await self._emit_event("tool_call", {
+                "tool_call_id": tool_call_id,
+                "tool_name": "python",
+                "participant": current_speaker,
+                "args": {"code": code}
+            })
+
+            async def on_output(stream: str, text: str, tool_call_id: str = tool_call_id) -> None:
+                await self._emit_event("tool_output", {
+                    "tool_call_id": tool_call_id,
+                    "stream": stream,
+                    "text": text
+                })
+
+            try:
+                result = await sandbox_pool.run(code, on_output)
+            except Exception as e:
+                # The pool itself failed (e.g. no worker could be started); report it like a crashed run
+                logger.error(f"Sandbox run for {current_speaker} failed: {e}")
+                result = SandboxResult("crashed", "", str(e), False, 0.0, 0.0)
+
+            await self._emit_event("tool_result", {
+                "tool_call_id": tool_call_id,
+                "participant": current_speaker,
+                **result.as_dict()
+            })
+            results.append(HumanMessage(
+                content=self._format_tool_output(current_speaker, result),
+                additional_kwargs={
+                    "participant": "Sandbox",
+                    "tool": "python",
+                    "tool_call_id": tool_call_id,
+                    "status": result.status,
+                }
+            ))
+
+        if not results:
+            return self._publish_state({**state})
+
+        updated_state: ConversationState = {**state, "messages": messages + results}
+        await self._commit_messages(messages, results)
+        return self._publish_state(updated_state)
+
+    @staticmethod
+    def _format_tool_output(speaker: str, result: SandboxResult) -> str:
+        body = result.output
+        if result.error:
+            body = f"{body}\n{result.error}" if body else result.error
+        if result.truncated:
+            body += "\n[output truncated]"
+        return f"Output of {speaker}'s code ({result.status}):\n```\n{body.rstrip() or '(no output)'}\n```"
+
+    async def _stream_response(
+        self,
+        participant,
+        conversation_messages: List[BaseMessage],
+        current_speaker: str,
+        partial_chunks: List[str],
+        mention_detector: StreamingMentionDetector,
+    ):
+        """Consume the provider stream, closing it promptly if the task is cancelled.
+
+        Returns the candidate that produced the response (a fallback after failover or hedging).
+        """
+
+        async def on_switch(reason: str, candidate, error: Optional[BaseException]) -> None:
+            await self._emit_event("ai_response_failover", {
+                "participant": current_speaker,
+                "reason": reason,
+                "model": candidate.model,
+                "error": str(error) if error else None
+            })
+
+        # Each candidate goes to the provider unless the response cache has a recording for this prompt
+        stream = HedgedStream(participant, conversation_messages, response_cache.astream, on_switch=on_switch)
+        loop = asyncio.get_running_loop()
+        try:
+            async for chunk in stream:
+                if chunk.content:
+                    if not partial_chunks:
+                        self._first_token_at = loop.time()
+                    partial_chunks.append(chunk.content)
+                    # Per-token hot path: a slotted event, no data dict, and none at all without subscribers
+                    if self.events.wants(TextDelta.type):
+                        await self._dispatch_event(TextDelta(current_speaker, chunk.content, loop.time()))
+
+                    if mention_detector.target is None and mention_detector.feed(chunk.content):
+                        # Let the scheduler (and UI) know the next speaker before the turn ends
+                        await self._emit_event("next_speaker_detected", {
+                            "participant": current_speaker,
+                            "next_speaker": mention_detector.target
+                        })
+                        asyncio.get_running_loop().call_soon(
+                            participant_registry.prewarm, mention_detector.target
+                        )
+        finally:
+            # Closing the generator releases the upstream HTTP connection immediately
+            await stream.aclose()
+
+        return stream.winner
+
+    def cancel_stream(self, reason: str) -> None:
+        """Cut the in-flight provider stream short and record why."""
+        if self.stream_cancel_reason != "stopped":
+            self.stream_cancel_reason = reason
+        if self._stream_task and not self._stream_task.done():
+            self._stream_task.cancel()
+
+    def _reset_stream_cancel(self) -> None:
+        """Clear a consumed cancel request; a stop stays in force until the state is cleared."""
+        if self.stream_cancel_reason != "stopped":
+            self.stream_cancel_reason = None
+
+    def _publish_state(self, state: ConversationState) -> ConversationState:
+        """Expose node output as current_state, keeping control flags the API set meanwhile."""
+        previous = self.current_state
+        if previous is not None and previous is not state:
+            state["conversation_paused"] = previous.get("conversation_paused", False)
+            state["conversation_active"] = (
+                state.get("conversation_active", True) and previous.get("conversation_active", True)
+            )
+        self.current_state = state
+        return state
+
+    async def _drain_human_inbox(self, state: ConversationState) -> ConversationState:
+        """Move every queued human message into state in one batch, preserving arrival order."""
+        self._reset_stream_cancel()
+
+        batch: List[HumanMessage] = []
+        while True:
+            try:
+                batch.append(self.human_inbox.popleft())
+            except IndexError:
+                break
+
+        if not batch:
+            return {**state, "human_input_pending": False}
+
+        updated_state: ConversationState = {
+            **state,
+            "messages": state["messages"] + batch,
+            "human_input_pending": False,
+        }
+
+        for message in batch:
+            updated_state = self._apply_preferred_speaker(updated_state, message.content, "Human")
+
+        await self._emit_event("human_messages_ingested", {
+            "count": len(batch),
+            "sequences": [message.additional_kwargs["sequence"] for message in batch],
+        })
+        await self._commit_messages(state["messages"], batch)
+
+        return updated_state
+
+    async def _apply_participant_changes(self, state: ConversationState) -> ConversationState:
+        """Apply queued participant additions/removals without disturbing round-robin order."""
+        if not self.participant_changes:
+            return state
+
+        participants = list(state.get("participants", []))
+        pointer = state.get("round_robin_pointer", 0)
+
+        while self.participant_changes:
+            action, name = self.participant_changes.popleft()
+            if action == "add" and name not in participants:
+                participants.append(name)
+            elif action == "remove" and name in participants and len(participants) > 1:
+                index = participants.index(name)
+                participants.pop(index)
+                if index < pointer:
+                    pointer -= 1
+
+        self.current_participants = participants
+        await self._emit_event("participants_changed", {
+            "participants": participants
+        })
 
-    async def _check_human_input(self, state: ConversationState) -> ConversationState:
-        """Check if human wants to interject"""
-        # For MVP, we'll implement a simple mechanism
-        # In a real implementation, this would check for pending human input
         return {
             **state,
-            "human_input_pending": False
+            "participants": participants,
+            "round_robin_pointer": pointer % len(participants),
         }
 
+    async def _check_human_input(self, state: ConversationState) -> ConversationState:
+        """Drain human interjections and participant changes queued during the last turn"""
+        updated_state = await self._apply_participant_changes(state)
+        updated_state = await self._drain_human_inbox(updated_state)
+        return self._publish_state(updated_state)
+
     async def _check_pause_status(self, state: ConversationState) -> ConversationState:
         """Check if conversation is paused"""
+        # Pick up pause/stop requests made while the previous nodes were running
+        state = self._publish_state(state)
+
         if state.get("conversation_paused", False):
-            await self._emit_event("conversation_paused", {
-                "message": "Conversation is paused - waiting for resume"
-            })
+            if self.rehydrated:
+                # Clients already saw this pause before the conversation was spilled
+                self.rehydrated = False
+            else:
+                await self._emit_event("conversation_paused", {
+                    "message": "Conversation is paused - waiting for resume"
+                })
 
             # Wait for resume with timeout to prevent infinite waiting
             max_wait_time = 300  # 5 minutes max
             wait_start = asyncio.get_event_loop().time()
 
-            while (state.get("conversation_paused", False) and
-                   (asyncio.get_event_loop().time() - wait_start) < max_wait_time):
-                await asyncio.sleep(0.5)  # Check every 500ms
+            self.waiting_for_resume = True
+            try:
+                while (state.get("conversation_paused", False) and
+                       (asyncio.get_event_loop().time() - wait_start) < max_wait_time):
+                    await asyncio.sleep(0.5)  # Check every 500ms
 
-                # Update state from current instance to get real-time status
-                if self.current_state:
-                    state.update(self.current_state)
+                    # Update state from current instance to get real-time status
+                    if self.current_state:
+                        state.update(self.current_state)
+            finally:
+                self.waiting_for_resume = False
 
             if state.get("conversation_paused", False):
                 # Still paused after timeout - end conversation
@@ -306,25 +641,36 @@ class ConversationGraph:
                     "message": "Conversation auto-ended due to extended pause"
                 })
                 state["conversation_active"] = False
-            else:
+            elif state.get("conversation_active", True):
                 await self._emit_event("conversation_resumed", {
                     "message": "Conversation resumed"
                 })
+                # Messages posted while paused should be visible to the next response
+                state = await self._apply_participant_changes(state)
+                state = self._publish_state(await self._drain_human_inbox(state))
 
         return state
 
     def _route_after_pause_check(self, state: ConversationState):
         """Route after checking pause status"""
-        if state.get("conversation_paused", False):
+        if not state.get("conversation_active", True):
+            return END
+        elif state.get("conversation_paused", False):
             return "pause_check"  # Stay in pause check until resumed
         else:
             return "ai_response"
 
+    def _route_after_ai_response(self, state: ConversationState):
+        """Run the response's code blocks first if its speaker has the python tool"""
+        if self._pending_code_blocks(state):
+            return "tool_execution"
+        return "human_check"
+
     def _route_after_human_check(self, state: ConversationState):
         """Route based on human input status and conversation state"""
         if state.get("human_input_pending", False):
             return "human_input"  # Future implementation
-        elif state.get("turn_count", 0) >= 15:  # Limit for demo
+        elif state.get("turn_count", 0) >= self.generation.turn_cap:
             return END
         elif not state.get("conversation_active", True):
             return END
@@ -339,10 +685,18 @@ class ConversationGraph:
         })
         return state
 
-    async def start_conversation(self, topic: str, participants: List[str] = None):
-        """Start a new conversation with given topic"""
+    async def start_conversation(
+        self,
+        topic: str,
+        participants: List[str] = None,
+        initial_messages: Optional[MessageLog] = None,
+        documents: Optional[List[str]] = None,
+    ):
+        """Start a new conversation with given topic, or continue a branch from its shared prefix"""
         if participants is None:
             participants = ["Alice", "Bob", "Charlie"]
+        if documents:
+            self.attach_documents(documents)
 
         initial_state = ConversationState(
             messages=[],
@@ -362,21 +716,64 @@ class ConversationGraph:
         self.current_state = initial_state
         self.current_participants = participants
         self.current_topic = topic
+        self.generation.start()
+        self.topic_drift = ConversationDrift.from_history(topic, initial_messages or [])
 
         await self._emit_event("conversation_start", {
             "topic": topic,
             "participants": participants
         })
 
-        # Add initial topic message
-        topic_message = HumanMessage(content=f"Let's discuss: {topic}")
-        initial_state["messages"] = [topic_message]
+        if initial_messages is not None:
+            # Branch: the parent's messages are shared copy-on-write, not copied
+            initial_state["messages"] = initial_messages
+        else:
+            # Add initial topic message
+            topic_message = HumanMessage(content=f"Let's discuss: {topic}")
+            initial_state["messages"] = MessageLog([topic_message])
+            await self._commit_messages([], [topic_message])
+
+        await self._run(initial_state)
 
-        # Run the graph
-        async for event in self.graph.astream(initial_state):
+    async def _run(self, state: ConversationState) -> None:
+        # LangGraph's default recursion limit (25 steps) would end the conversation after 5 turns
+        recursion_limit = (self.max_turns + 1) * STEPS_PER_TURN + 10
+        async for event in self.graph.astream(state, config={"recursion_limit": recursion_limit}):
             # LangGraph will emit updates as the conversation progresses
             logger.info(f"Graph event: {event}")
 
+    def snapshot(self) -> Dict[str, Any]:
+        """Everything needed to rebuild this conversation in a fresh graph (see restore)"""
+        return {
+            "state": {**self.current_state, "messages": list(self.current_state["messages"])},
+            "participants": list(self.current_participants),
+            "topic": self.current_topic,
+            "human_inbox": list(self.human_inbox),
+            "participant_changes": [list(change) for change in self.participant_changes],
+            "human_message_sequence": self.human_message_sequence,
+            "generation": self.generation.snapshot(),
+            "documents": list(self.documents),
+        }
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        """Load a snapshot taken by snapshot(); continue_conversation() re-enters the graph"""
+        state = dict(snapshot["state"])
+        state["messages"] = MessageLog(state["messages"])
+        self.current_state = state
+        self.current_participants = list(snapshot["participants"])
+        self.current_topic = snapshot["topic"]
+        self.topic_drift = ConversationDrift.from_history(self.current_topic or "", state["messages"])
+        self.human_inbox.extend(snapshot["human_inbox"])
+        self.participant_changes.extend(tuple(change) for change in snapshot["participant_changes"])
+        self.human_message_sequence = snapshot["human_message_sequence"]
+        self.generation.restore(snapshot["generation"])
+        self.documents = list(snapshot.get("documents", []))
+        self.rehydrated = state.get("conversation_paused", False)
+
+    async def continue_conversation(self) -> None:
+        """Run a restored conversation from where it was spilled"""
+        await self._run(self.current_state)
+
     async def add_human_message(self, content: str, state: ConversationState) -> ConversationState:
         """Add human message to conversation"""
         human_message = HumanMessage(content=content)
@@ -389,6 +786,7 @@ class ConversationGraph:
             **state,
             "messages": state["messages"] + [human_message]
         }
+        await self._commit_messages(state["messages"], [human_message])
 
         updated_state = self._apply_preferred_speaker(
             updated_state,
@@ -404,6 +802,8 @@ class ConversationGraph:
         """Pause the active conversation"""
         if self.current_state:
             self.current_state["conversation_paused"] = True
+            # Stop paying for tokens nobody will see until resume
+            self.cancel_stream("paused")
             return True
         return False
 
@@ -411,6 +811,26 @@ class ConversationGraph:
         """Resume the paused conversation"""
         if self.current_state:
             self.current_state["conversation_paused"] = False
+            self._reset_stream_cancel()
+            return True
+        return False
+
+    def update_participants(self, add: List[str], remove: List[str]) -> bool:
+        """Queue participants to join or leave at the next turn boundary"""
+        if not self.current_state:
+            return False
+
+        for name in add:
+            participant_registry.get(name)  # raises ValueError for names outside the pool
+            self.participant_changes.append(("add", name))
+        for name in remove:
+            self.participant_changes.append(("remove", name))
+        return True
+
+    def interrupt_response(self) -> bool:
+        """Cut the current AI response short without pausing the conversation"""
+        if self.current_state:
+            self.cancel_stream("interrupted")
             return True
         return False
 
@@ -433,6 +853,7 @@ class ConversationGraph:
 
         self.current_state["conversation_active"] = False
         self.current_state["conversation_paused"] = False
+        self.cancel_stream("stopped")
 
         await self._emit_event("conversation_end", {
             "message": reason,
@@ -454,26 +875,27 @@ class ConversationGraph:
         self.current_state = None
         self.current_participants = []
         self.current_topic = None
-
-    def add_human_message_to_state(self, content: str) -> bool:
-        """Add human message directly to current conversation state"""
+        self.topic_drift = None
+        self.documents = []
+        self.human_inbox.clear()
+        self.participant_changes.clear()
+        self.stream_cancel_reason = None
+
+    def add_human_message_to_state(self, content: str, interrupt: bool = False) -> bool:
+        """Queue a human message for the graph to ingest at the next turn boundary"""
         if self.current_state:
+            self.human_message_sequence += 1
             human_message = HumanMessage(
                 content=content,
-                additional_kwargs={"participant": "Human"}
+                additional_kwargs={"participant": "Human", "sequence": self.human_message_sequence}
             )
 
-            # Add to messages in current state
-            self.current_state["messages"].append(human_message)
-
-            # Set flag to indicate human input was added
-            self.current_state["human_input_pending"] = False
+            # The graph owns state["messages"]; the API only appends to the inbox
+            self.human_inbox.append(human_message)
+            self.current_state["human_input_pending"] = True
 
-            self._apply_preferred_speaker(
-                self.current_state,
-                content,
-                "Human",
-            )
+            if interrupt:
+                self.cancel_stream("interrupted")
 
             return True
         return False
@@ -0,0 +1,339 @@
+"""
+Shared Document Store
+
+Files uploaded for analysis are stored once and shared by every participant
+and conversation that references them, rather than being pasted into each
+prompt on every turn:
+- uploads are streamed to disk chunk by chunk (never held in memory whole,
+  written from a thread in UPLOAD_FLUSH_BYTES batches so the event loop is
+  not blocked) and named by their SHA-256, so uploading the same file twice
+  is a no-op
+- each document is split once into chunks of about DOCUMENT_CHUNK_TOKENS on
+  line boundaries; chunk offsets, token estimates and term frequencies are
+  saved next to it (<id>.index.json) and never recomputed
+- chunk text is read through a read-only memory map, so the OS page cache
+  holds a single copy even across shard processes; each process checks that
+  the index file still exists before using its cached copy, so a delete made
+  through any process is seen by all of them
+- each turn, a conversation's attached documents are ranked with BM25 against
+  the topic and the latest messages, and only the best chunks that fit in
+  DOCUMENT_CONTEXT_TOKENS are added to the prompt
+
+Only UTF-8 text is accepted; binary formats must be converted before upload.
+
+Configuration (environment):
+- DOCUMENT_MAX_MB: largest accepted upload
+- DOCUMENT_CHUNK_TOKENS: target chunk size
+- DOCUMENT_CONTEXT_TOKENS: document excerpt budget per prompt (0 disables retrieval)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import mmap
+import os
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from analytics import CHARS_PER_TOKEN, estimate_tokens
+from topic_drift import STOP_WORDS, TOKEN_PATTERN
+
+logger = logging.getLogger(__name__)
+
+# BM25 term-frequency saturation and length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Bytes inspected for NUL bytes to reject binary uploads early
+BINARY_SNIFF_BYTES = 8192
+
+# Upload bytes gathered before they are written to disk from a thread
+UPLOAD_FLUSH_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True, slots=True)
+class DocumentConfig:
+    max_bytes: int = 20 * 1024 * 1024
+    chunk_tokens: int = 300
+    context_tokens: int = 1500
+
+    @classmethod
+    def from_env(cls) -> "DocumentConfig":
+        return cls(
+            max_bytes=int(float(os.getenv("DOCUMENT_MAX_MB", "20")) * 1024 * 1024),
+            chunk_tokens=int(os.getenv("DOCUMENT_CHUNK_TOKENS", "300")),
+            context_tokens=int(os.getenv("DOCUMENT_CONTEXT_TOKENS", "1500")),
+        )
+
+
+class DocumentTooLarge(ValueError):
+    pass
+
+
+def lexical_terms(text: str) -> Counter:
+    """Content-word counts, tokenized the same way as topic drift scoring"""
+    return Counter(
+        token for token in TOKEN_PATTERN.findall(text.lower())
+        if token not in STOP_WORDS and len(token) > 1
+    )
+
+
+def chunk_offsets(data: mmap.mmap | bytes, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """(start, end) byte ranges of about chunk_bytes each, split after a newline where possible"""
+    offsets = []
+    start, size = 0, len(data)
+    while start < size:
+        end = min(start + chunk_bytes, size)
+        if end < size:
+            # Prefer a paragraph break, then a line break, in the second half of the chunk
+            boundary = data.rfind(b"\n\n", start + chunk_bytes // 2, end)
+            if boundary < 0:
+                boundary = data.rfind(b"\n", start + chunk_bytes // 2, end)
+            if boundary >= 0:
+                end = boundary + 1
+            else:
+                # One very long line: cut it, but never inside a UTF-8 sequence
+                while end > start + 1 and data[end] & 0xC0 == 0x80:
+                    end -= 1
+        offsets.append((start, end))
+        start = end
+    return offsets
+
+
+@dataclass(frozen=True, slots=True)
+class Excerpt:
+    document_id: str
+    name: str
+    chunk: int
+    chunks: int
+    score: float
+    tokens: int
+    text: str
+
+
+class Document:
+    """One stored document: its chunk index, inverted term postings and a memory map of its text."""
+
+    def __init__(self, path: Path, index: Dict[str, Any]) -> None:
+        self.id: str = index["id"]
+        self.name: str = index["name"]
+        self.size: int = index["bytes"]
+        self.created_at: float = index["created_at"]
+        self.offsets: List[Tuple[int, int]] = [(start, end) for start, end, _ in index["chunks"]]
+        self.tokens: List[int] = [tokens for _, _, tokens in index["chunks"]]
+        self.lengths: List[int] = [sum(terms.values()) for terms in index["terms"]]
+        # term -> [(chunk, frequency)], so a query only visits the chunks containing its terms
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        for chunk, terms in enumerate(index["terms"]):
+            for term, frequency in terms.items():
+                self.postings.setdefault(term, []).append((chunk, frequency))
+
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+
+    def text(self, chunk: int) -> str:
+        start, end = self.offsets[chunk]
+        return self._map[start:end].decode("utf-8", errors="replace")
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "bytes": self.size,
+            "chunks": len(self.offsets),
+            "tokens": sum(self.tokens),
+            "created_at": self.created_at,
+        }
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+
+class DocumentStore:
+    """Content-addressed documents on local storage, loaded and memory-mapped once per process."""
+
+    def __init__(self, base_directory: Path | None = None, config: Optional[DocumentConfig] = None) -> None:
+        self.base_path = base_directory or Path(__file__).resolve().parent.parent / "data" / "documents"
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        self.config = config or document_config
+        self._documents: Dict[str, Document] = {}
+
+    def _text_path(self, document_id: str) -> Path:
+        return self.base_path / f"{document_id}.txt"
+
+    def _index_path(self, document_id: str) -> Path:
+        return self.base_path / f"{document_id}.index.json"
+
+    async def save(self, stream: AsyncIterator[bytes], name: str) -> Dict[str, Any]:
+        """Stream an upload to disk, then chunk and index it (once per distinct content)"""
+        temporary = self.base_path / f"upload-{uuid.uuid4().hex}.tmp"
+        digest = hashlib.sha256()
+        size = 0
+        pending = bytearray()
+        try:
+            with open(temporary, "wb") as file:
+                async for block in stream:
+                    if not block:
+                        continue
+                    if size < BINARY_SNIFF_BYTES and b"\0" in block[:BINARY_SNIFF_BYTES - size]:
+                        raise ValueError("Only text documents are supported")
+                    size += len(block)
+                    if size > self.config.max_bytes:
+                        raise DocumentTooLarge(f"Document exceeds {self.config.max_bytes} bytes")
+                    digest.update(block)
+                    pending += block
+                    if len(pending) >= UPLOAD_FLUSH_BYTES:
+                        await asyncio.to_thread(file.write, pending)
+                        pending.clear()
+                if pending:
+                    await asyncio.to_thread(file.write, pending)
+
+            document_id = digest.hexdigest()[:32]
+            if self._index_path(document_id).exists():
+                temporary.unlink()
+                return self.get(document_id).info()
+
+            temporary.replace(self._text_path(document_id))
+        except BaseException:
+            temporary.unlink(missing_ok=True)
+            raise
+
+        # Chunking reads the whole file; keep it off the event loop
+        await asyncio.to_thread(self._build_index, document_id, name, size)
+        logger.info(f"Stored document {document_id} ({name}, {size} bytes)")
+        return self.get(document_id).info()
+
+    def _build_index(self, document_id: str, name: str, size: int) -> None:
+        chunk_bytes = max(self.config.chunk_tokens * CHARS_PER_TOKEN, 256)
+        chunks, terms = [], []
+        with open(self._text_path(document_id), "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            try:
+                for start, end in chunk_offsets(data, chunk_bytes):
+                    text = data[start:end].decode("utf-8", errors="replace")
+                    chunks.append([start, end, estimate_tokens(text)])
+                    terms.append(dict(lexical_terms(text)))
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
+
+        index = {
+            "id": document_id,
+            "name": name,
+            "bytes": size,
+            "created_at": time.time(),
+            "chunks": chunks,
+            "terms": terms,
+        }
+        # Written last and atomically: an index file marks a complete document
+        path = self._index_path(document_id)
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(index, ensure_ascii=True, separators=(",", ":")))
+        temporary.replace(path)
+
+    def get(self, document_id: str) -> Document:
+        """The loaded document, reading its index and mapping its text on first use"""
+        index_path = self._index_path(document_id)
+        document = self._documents.get(document_id)
+        if not index_path.exists():
+            # Possibly deleted through another process: drop this process's stale copy
+            if document is not None:
+                del self._documents[document_id]
+                document.close()
+            raise ValueError(f"Unknown document: {document_id}")
+        if document is not None:
+            return document
+        document = Document(self._text_path(document_id), json.loads(index_path.read_text()))
+        self._documents[document_id] = document
+        return document
+
+    def list(self) -> List[Dict[str, Any]]:
+        infos = []
+        for index_path in sorted(self.base_path.glob("*.index.json")):
+            try:
+                infos.append(self.get(index_path.name.split(".", 1)[0]).info())
+            except Exception as e:
+                logger.warning(f"Skipping unreadable document index {index_path.name}: {e}")
+        return infos
+
+    def delete(self, document_id: str) -> None:
+        """Remove a document; conversations that referenced it stop receiving its excerpts (in every process)"""
+        if not self._index_path(document_id).exists():
+            raise ValueError(f"Unknown document: {document_id}")
+        document = self._documents.pop(document_id, None)
+        if document is not None:
+            document.close()
+        self._index_path(document_id).unlink(missing_ok=True)
+        self._text_path(document_id).unlink(missing_ok=True)
+
+    def retrieve(self, document_ids: Iterable[str], query: str, budget_tokens: Optional[int] = None) -> List[Excerpt]:
+        """BM25-ranked chunks of the given documents that fit in budget_tokens, in document order"""
+        budget = self.config.context_tokens if budget_tokens is None else budget_tokens
+        query_terms = set(lexical_terms(query))
+        if budget <= 0 or not query_terms:
+            return []
+
+        documents = []
+        for document_id in dict.fromkeys(document_ids):
+            try:
+                documents.append(self.get(document_id))
+            except ValueError:
+                logger.warning(f"Skipping missing document {document_id}")
+
+        # Corpus statistics over the chunks of the attached documents only
+        total_chunks = sum(len(document.offsets) for document in documents)
+        if not total_chunks:
+            return []
+        average_length = sum(sum(document.lengths) for document in documents) / total_chunks or 1.0
+
+        scores: Dict[Tuple[int, int], float] = {}
+        for term in query_terms:
+            frequency_of_term = sum(len(document.postings.get(term, ())) for document in documents)
+            if not frequency_of_term:
+                continue
+            idf = math.log(1 + (total_chunks - frequency_of_term + 0.5) / (frequency_of_term + 0.5))
+            for position, document in enumerate(documents):
+                for chunk, frequency in document.postings.get(term, ()):
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * document.lengths[chunk] / average_length)
+                    key = (position, chunk)
+                    scores[key] = scores.get(key, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+
+        selected, used = [], 0
+        for (position, chunk), score in sorted(scores.items(), key=lambda item: item[1], reverse=True):
+            tokens = documents[position].tokens[chunk]
+            if used + tokens > budget:
+                continue
+            selected.append((position, chunk, score))
+            used += tokens
+
+        return [
+            Excerpt(
+                document_id=documents[position].id,
+                name=documents[position].name,
+                chunk=chunk,
+                chunks=len(documents[position].offsets),
+                score=round(score, 4),
+                tokens=documents[position].tokens[chunk],
+                text=documents[position].text(chunk),
+            )
+            for position, chunk, score in sorted(selected)
+        ]
+
+    def close(self) -> None:
+        for document in self._documents.values():
+            document.close()
+        self._documents.clear()
+
+
+document_config = DocumentConfig.from_env()
+document_store = DocumentStore()
@@ -0,0 +1,188 @@
+"""
+Typed Conversation Events
+
+Graph events are small slotted objects instead of dicts:
+- ConversationEvent: generic event carrying a data dict
+- TextDelta: the per-token hot path; participant and content are stored as
+  fields and no data dict exists unless a consumer asks for one
+
+Both support the read-only mapping access (event["type"], event.get("data"))
+that event callbacks were written against, and pickle cleanly so they can
+cross the shard worker pipe.
+
+Events are delivered through an EventBus. Subscribing returns a Subscription
+handle that unsubscribes when disposed, and may be limited to some event
+types; publishers ask wants() first, so an event type nobody subscribed to is
+never constructed. Delivery to several subscribers runs concurrently, and the
+subscriber list per type is resolved once, not per event.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EVENT_FIELDS = ("type", "data", "timestamp", "conversation_id")
+
+
+class Event:
+    """Base class: timestamp and owning conversation plus mapping-style access."""
+
+    __slots__ = ("timestamp", "conversation_id")
+
+    type: str
+    data: Dict[str, Any]
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in EVENT_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in EVENT_FIELDS:
+            return default
+        value = getattr(self, key, default)
+        return default if value is None else value
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"type": self.type, "data": self.data, "timestamp": self.timestamp, "conversation_id": self.conversation_id}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(type={self.type!r}, conversation_id={self.conversation_id!r})"
+
+
+class ConversationEvent(Event):
+    """Generic graph event."""
+
+    __slots__ = ("type", "data")
+
+    def __init__(
+        self,
+        event_type: str,
+        data: Dict[str, Any],
+        timestamp: float,
+        conversation_id: Optional[str] = None,
+    ) -> None:
+        self.type = event_type
+        self.data = data
+        self.timestamp = timestamp
+        self.conversation_id = conversation_id
+
+    def __getstate__(self):
+        return (self.type, self.data, self.timestamp, self.conversation_id)
+
+    def __setstate__(self, state) -> None:
+        self.type, self.data, self.timestamp, self.conversation_id = state
+
+
+class TextDelta(Event):
+    """One streamed chunk of a participant response (ai_response_stream)."""
+
+    __slots__ = ("participant", "content")
+
+    type = "ai_response_stream"
+
+    def __init__(
+        self,
+        participant: str,
+        content: str,
+        timestamp: float,
+        conversation_id: Optional[str] = None,
+    ) -> None:
+        self.participant = participant
+        self.content = content
+        self.timestamp = timestamp
+        self.conversation_id = conversation_id
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        # Built only for consumers that ask; the SSE encoder reads the fields directly
+        return {"participant": self.participant, "content": self.content}
+
+    def __getstate__(self):
+        return (self.participant, self.content, self.timestamp, self.conversation_id)
+
+    def __setstate__(self, state) -> None:
+        self.participant, self.content, self.timestamp, self.conversation_id = state
+
+
+EventCallback = Callable[[Event], Awaitable[None]]
+
+
+class Subscription:
+    """Handle for one EventBus subscriber; unsubscribe() (or leaving a with block) removes it."""
+
+    __slots__ = ("bus", "callback", "event_types")
+
+    def __init__(self, bus: EventBus, callback: EventCallback, event_types: Optional[FrozenSet[str]]) -> None:
+        self.bus: Optional[EventBus] = bus
+        self.callback = callback
+        # None receives every event type
+        self.event_types = event_types
+
+    @property
+    def active(self) -> bool:
+        return self.bus is not None
+
+    def unsubscribe(self) -> None:
+        if self.bus is not None:
+            self.bus._remove(self)
+            self.bus = None
+
+    def __enter__(self) -> Subscription:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.unsubscribe()
+
+
+class EventBus:
+    """Typed publish/subscribe for the events of one conversation."""
+
+    def __init__(self) -> None:
+        self._subscriptions: List[Subscription] = []
+        # event type -> subscribers, rebuilt lazily after (un)subscribing
+        self._targets: Dict[str, Tuple[Subscription, ...]] = {}
+
+    def subscribe(self, callback: EventCallback, event_types: Optional[Iterable[str]] = None) -> Subscription:
+        subscription = Subscription(self, callback, frozenset(event_types) if event_types is not None else None)
+        self._subscriptions.append(subscription)
+        self._targets.clear()
+        return subscription
+
+    def _remove(self, subscription: Subscription) -> None:
+        self._subscriptions.remove(subscription)
+        self._targets.clear()
+
+    def targets(self, event_type: str) -> Tuple[Subscription, ...]:
+        targets = self._targets.get(event_type)
+        if targets is None:
+            targets = self._targets[event_type] = tuple(
+                subscription for subscription in self._subscriptions
+                if subscription.event_types is None or event_type in subscription.event_types
+            )
+        return targets
+
+    def wants(self, event_type: str) -> bool:
+        """Whether publishing this event type reaches anyone (check before building the event)"""
+        return bool(self.targets(event_type))
+
+    async def publish(self, event: Event) -> None:
+        targets = self.targets(event.type)
+        if len(targets) == 1:
+            await _deliver(targets[0], event)
+        elif targets:
+            await asyncio.gather(*(_deliver(subscription, event) for subscription in targets))
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+
+async def _deliver(subscription: Subscription, event: Event) -> None:
+    try:
+        await subscription.callback(event)
+    except Exception as e:
+        logger.error(f"Error in event callback: {e}")
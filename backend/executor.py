@@ -0,0 +1,730 @@
+"""
+Conversation Executors
+
+This module hosts running conversations behind one interface so the API layer
+does not need to know where a ConversationGraph actually lives:
+- InProcessConversationExecutor: every conversation runs on the API event loop
+- ShardedConversationExecutor: conversations are sharded across worker processes
+  by conversation id and control calls are routed to the owning shard over IPC
+
+Either way each host accounts for the memory of its conversations and spills
+idle ones to disk, rehydrating them on the next control call (see spill.py).
+Spilling announces conversation_spilled, which frees the conversation's
+admission slot, and rehydration announces conversation_rehydrated (resumed
+when its run continues), which takes one again (see admission.py).
+A conversation that ends by itself (turn limit reached, or an error) is
+persisted like a stopped one and dropped from its host.
+Each host also owns the warm sandbox pool its conversations run code on
+(see sandbox.py), pre-started when a participant in the pool has a tool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from branching import MessageLog
+from events import ConversationEvent, Event, Subscription
+from participant_registry import participant_registry
+from providers import prewarm
+from sandbox import merge_stats, sandbox_config, sandbox_pool
+from spill import MemoryMeter, SpillConfig, SpillStore, memory_summary, spill_config, spill_store
+from storage import transcript_store
+
+if TYPE_CHECKING:
+    from conversation_graph import ConversationGraph
+
+logger = logging.getLogger(__name__)
+
+# Receives graph events (typed) and API-originated events (plain dicts)
+EventSink = Callable[[Event | Dict[str, Any]], Awaitable[None]]
+
+# Exception types re-raised as-is when a shard call fails (anything else becomes RuntimeError)
+REMOTE_ERRORS = {"ValueError": ValueError, "KeyError": KeyError}
+
+# How long a stopped conversation may take to wind down before its task is cancelled
+STOP_GRACE_SECONDS = 2.0
+
+# How long a control call may wait for its shard's reply (CONVERSATION_CALL_TIMEOUT_SECONDS)
+SHARD_CALL_TIMEOUT_SECONDS = 30.0
+
+# How often shard worker processes are checked for having exited
+SHARD_HEALTH_INTERVAL_SECONDS = 0.5
+
+
+@dataclass(slots=True)
+class SpilledConversation:
+    """What the host keeps in memory for a conversation whose state is on disk."""
+
+    status: Dict[str, Any]
+    memory: Dict[str, int]
+    # Parked in the pause wait when spilled (rather than finished): its graph run continues on rehydration
+    resumable: bool
+    # Held until the snapshot is on disk, so a rehydration racing the write does not read a partial file
+    snapshot: Optional[Dict[str, Any]]
+    disk_bytes: int = 0
+
+
+class ConversationHost:
+    """Owns the ConversationGraph instances and tasks for a set of conversations."""
+
+    def __init__(
+        self,
+        event_sink: EventSink,
+        spill: Optional[SpillConfig] = None,
+        store: Optional[SpillStore] = None,
+    ) -> None:
+        self._event_sink = event_sink
+        self.graphs: Dict[str, ConversationGraph] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+        # Event forwarding handle per graph, disposed when the graph leaves this host
+        self.subscriptions: Dict[str, Subscription] = {}
+        # branch id -> (parent id, fork index)
+        self.lineage: Dict[str, Tuple[str, int]] = {}
+        self.spill_config = spill or spill_config
+        self.spill_store = store or spill_store
+        self.spill_task: Optional[asyncio.Task] = None
+        self.sandbox_task: Optional[asyncio.Task] = None
+        self._notifications: set = set()
+        self.memory = MemoryMeter()
+        self.spilled: Dict[str, SpilledConversation] = {}
+        self._rehydrating: Dict[str, asyncio.Task] = {}
+        # conversation id -> monotonic time of its last control call, least recently used first
+        self.last_access: OrderedDict[str, float] = OrderedDict()
+
+    def _touch(self, conversation_id: str) -> None:
+        self.last_access[conversation_id] = time.monotonic()
+        self.last_access.move_to_end(conversation_id)
+
+    async def _get_graph(self, conversation_id: str) -> ConversationGraph:
+        """The conversation's graph, rehydrated from disk first if it was spilled"""
+        graph = self.graphs.get(conversation_id)
+        if graph is None:
+            task = self._rehydrating.get(conversation_id)
+            if task is None:
+                if conversation_id not in self.spilled:
+                    raise KeyError(f"Unknown conversation: {conversation_id}")
+                task = self._rehydrating[conversation_id] = asyncio.create_task(self._rehydrate(conversation_id))
+                task.add_done_callback(lambda _: self._rehydrating.pop(conversation_id, None))
+            # Shielded so a caller going away does not abandon a half-restored conversation
+            graph = await asyncio.shield(task)
+        self._touch(conversation_id)
+        return graph
+
+    def _create_graph(self, conversation_id: str) -> ConversationGraph:
+        # Imported on first use (or by the startup pre-warm) to keep cold start fast
+        from conversation_graph import ConversationGraph
+
+        graph = ConversationGraph()
+
+        async def forward_event(event: Event) -> None:
+            # Events are owned by this graph, so they are attributed in place rather than copied
+            event.conversation_id = conversation_id
+            await self._event_sink(event)
+
+        self.subscriptions[conversation_id] = graph.add_event_callback(forward_event)
+        self.graphs[conversation_id] = graph
+        self._touch(conversation_id)
+        return graph
+
+    async def start(
+        self,
+        conversation_id: str,
+        topic: str,
+        participants: List[str],
+        initial_messages: Optional[MessageLog] = None,
+        documents: Optional[List[str]] = None,
+    ) -> bool:
+        graph = self._create_graph(conversation_id)
+        self._track(conversation_id, asyncio.create_task(
+            graph.start_conversation(topic, participants, initial_messages, documents)
+        ))
+        return True
+
+    def _track(self, conversation_id: str, task: asyncio.Task) -> None:
+        """Own a conversation task; when it ends by itself, persist and forget it and announce conversation_finished"""
+        self.tasks[conversation_id] = task
+
+        def on_done(_: asyncio.Task) -> None:
+            # Stopped and spilled conversations are popped from tasks before their task ends,
+            # and cancellation only comes from stop, spill or shutdown
+            if self.tasks.get(conversation_id) is not task or task.cancelled():
+                return
+            error = task.exception()
+            del self.tasks[conversation_id]
+            graph = self.graphs.get(conversation_id)
+            if graph is not None:
+                try:
+                    self._persist_transcript(
+                        conversation_id, graph, list(graph.current_participants), graph.current_topic
+                    )
+                except Exception as e:
+                    logger.error(f"Could not persist finished conversation {conversation_id}: {e}")
+                graph.clear_state()
+                self._release(conversation_id)
+            self.last_access.pop(conversation_id, None)
+            event = ConversationEvent(
+                "conversation_finished",
+                {"reason": "error" if error else "completed", "error": str(error) if error else None},
+                asyncio.get_running_loop().time(),
+                conversation_id,
+            )
+            notification = asyncio.create_task(self._event_sink(event))
+            self._notifications.add(notification)
+            notification.add_done_callback(self._notifications.discard)
+
+        task.add_done_callback(on_done)
+
+    async def fork(
+        self,
+        conversation_id: str,
+        branch_id: str,
+        message_index: int,
+        participants: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Start a branch that shares the parent's first message_index messages"""
+        parent = await self._get_graph(conversation_id)
+        if not parent.current_state:
+            raise ValueError(f"Conversation {conversation_id} has no state to branch from")
+
+        parent_messages = parent.current_state["messages"]
+        if not isinstance(parent_messages, MessageLog):
+            parent_messages = MessageLog(parent_messages)
+        branch_messages = parent_messages.fork(message_index)
+
+        topic = parent.current_topic
+        branch_participants = participants or list(parent.current_participants)
+        await self.start(branch_id, topic, branch_participants, branch_messages, list(parent.documents))
+        self.lineage[branch_id] = (conversation_id, message_index)
+
+        return {"topic": topic, "participants": branch_participants}
+
+    async def add_message(self, conversation_id: str, content: str, interrupt: bool = False) -> bool:
+        return (await self._get_graph(conversation_id)).add_human_message_to_state(content, interrupt)
+
+    async def update_participants(self, conversation_id: str, add: List[str], remove: List[str]) -> bool:
+        return (await self._get_graph(conversation_id)).update_participants(add, remove)
+
+    async def attach_documents(self, conversation_id: str, document_ids: List[str]) -> bool:
+        return (await self._get_graph(conversation_id)).attach_documents(document_ids)
+
+    async def pause(self, conversation_id: str) -> bool:
+        return (await self._get_graph(conversation_id)).pause_conversation()
+
+    async def resume(self, conversation_id: str) -> bool:
+        return (await self._get_graph(conversation_id)).resume_conversation()
+
+    @staticmethod
+    def _graph_status(graph: ConversationGraph) -> Dict[str, Any]:
+        return {
+            "active": graph.is_active(),
+            "paused": graph.is_paused(),
+            "participants": list(graph.current_participants),
+            "topic": graph.current_topic,
+        }
+
+    def _memory(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        graph = self.graphs.get(conversation_id)
+        if graph is not None:
+            messages = graph.current_state["messages"] if graph.current_state else []
+            return {**self.memory.measure(conversation_id, messages), "resident": True}
+        record = self.spilled.get(conversation_id)
+        if record is not None:
+            return {**record.memory, "bytes": 0, "resident": False, "spilled_bytes": record.disk_bytes}
+        return None
+
+    async def status(self, conversation_id: str) -> Dict[str, Any]:
+        # Answered from the spill record so status polling does not rehydrate a conversation
+        graph = self.graphs.get(conversation_id)
+        record = self.spilled.get(conversation_id)
+        if graph is None and record is None:
+            return {"active": False, "paused": False, "participants": [], "topic": None}
+        status = self._graph_status(graph) if graph is not None else dict(record.status)
+        return {**status, "memory": self._memory(conversation_id)}
+
+    async def memory_report(self, conversation_id: Optional[str] = None) -> Dict[str, Any]:
+        """Memory of one conversation, or of every conversation this host owns"""
+        conversation_ids = [conversation_id] if conversation_id else [*self.graphs, *self.spilled]
+        conversations = {
+            conversation_id: memory
+            for conversation_id in conversation_ids
+            if (memory := self._memory(conversation_id)) is not None
+        }
+        return memory_summary(conversations)
+
+    async def sandbox_report(self, conversation_id: Optional[str] = None) -> Dict[str, Any]:
+        """Sandbox pool statistics; the pool is shared by every conversation on this host"""
+        return sandbox_pool.stats()
+
+    async def spill(self, conversation_id: str) -> bool:
+        """Move an idle conversation's state to disk; False if it is busy or not resident"""
+        graph = self.graphs.get(conversation_id)
+        if graph is None or not graph.current_state:
+            return False
+        task = self.tasks.get(conversation_id)
+        running = task is not None and not task.done()
+        if running and not graph.waiting_for_resume:
+            return False
+
+        record = SpilledConversation(
+            status=self._graph_status(graph),
+            memory=self.memory.measure(conversation_id, graph.current_state["messages"]),
+            resumable=running,
+            snapshot=graph.snapshot(),
+        )
+        if running:
+            # Parked in the pause loop's sleep, so the snapshot above is consistent
+            task.cancel()
+        self.tasks.pop(conversation_id, None)
+        self._release(conversation_id)
+        self.spilled[conversation_id] = record
+        graph.clear_state()
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+
+        try:
+            record.disk_bytes = await asyncio.to_thread(self.spill_store.save, conversation_id, record.snapshot)
+        except Exception as e:
+            # The snapshot stays in memory, so the conversation can still be rehydrated
+            logger.error(f"Could not spill conversation {conversation_id}: {e}")
+            return False
+        if self.spilled.get(conversation_id) is record:
+            record.snapshot = None
+        else:
+            # Rehydrated while the snapshot was being written
+            self.spill_store.discard(conversation_id)
+
+        logger.info(
+            f"Spilled conversation {conversation_id}: {record.memory['bytes']} bytes resident, "
+            f"{record.disk_bytes} on disk"
+        )
+        await self._announce(conversation_id, "conversation_spilled", {"resumable": record.resumable})
+        return True
+
+    async def _rehydrate(self, conversation_id: str) -> ConversationGraph:
+        record = self.spilled[conversation_id]
+        snapshot = record.snapshot
+        if snapshot is None:
+            snapshot = await asyncio.to_thread(self.spill_store.load, conversation_id)
+            if snapshot is None:
+                del self.spilled[conversation_id]
+                raise KeyError(f"Spilled conversation {conversation_id} is missing from disk")
+            self.spill_store.discard(conversation_id)
+        del self.spilled[conversation_id]
+
+        graph = self._create_graph(conversation_id)
+        graph.restore(snapshot)
+        if record.resumable:
+            self._track(conversation_id, asyncio.create_task(graph.continue_conversation()))
+        logger.info(f"Rehydrated conversation {conversation_id} ({record.memory['messages']} messages)")
+        await self._announce(conversation_id, "conversation_rehydrated", {"resumed": record.resumable})
+        return graph
+
+    async def _announce(self, conversation_id: str, event_type: str, data: Dict[str, Any]) -> None:
+        """Emit a host lifecycle event for a conversation"""
+        await self._event_sink(ConversationEvent(event_type, data, asyncio.get_running_loop().time(), conversation_id))
+
+    async def sweep(self) -> List[str]:
+        """Spill conversations idle for too long, then least recently used ones while over budget"""
+        config = self.spill_config
+        now = time.monotonic()
+        candidates = [conversation_id for conversation_id in self.last_access if conversation_id in self.graphs]
+        spilled: List[str] = []
+
+        if config.idle_seconds:
+            for conversation_id in candidates:
+                if now - self.last_access[conversation_id] >= config.idle_seconds and await self.spill(conversation_id):
+                    spilled.append(conversation_id)
+
+        if config.max_resident_bytes:
+            resident = sum(self._memory(conversation_id)["bytes"] for conversation_id in self.graphs)
+            for conversation_id in candidates:
+                if resident <= config.max_resident_bytes:
+                    break
+                if conversation_id in spilled or conversation_id not in self.graphs:
+                    continue
+                size = self._memory(conversation_id)["bytes"]
+                if await self.spill(conversation_id):
+                    resident -= size
+                    spilled.append(conversation_id)
+
+        return spilled
+
+    def start_spiller(self) -> Optional[asyncio.Task]:
+        """Run sweep() every SPILL_INTERVAL_SECONDS in the background"""
+        if self.spill_config.enabled and self.spill_task is None:
+            self.spill_task = asyncio.create_task(self._run_spiller())
+        return self.spill_task
+
+    def start_sandbox(self) -> Optional[asyncio.Task]:
+        """Pre-start the sandbox workers if any participant can run code (otherwise they start on first use)"""
+        if sandbox_config.enabled and self.sandbox_task is None and participant_registry.tools_in_use():
+            self.sandbox_task = asyncio.create_task(sandbox_pool.start())
+        return self.sandbox_task
+
+    async def _run_spiller(self) -> None:
+        while True:
+            await asyncio.sleep(self.spill_config.interval_seconds)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Spill sweep failed: {e}")
+
+    async def interrupt(self, conversation_id: str) -> bool:
+        return (await self._get_graph(conversation_id)).interrupt_response()
+
+    async def stop(self, conversation_id: str) -> bool:
+        try:
+            graph = await self._get_graph(conversation_id)
+        except KeyError:
+            return False
+
+        participants_snapshot = list(graph.current_participants)
+        topic_snapshot = graph.current_topic
+
+        stopped = await graph.stop_conversation()
+        if not stopped:
+            return False
+
+        # Give the graph a moment to close the provider stream and record the partial
+        # response, then cancel the LangGraph task if it is still active
+        task = self.tasks.pop(conversation_id, None)
+        if task and not task.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(task), STOP_GRACE_SECONDS)
+            except asyncio.TimeoutError:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    logger.info(f"Conversation task {conversation_id} cancelled successfully")
+
+        self._persist_transcript(conversation_id, graph, participants_snapshot, topic_snapshot)
+        graph.clear_state()
+        self._release(conversation_id)
+        self.last_access.pop(conversation_id, None)
+        return True
+
+    def _persist_transcript(
+        self, conversation_id: str, graph: ConversationGraph, participants: List[str], topic: Optional[str]
+    ) -> None:
+        """Store a conversation that is leaving this host for good (branches keep only their suffix)"""
+        branch_of, fork_index = self.lineage.pop(conversation_id, (None, None))
+        if not graph.current_state:
+            return
+        messages = graph.current_state.get("messages", [])
+        if branch_of is not None:
+            messages = messages[fork_index:]
+        transcript_store.persist(
+            topic=topic,
+            participants=participants,
+            messages=messages,
+            conversation_id=conversation_id,
+            branch_of=branch_of,
+            fork_index=fork_index,
+        )
+
+    def _release(self, conversation_id: str) -> None:
+        """Forget a graph that is leaving this host (stopped, finished or spilled)"""
+        # Already gone if the conversation finished by itself while being stopped
+        if self.graphs.pop(conversation_id, None) is None:
+            return
+        subscription = self.subscriptions.pop(conversation_id, None)
+        if subscription is not None:
+            subscription.unsubscribe()
+        self.memory.discard(conversation_id)
+
+    async def close(self) -> None:
+        """Cancel every running conversation task and drop spilled snapshots."""
+        if self.spill_task:
+            self.spill_task.cancel()
+            await asyncio.gather(self.spill_task, return_exceptions=True)
+            self.spill_task = None
+        for task in self.tasks.values():
+            task.cancel()
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+        self.tasks.clear()
+        self.graphs.clear()
+        for subscription in self.subscriptions.values():
+            subscription.unsubscribe()
+        self.subscriptions.clear()
+        for conversation_id in self.spilled:
+            self.spill_store.discard(conversation_id)
+        self.spilled.clear()
+        if self.sandbox_task:
+            await asyncio.gather(self.sandbox_task, return_exceptions=True)
+            self.sandbox_task = None
+        await sandbox_pool.close()
+
+
+class InProcessConversationExecutor(ConversationHost):
+    """Runs every conversation on the current event loop (the default)."""
+
+    async def open(self) -> None:
+        self.prewarm_task = start_prewarm()
+        self.start_spiller()
+        self.start_sandbox()
+
+
+def start_prewarm() -> Optional[asyncio.Task]:
+    """Import the graph and the providers the participant pool uses on a background thread"""
+    if os.getenv("PROVIDER_PREWARM", "1") == "0":
+        return None
+    return asyncio.create_task(asyncio.to_thread(
+        prewarm, participant_registry.providers_in_use(), ("conversation_graph",)
+    ))
+
+
+def _shard_worker_main(shard_index: int, inbox, outbox) -> None:
+    """Entry point of a shard worker process."""
+    asyncio.run(_serve_shard(shard_index, inbox, outbox))
+
+
+async def _serve_shard(shard_index: int, inbox, outbox) -> None:
+    loop = asyncio.get_running_loop()
+
+    async def publish_event(event: Event) -> None:
+        outbox.put(("event", event))
+
+    host = ConversationHost(publish_event)
+    prewarm_task = start_prewarm()  # referenced so the task is not garbage collected
+    host.start_spiller()
+    host.start_sandbox()
+    pending: set = set()
+
+    async def dispatch(request_id: int, operation: str, conversation_id: str, args: tuple) -> None:
+        try:
+            result = await getattr(host, operation)(conversation_id, *args)
+            outbox.put(("reply", request_id, True, result))
+        except Exception as e:
+            logger.error(f"Shard {shard_index} failed {operation} for {conversation_id}: {e}")
+            outbox.put(("reply", request_id, False, (type(e).__name__, str(e))))
+
+    logger.info(f"Conversation shard {shard_index} ready (pid {os.getpid()})")
+
+    while True:
+        command = await loop.run_in_executor(None, inbox.get)
+        if command is None:
+            break
+        # Each command runs as its own task so a slow stop cannot block other conversations
+        task = asyncio.create_task(dispatch(*command))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    await host.close()
+
+
+class ShardedConversationExecutor:
+    """Shards conversations across worker processes by conversation id.
+
+    A shard process that dies fails the calls waiting on it and is replaced;
+    the conversations it held are lost (later calls for them raise KeyError).
+    """
+
+    def __init__(self, workers: int, event_sink: EventSink, call_timeout: float = SHARD_CALL_TIMEOUT_SECONDS) -> None:
+        if workers < 1:
+            raise ValueError("ShardedConversationExecutor needs at least one worker")
+        self.workers = workers
+        self.call_timeout = call_timeout
+        self._event_sink = event_sink
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: List[multiprocessing.Process] = []
+        self._inboxes: List[Any] = []
+        self._outbox = None
+        # request id -> (shard index, reply future)
+        self._pending: Dict[int, Tuple[int, asyncio.Future]] = {}
+        self._request_ids = itertools.count()
+        self._reader_task: Optional[asyncio.Task] = None
+        self._health_task: Optional[asyncio.Task] = None
+
+    def shard_for(self, conversation_id: str) -> int:
+        """Stable conversation id -> shard mapping (affinity routing).
+
+        Branch ids are "<root id>.<suffix>" and hash on the root id, so a branch
+        lives in the same process as its parent and can share its messages.
+        """
+        root_id = conversation_id.split(".", 1)[0]
+        return zlib.crc32(root_id.encode("utf-8")) % self.workers
+
+    def _start_shard(self, shard_index: int) -> None:
+        inbox = self._context.Queue()
+        process = self._context.Process(
+            target=_shard_worker_main,
+            args=(shard_index, inbox, self._outbox),
+            name=f"conversation-shard-{shard_index}",
+            daemon=True,
+        )
+        process.start()
+        if shard_index < len(self._processes):
+            self._inboxes[shard_index] = inbox
+            self._processes[shard_index] = process
+        else:
+            self._inboxes.append(inbox)
+            self._processes.append(process)
+
+    async def open(self) -> None:
+        self._outbox = self._context.Queue()
+        for shard_index in range(self.workers):
+            self._start_shard(shard_index)
+
+        self._reader_task = asyncio.create_task(self._read_outbox())
+        self._health_task = asyncio.create_task(self._watch_shards())
+        logger.info(f"Started {self.workers} conversation shard workers")
+
+    async def _watch_shards(self) -> None:
+        """Fail the calls pending on a shard process that exited, then replace it"""
+        while True:
+            await asyncio.sleep(SHARD_HEALTH_INTERVAL_SECONDS)
+            for shard_index, process in enumerate(self._processes):
+                if process.is_alive():
+                    continue
+                logger.error(f"Conversation shard {shard_index} exited (code {process.exitcode}); restarting it")
+                self._fail_pending(shard_index, RuntimeError(f"Conversation shard {shard_index} exited"))
+                self._inboxes[shard_index].close()
+                self._start_shard(shard_index)
+
+    def _fail_pending(self, shard_index: Optional[int], error: Exception) -> None:
+        """Fail the calls waiting on one shard (or on every shard if shard_index is None)"""
+        for request_id, (owner, future) in list(self._pending.items()):
+            if shard_index is None or owner == shard_index:
+                del self._pending[request_id]
+                if not future.done():
+                    future.set_exception(error)
+
+    async def _read_outbox(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await loop.run_in_executor(None, self._outbox.get)
+            if message is None:
+                break
+
+            if message[0] == "event":
+                await self._event_sink(message[1])
+                continue
+
+            _, request_id, ok, result = message
+            _, future = self._pending.pop(request_id, (None, None))
+            if future is None or future.done():
+                continue
+            if ok:
+                future.set_result(result)
+            else:
+                error_type, error_message = result
+                future.set_exception(REMOTE_ERRORS.get(error_type, RuntimeError)(error_message))
+
+    async def _call(self, operation: str, conversation_id: str, *args: Any) -> Any:
+        return await self._call_shard(self.shard_for(conversation_id), operation, conversation_id, *args)
+
+    async def _call_shard(self, shard_index: int, operation: str, conversation_id: Optional[str], *args: Any) -> Any:
+        if not self._processes[shard_index].is_alive():
+            raise RuntimeError(f"Conversation shard {shard_index} is not running")
+        request_id = next(self._request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = (shard_index, future)
+        self._inboxes[shard_index].put((request_id, operation, conversation_id, args))
+        try:
+            return await asyncio.wait_for(future, self.call_timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(
+                f"Conversation shard {shard_index} did not answer {operation} within {self.call_timeout}s"
+            ) from None
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def start(
+        self,
+        conversation_id: str,
+        topic: str,
+        participants: List[str],
+        initial_messages: Optional[MessageLog] = None,
+        documents: Optional[List[str]] = None,
+    ) -> bool:
+        return await self._call("start", conversation_id, topic, participants, initial_messages, documents)
+
+    async def fork(
+        self,
+        conversation_id: str,
+        branch_id: str,
+        message_index: int,
+        participants: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        return await self._call("fork", conversation_id, branch_id, message_index, participants)
+
+    async def add_message(self, conversation_id: str, content: str, interrupt: bool = False) -> bool:
+        return await self._call("add_message", conversation_id, content, interrupt)
+
+    async def update_participants(self, conversation_id: str, add: List[str], remove: List[str]) -> bool:
+        return await self._call("update_participants", conversation_id, add, remove)
+
+    async def attach_documents(self, conversation_id: str, document_ids: List[str]) -> bool:
+        return await self._call("attach_documents", conversation_id, document_ids)
+
+    async def pause(self, conversation_id: str) -> bool:
+        return await self._call("pause", conversation_id)
+
+    async def resume(self, conversation_id: str) -> bool:
+        return await self._call("resume", conversation_id)
+
+    async def status(self, conversation_id: str) -> Dict[str, Any]:
+        return await self._call("status", conversation_id)
+
+    async def interrupt(self, conversation_id: str) -> bool:
+        return await self._call("interrupt", conversation_id)
+
+    async def memory_report(self, conversation_id: Optional[str] = None) -> Dict[str, Any]:
+        if conversation_id is not None:
+            return await self._call("memory_report", conversation_id)
+        reports = await asyncio.gather(*(
+            self._call_shard(shard_index, "memory_report", None) for shard_index in range(self.workers)
+        ))
+        return memory_summary({
+            conversation_id: memory
+            for report in reports
+            for conversation_id, memory in report["conversations"].items()
+        })
+
+    async def sandbox_report(self) -> Dict[str, Any]:
+        return merge_stats(await asyncio.gather(*(
+            self._call_shard(shard_index, "sandbox_report", None) for shard_index in range(self.workers)
+        )))
+
+    async def stop(self, conversation_id: str) -> bool:
+        return await self._call("stop", conversation_id)
+
+    async def close(self) -> None:
+        if self._health_task:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        for inbox in self._inboxes:
+            inbox.put(None)
+        for process in self._processes:
+            await asyncio.get_running_loop().run_in_executor(None, process.join, 10)
+            if process.is_alive():
+                process.terminate()
+
+        if self._outbox is not None:
+            self._outbox.put(None)
+        if self._reader_task:
+            await self._reader_task
+
+        self._fail_pending(None, RuntimeError("Conversation executor closed"))
+        self._processes.clear()
+        self._inboxes.clear()
+
+
+def create_executor(event_sink: EventSink):
+    """Build the executor selected by CONVERSATION_WORKERS (0 = in-process)."""
+    workers = int(os.getenv("CONVERSATION_WORKERS", "0"))
+    if workers > 0:
+        call_timeout = float(os.getenv("CONVERSATION_CALL_TIMEOUT_SECONDS", str(SHARD_CALL_TIMEOUT_SECONDS)))
+        return ShardedConversationExecutor(workers, event_sink, call_timeout)
+    return InProcessConversationExecutor(event_sink)
@@ -0,0 +1,172 @@
+"""
+Streaming Transcript Export
+
+Exports stored transcripts (storage.py) as NDJSON, CSV or Markdown through
+async generators, so a response is sent in chunks while the file is read:
+- messages are read line by line from the line-oriented transcript layout,
+  READ_BATCH at a time on a worker thread, so memory stays constant however
+  long a transcript is and the event loop never waits on disk
+- NDJSON and CSV emit one flat row per message (conversation, sequence
+  number, role, participant, model, content) for warehouse loads; sequence
+  numbers match the message index, branches included
+- bulk exports walk every stored transcript, filtered by creation time
+  (taken from the file name, so out-of-range files are never opened) and by
+  participant (from the transcript's first line)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import itertools
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from storage import TranscriptStore
+
+# Messages read (and encoded into one response chunk) per worker-thread hop
+READ_BATCH = 256
+
+# Transcripts whose headers are read per worker-thread hop in bulk exports
+SELECT_BATCH = 32
+
+TIMESTAMP_FORMAT = "%Y%m%dT%H%M%SZ"
+
+# format -> (media type, file extension)
+EXPORT_FORMATS: Dict[str, Tuple[str, str]] = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "markdown": ("text/markdown; charset=utf-8", "md"),
+}
+
+CSV_COLUMNS = (
+    "conversation_id", "topic", "created_at", "branch_of", "seq",
+    "role", "participant", "model", "finish_reason", "content",
+)
+
+Transcript = Tuple[Path, Dict[str, Any]]
+
+
+def parse_timestamp(value: str) -> datetime:
+    return datetime.strptime(value, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def parse_bound(value: Optional[str]) -> Optional[datetime]:
+    """ISO date or datetime from a query string; naive values are taken as UTC"""
+    if not value:
+        return None
+    bound = datetime.fromisoformat(value)
+    return bound if bound.tzinfo else bound.replace(tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True, slots=True)
+class TranscriptFilter:
+    since: Optional[datetime] = None  # inclusive
+    until: Optional[datetime] = None  # exclusive
+    participant: Optional[str] = None
+
+    def in_range(self, created_at: datetime) -> bool:
+        return (self.since is None or created_at >= self.since) and (self.until is None or created_at < self.until)
+
+    def matches(self, header: Mapping[str, Any]) -> bool:
+        if self.participant is not None and self.participant not in header.get("participants", []):
+            return False
+        created_at = header.get("created_at")
+        return created_at is None or self.in_range(parse_timestamp(created_at))
+
+
+def select_transcripts(store: TranscriptStore, transcript_filter: TranscriptFilter) -> Iterator[Transcript]:
+    """(path, header) of every stored transcript that passes the filter, oldest first"""
+    for path in store.transcript_paths():
+        # conversation-<timestamp>[-<id>].json: skip out-of-range files without opening them
+        try:
+            if not transcript_filter.in_range(parse_timestamp(path.stem.split("-")[1])):
+                continue
+        except (IndexError, ValueError):
+            pass
+        header = store.read_header(path)
+        if transcript_filter.matches(header):
+            yield path, header
+
+
+async def _batches(iterator: Iterator[Any], size: int) -> AsyncIterator[List[Any]]:
+    """Pull items from a blocking iterator on a worker thread, size at a time"""
+    while True:
+        batch = await asyncio.to_thread(list, itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def message_rows(
+    header: Mapping[str, Any], messages: Iterable[Mapping[str, Any]], first_seq: int
+) -> Iterator[Dict[str, Any]]:
+    for offset, message in enumerate(messages):
+        metadata = message.get("metadata") or {}
+        yield {
+            "conversation_id": header.get("conversation_id"),
+            "topic": header.get("topic"),
+            "created_at": header.get("created_at"),
+            "branch_of": header.get("branch_of"),
+            "seq": first_seq + offset,
+            "role": message.get("role"),
+            "participant": metadata.get("participant"),
+            "model": metadata.get("model"),
+            "finish_reason": metadata.get("finish_reason"),
+            "content": message.get("content") or "",
+            "metadata": metadata,
+        }
+
+
+def _encode_ndjson(rows: Iterable[Dict[str, Any]]) -> str:
+    return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+
+
+def _encode_csv(rows: Iterable[Dict[str, Any]]) -> str:
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, CSV_COLUMNS, extrasaction="ignore").writerows(rows)
+    return buffer.getvalue()
+
+
+def _encode_markdown(rows: Iterable[Dict[str, Any]]) -> str:
+    parts = []
+    for row in rows:
+        speaker = row["participant"] or ("Human" if row["role"] == "human" else row["role"])
+        parts.append(f"**{speaker}** ({row['seq']}):\n\n{row['content']}\n\n")
+    return "".join(parts)
+
+
+def _markdown_heading(header: Mapping[str, Any]) -> str:
+    lines = [f"# {header.get('topic') or 'Conversation'}", ""]
+    lines.append(f"- Conversation: `{header.get('conversation_id')}`")
+    if header.get("branch_of"):
+        lines.append(f"- Branch of: `{header['branch_of']}` at message {header.get('fork_index')}")
+    lines.append(f"- Participants: {', '.join(header.get('participants', []))}")
+    lines.append(f"- Stored: {header.get('created_at')}")
+    return "\n".join(lines) + "\n\n"
+
+
+ENCODERS = {"ndjson": _encode_ndjson, "csv": _encode_csv, "markdown": _encode_markdown}
+
+
+async def stream_export(
+    store: TranscriptStore, transcripts: Iterable[Transcript], export_format: str
+) -> AsyncIterator[str]:
+    """Encoded export of the given transcripts, one chunk per READ_BATCH messages"""
+    encode = ENCODERS[export_format]
+    if export_format == "csv":
+        yield ",".join(CSV_COLUMNS) + "\r\n"
+
+    async for selected in _batches(iter(transcripts), SELECT_BATCH):
+        for path, header in selected:
+            if export_format == "markdown":
+                yield _markdown_heading(header)
+            # Branch transcripts start after the shared prefix, so numbering continues from the fork
+            next_seq = (header.get("fork_index") or 0) + 1
+            async for messages in _batches(store.iter_messages(path), READ_BATCH):
+                yield encode(message_rows(header, messages, next_seq))
+                next_seq += len(messages)
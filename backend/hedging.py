@@ -0,0 +1,265 @@
+"""
+Hedged Requests and Provider Failover
+
+A participant turn streams from a chain of candidates: the participant's own
+model followed by its configured fallbacks (e.g. gpt-4.1-mini -> local model).
+- failover: a candidate that errors before its first token is abandoned and
+  the next one in the chain is tried
+- hedging: if the first token has not arrived within a percentile of that
+  model's recent first-token latencies, one backup request is fired at the
+  next candidate (or the same model when there is no fallback); whichever
+  streams first wins and the other request is cancelled
+
+Once a candidate has produced its first token the turn is committed to it;
+an error after that point propagates as before. A candidate that ends without
+any content only wins once no other request is still running.
+
+Every live first token is recorded, including the loser's when both arrive
+together; a request cancelled before its first token is recorded at the time
+it had waited (a lower bound) so hedging does not bias a model's history
+towards its fast responses. Cache replays (streams with a true `replayed`
+attribute) are never recorded.
+
+Configuration (environment):
+- HEDGE_PERCENTILE: latency percentile that triggers the backup (0 disables hedging)
+- HEDGE_MIN_SAMPLES: first-token samples required before a model is hedged
+- HEDGE_HISTORY_SIZE: samples kept per model
+- HEDGE_MIN_DELAY_SECONDS: never hedge earlier than this
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage
+
+logger = logging.getLogger(__name__)
+
+# (candidate, messages) -> provider stream; the response cache's astream in production
+OpenStream = Callable[[Any, List[BaseMessage]], AsyncIterator[Any]]
+
+# (reason, candidate, error) -> None; reason is "failover" or "hedge"
+SwitchCallback = Callable[[str, Any, Optional[BaseException]], Awaitable[None]]
+
+
+def model_key(candidate: Any) -> str:
+    return f"{candidate.provider}:{candidate.model}"
+
+
+class FirstTokenLatencyTracker:
+    """Rolling first-token latency history per provider model."""
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        min_samples: int = 20,
+        history_size: int = 200,
+        min_delay: float = 0.5,
+    ) -> None:
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.history_size = history_size
+        self.min_delay = min_delay
+        self.samples: Dict[str, Deque[float]] = {}
+
+    @classmethod
+    def from_env(cls) -> "FirstTokenLatencyTracker":
+        return cls(
+            percentile=float(os.getenv("HEDGE_PERCENTILE", "0.95")),
+            min_samples=int(os.getenv("HEDGE_MIN_SAMPLES", "20")),
+            history_size=int(os.getenv("HEDGE_HISTORY_SIZE", "200")),
+            min_delay=float(os.getenv("HEDGE_MIN_DELAY_SECONDS", "0.5")),
+        )
+
+    def record(self, key: str, seconds: float) -> None:
+        history = self.samples.get(key)
+        if history is None:
+            history = self.samples[key] = deque(maxlen=self.history_size)
+        history.append(seconds)
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """Seconds to wait for a first token before hedging, or None to never hedge."""
+        history = self.samples.get(key)
+        if self.percentile <= 0 or history is None or len(history) < self.min_samples:
+            return None
+        ordered = sorted(history)
+        return max(self.min_delay, ordered[int(self.percentile * (len(ordered) - 1))])
+
+
+async def _first_chunk(stream: AsyncIterator[Any]) -> Optional[Any]:
+    """First chunk carrying content, or None if the stream ends without any."""
+    while True:
+        try:
+            chunk = await stream.__anext__()
+        except StopAsyncIteration:
+            return None
+        if chunk.content:
+            return chunk
+
+
+async def _close(stream: AsyncIterator[Any]) -> None:
+    try:
+        await stream.aclose()
+    except Exception as e:
+        logger.debug(f"Error closing abandoned stream: {e}")
+
+
+class HedgedStream:
+    """Async iterator over the chunks of whichever candidate streams first."""
+
+    def __init__(
+        self,
+        participant: Any,
+        messages: List[BaseMessage],
+        open_stream: OpenStream,
+        tracker: Optional[FirstTokenLatencyTracker] = None,
+        on_switch: Optional[SwitchCallback] = None,
+    ) -> None:
+        self.candidates = (participant, *getattr(participant, "fallbacks", ()))
+        self.messages = messages
+        self.open_stream = open_stream
+        self.tracker = tracker or first_token_latency
+        self.on_switch = on_switch
+        # Candidate the turn was committed to, set once its first token arrives
+        self.winner: Optional[Any] = None
+        self._chunks = self._run()
+
+    def __aiter__(self) -> "HedgedStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        return await self._chunks.__anext__()
+
+    async def aclose(self) -> None:
+        await self._chunks.aclose()
+
+    async def _notify(self, reason: str, candidate: Any, error: Optional[BaseException] = None) -> None:
+        logger.warning(f"{reason.capitalize()} for {candidate.name}: trying {model_key(candidate)}")
+        if self.on_switch:
+            await self.on_switch(reason, candidate, error)
+
+    async def _run(self) -> AsyncIterator[Any]:
+        pending = list(self.candidates)
+        # first-chunk task -> (candidate, stream, started_at)
+        attempts: Dict[asyncio.Task, Tuple[Any, AsyncIterator[Any], float]] = {}
+        last_error: Optional[BaseException] = None
+        hedged = False
+
+        def launch(candidate: Any) -> None:
+            nonlocal last_error
+            try:
+                stream = self.open_stream(candidate, self.messages)
+            except Exception as e:
+                # e.g. a replay-only cache miss: fails before any request is made
+                last_error = e
+                return
+            task = asyncio.create_task(_first_chunk(stream))
+            attempts[task] = (candidate, stream, time.monotonic())
+
+        async def launch_next(reason: Optional[str]) -> None:
+            while pending and not attempts:
+                candidate = pending.pop(0)
+                if reason:
+                    await self._notify(reason, candidate, last_error)
+                launch(candidate)
+                reason = "failover"
+
+        winner: Optional[Tuple[Any, AsyncIterator[Any], Optional[Any]]] = None
+        empty: Optional[Tuple[Any, AsyncIterator[Any]]] = None
+        try:
+            await launch_next(None)
+            while attempts and winner is None:
+                timeout = None
+                if not hedged and len(attempts) == 1:
+                    candidate, _, started = next(iter(attempts.values()))
+                    delay = self.tracker.hedge_delay(model_key(candidate))
+                    if delay is not None:
+                        timeout = max(0.0, started + delay - time.monotonic())
+
+                done, _ = await asyncio.wait(attempts, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    backup = pending.pop(0) if pending else candidate
+                    await self._notify("hedge", backup)
+                    launch(backup)
+                    continue
+
+                for task in done:
+                    candidate, stream, started = attempts.pop(task)
+                    try:
+                        first = task.result()
+                    except Exception as e:
+                        logger.error(f"{model_key(candidate)} failed before its first token: {e}")
+                        last_error = e
+                        await _close(stream)
+                        continue
+                    if first is None:
+                        # Ended without content: held back while another request may still stream
+                        if empty is None:
+                            empty = (candidate, stream)
+                        else:
+                            await _close(stream)
+                        continue
+                    self._record(candidate, stream, started)
+                    if winner is None:
+                        winner = (candidate, stream, first)
+                    else:
+                        await _close(stream)
+
+                if winner is None and not attempts:
+                    if empty is not None:
+                        winner = (*empty, None)
+                        empty = None
+                    else:
+                        await launch_next("failover")
+
+            if winner is None:
+                raise last_error or RuntimeError("No candidate available")
+
+            candidate, stream, first = winner
+            self.winner = candidate
+            if empty is not None:
+                await _close(empty[1])
+                empty = None
+            for task, (loser, loser_stream, started) in attempts.items():
+                if not task.done():
+                    self._record(loser, loser_stream, started)
+            await self._cancel_attempts(attempts)
+            try:
+                if first is not None:
+                    yield first
+                    async for chunk in stream:
+                        yield chunk
+            finally:
+                await stream.aclose()
+        finally:
+            if empty is not None:
+                await _close(empty[1])
+            await self._cancel_attempts(attempts)
+
+    def _record(self, candidate: Any, stream: AsyncIterator[Any], started: float) -> None:
+        """Record how long a candidate took (or had waited) for its first token."""
+        if not getattr(stream, "replayed", False):
+            self.tracker.record(model_key(candidate), time.monotonic() - started)
+
+    @staticmethod
+    async def _cancel_attempts(attempts: Dict[asyncio.Task, Tuple[Any, AsyncIterator[Any], float]]) -> None:
+        """Cancel losing requests and release their connections."""
+        if not attempts:
+            return
+        for task in attempts:
+            task.cancel()
+        await asyncio.wait(attempts)
+        for task, (_, stream, _) in attempts.items():
+            if not task.cancelled():
+                task.exception()  # retrieved so a loser's failure is not reported as unhandled
+            await _close(stream)
+        attempts.clear()
+
+
+first_token_latency = FirstTokenLatencyTracker.from_env()
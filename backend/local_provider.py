@@ -0,0 +1,241 @@
+"""
+Local OpenAI-compatible Provider
+
+Participants with provider "local" talk to a self-hosted OpenAI-compatible
+server (vLLM, llama.cpp server, Ollama, LM Studio, ...):
+- base URL from the participant's config ("base_url") or LOCAL_LLM_BASE_URL
+- one process-wide httpx client with a keep-alive connection pool shared by
+  every local participant, so turns reuse warm connections
+- optional micro-batching (LOCAL_LLM_BATCH_WINDOW_MS > 0): concurrent turns
+  from many conversations with the same model and sampling settings are
+  grouped into one /completions call with a list of prompts. Batched turns
+  arrive as a single chunk, trading time to first token for server
+  throughput. Prompts carry stop sequences for the next rendered role so a
+  completion cannot run on into an invented user turn. If the server has no
+  list-prompt /completions endpoint (404/405/501), batching is switched off
+  and requests are sent individually through /chat/completions; a 400/422
+  only sends that batch individually.
+
+Configuration (environment):
+- LOCAL_LLM_BASE_URL: server base URL including /v1
+- LOCAL_LLM_API_KEY: sent as bearer token (most local servers ignore it)
+- LOCAL_LLM_MAX_CONNECTIONS: connection pool size
+- LOCAL_LLM_BATCH_WINDOW_MS: how long to gather a batch (0 disables batching)
+- LOCAL_LLM_MAX_BATCH: flush as soon as this many requests are waiting
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Tuple
+
+import httpx
+from langchain_core.messages import AIMessageChunk, BaseMessage
+
+logger = logging.getLogger(__name__)
+
+# Status codes meaning "this server does not accept batched (list) prompts"
+BATCH_UNSUPPORTED_STATUS = (404, 405, 501)
+
+# Status codes meaning "this batch was rejected"; its requests are sent individually
+BATCH_REJECTED_STATUS = (400, 422)
+
+# Role labels used when chat messages are rendered into a completion prompt
+PROMPT_ROLES = {"system": "System", "human": "User", "ai": "Assistant"}
+
+# Stop a completion where the rendered prompt would start a non-assistant turn
+PROMPT_STOP = ("\n\nUser:", "\n\nSystem:")
+
+
+@dataclass(frozen=True, slots=True)
+class LocalSettings:
+    base_url: str = "http://localhost:8080/v1"
+    api_key: str = "not-needed"
+    max_connections: int = 32
+    batch_window_seconds: float = 0.0
+    max_batch: int = 16
+
+    @classmethod
+    def from_env(cls) -> "LocalSettings":
+        return cls(
+            base_url=os.getenv("LOCAL_LLM_BASE_URL", "http://localhost:8080/v1"),
+            api_key=os.getenv("LOCAL_LLM_API_KEY", "not-needed"),
+            max_connections=int(os.getenv("LOCAL_LLM_MAX_CONNECTIONS", "32")),
+            batch_window_seconds=float(os.getenv("LOCAL_LLM_BATCH_WINDOW_MS", "0")) / 1000,
+            max_batch=int(os.getenv("LOCAL_LLM_MAX_BATCH", "16")),
+        )
+
+
+_shared_client: Optional[httpx.AsyncClient] = None
+_batchers: Dict[str, "CompletionBatcher"] = {}
+
+
+def shared_http_client(settings: LocalSettings) -> httpx.AsyncClient:
+    """Process-wide keep-alive client used by every local participant"""
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.max_connections,
+                max_keepalive_connections=settings.max_connections,
+                keepalive_expiry=60.0,
+            ),
+            timeout=httpx.Timeout(120.0, connect=5.0),
+        )
+    return _shared_client
+
+
+def render_prompt(messages: List[BaseMessage]) -> str:
+    """Flatten chat messages into a plain completion prompt"""
+    lines = [f"{PROMPT_ROLES.get(message.type, message.type.title())}: {message.content}" for message in messages]
+    lines.append("Assistant:")
+    return "\n\n".join(lines)
+
+
+class CompletionBatcher:
+    """Groups concurrent requests with identical settings into batched /completions calls."""
+
+    def __init__(self, client: httpx.AsyncClient, settings: LocalSettings, base_url: str) -> None:
+        self.client = client
+        self.settings = settings
+        self.base_url = base_url.rstrip("/")
+        self.supported = True
+        # (model, sorted params) -> requests waiting for the next flush
+        self._pending: Dict[Tuple[str, Tuple], List[Tuple[List[BaseMessage], asyncio.Future]]] = {}
+        self._timers: Dict[Tuple[str, Tuple], asyncio.TimerHandle] = {}
+        self._flushes: set = set()
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.settings.api_key}"}
+
+    async def complete(self, model: str, messages: List[BaseMessage], params: Mapping[str, Any]) -> str:
+        if not self.supported:
+            return await self._chat_single(model, messages, params)
+
+        key = (model, tuple(sorted(params.items())))
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.setdefault(key, [])
+        batch.append((messages, future))
+
+        if len(batch) >= self.settings.max_batch:
+            self._flush_soon(key)
+        elif key not in self._timers:
+            self._timers[key] = asyncio.get_running_loop().call_later(
+                self.settings.batch_window_seconds, self._flush_soon, key
+            )
+        return await future
+
+    def _flush_soon(self, key) -> None:
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if batch:
+            task = asyncio.ensure_future(self._flush(key, batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, key, batch: List[Tuple[List[BaseMessage], asyncio.Future]]) -> None:
+        model, params = key
+        try:
+            response = await self.client.post(
+                f"{self.base_url}/completions",
+                headers=self._headers(),
+                json={
+                    "model": model,
+                    "prompt": [render_prompt(messages) for messages, _ in batch],
+                    "stop": list(PROMPT_STOP),
+                    **dict(params),
+                },
+            )
+            if response.status_code in BATCH_UNSUPPORTED_STATUS + BATCH_REJECTED_STATUS:
+                if response.status_code in BATCH_UNSUPPORTED_STATUS:
+                    logger.warning(f"Local server has no batched completions ({response.status_code}); batching disabled")
+                    self.supported = False
+                else:
+                    logger.warning(f"Local server rejected a batched completion ({response.status_code}); sending it individually")
+                await asyncio.gather(*(self._resolve_single(model, messages, dict(params), future) for messages, future in batch))
+                return
+            response.raise_for_status()
+
+            choices = sorted(response.json()["choices"], key=lambda choice: choice.get("index", 0))
+            logger.debug(f"Batched {len(batch)} local completions for {model}")
+            for (_, future), choice in zip(batch, choices):
+                if not future.done():
+                    future.set_result(choice.get("text", "").lstrip())
+            if len(choices) < len(batch):
+                raise RuntimeError(f"Local server returned {len(choices)} completions for {len(batch)} prompts")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _resolve_single(self, model, messages, params, future: asyncio.Future) -> None:
+        try:
+            result = await self._chat_single(model, messages, params)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
+
+    async def _chat_single(self, model: str, messages: List[BaseMessage], params: Mapping[str, Any]) -> str:
+        response = await self.client.post(
+            f"{self.base_url}/chat/completions",
+            headers=self._headers(),
+            json={
+                "model": model,
+                "messages": [
+                    {"role": {"human": "user", "ai": "assistant"}.get(message.type, message.type),
+                     "content": message.content}
+                    for message in messages
+                ],
+                **params,
+            },
+        )
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+
+class BatchedLocalChatModel:
+    """Minimal chat model facade whose turns go through a CompletionBatcher."""
+
+    def __init__(self, batcher: CompletionBatcher, model: str, params: Mapping[str, Any]) -> None:
+        self.batcher = batcher
+        self.model = model
+        self.params = dict(params)
+
+    def bind(self, **kwargs: Any) -> "BatchedLocalChatModel":
+        return BatchedLocalChatModel(self.batcher, self.model, {**self.params, **kwargs})
+
+    async def astream(self, messages: List[BaseMessage]) -> AsyncIterator[AIMessageChunk]:
+        yield AIMessageChunk(content=await self.batcher.complete(self.model, messages, self.params))
+
+
+def create_local_llm(config: Mapping[str, Any], settings: Optional[LocalSettings] = None,
+                     client: Optional[httpx.AsyncClient] = None):
+    """Provider factory for participants with provider "local" """
+    settings = settings or LocalSettings.from_env()
+    base_url = config["config"].get("base_url") or settings.base_url
+    client = client or shared_http_client(settings)
+    params = {"temperature": config["config"]["temperature"], "max_tokens": config["config"]["max_tokens"]}
+
+    if settings.batch_window_seconds > 0:
+        batcher = _batchers.get(base_url)
+        if batcher is None or batcher.client is not client:
+            batcher = _batchers[base_url] = CompletionBatcher(client, settings, base_url)
+        return BatchedLocalChatModel(batcher, config["model"], params)
+
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model=config["model"],
+        base_url=base_url,
+        api_key=settings.api_key,
+        http_async_client=client,
+        **params,
+    )
@@ -1,24 +1,54 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from sse_starlette.sse import EventSourceResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 import asyncio
 import json
 import logging
 import os
+import uuid
 from dotenv import load_dotenv
-from conversation_graph import conversation_graph
-from adapter import conversation_streamer
-from storage import transcript_store
 
-# Load environment variables
+# Load environment variables before the modules below read their configuration
 load_dotenv()
 
+from adapter import conversation_streamer, encode_frame
+from admission import AdmissionRejected, admission_controller
+from analytics import live_analytics
+from documents import DocumentTooLarge, document_store
+from executor import create_executor
+from export import EXPORT_FORMATS, TranscriptFilter, parse_bound, select_transcripts, stream_export
+from message_index import message_index
+from participant_registry import participant_registry
+from storage import transcript_store
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Conversaition API", version="0.1.0")
+async def publish_event(event):
+    """Single fan-out point for conversation events: admission slots, live analytics and message index, then SSE clients"""
+    await admission_controller.handle_event(event)
+    await live_analytics.handle_event(event)
+    await message_index.handle_event(event)
+    await conversation_streamer.handle_langgraph_event(event)
+
+# Conversations run in-process by default; CONVERSATION_WORKERS > 0 shards them across worker processes
+conversation_executor = create_executor(publish_event)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await conversation_executor.open()
+    admission_controller.start()
+    yield
+    await conversation_streamer.close()
+    await admission_controller.close()
+    await conversation_executor.close()
+
+app = FastAPI(title="Conversaition API", version="0.1.0", lifespan=lifespan)
 
 # Add CORS middleware to allow frontend connections
 app.add_middleware(
@@ -37,36 +67,95 @@ async def root():
 class StartConversationRequest(BaseModel):
     topic: str
     participants: list[str] = ["Alice", "Bob", "Charlie"]
+    documents: list[str] = []  # ids from POST /documents, shared by every participant
+    queue: bool = True  # wait for a free slot (up to ADMISSION_QUEUE_TIMEOUT_SECONDS) instead of a 503
 
 class AddMessageRequest(BaseModel):
     content: str
-
-# Global conversation state
-active_conversation = None
-conversation_task = None
+    conversation_id: Optional[str] = None
+    interrupt: bool = False  # cut the in-flight AI response short
+
+class ParticipantConfigRequest(BaseModel):
+    provider: str
+    model: str
+    system_prompt: str = ""
+    config: dict = {}
+    fallbacks: list[dict] = []  # [{"provider", "model", "config"?}] tried in order
+    tools: list[str] = []  # e.g. ["python"] to run code blocks in the sandbox
+
+class CreateParticipantRequest(ParticipantConfigRequest):
+    name: str
+
+class UpdateParticipantRequest(BaseModel):
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    system_prompt: Optional[str] = None
+    config: Optional[dict] = None
+    fallbacks: Optional[list[dict]] = None
+    tools: Optional[list[str]] = None
+
+class UpdateConversationParticipantsRequest(BaseModel):
+    add: list[str] = []
+    remove: list[str] = []
+    conversation_id: Optional[str] = None
+
+class AttachDocumentsRequest(BaseModel):
+    document_ids: list[str]
+
+class BranchConversationRequest(BaseModel):
+    message_index: int
+    participants: Optional[list[str]] = None
+    queue: bool = True
+
+# Most recently started conversation; control calls without an explicit id target it
+current_conversation_id: Optional[str] = None
+
+def admission_error(error: AdmissionRejected) -> HTTPException:
+    """503 with Retry-After for work refused by admission control"""
+    return HTTPException(status_code=503, detail=error.as_dict(), headers={"Retry-After": str(error.retry_after)})
+
+def resolve_conversation_id(conversation_id: Optional[str]) -> str:
+    """Pick the conversation a control call applies to"""
+    resolved = conversation_id or current_conversation_id
+    if not resolved:
+        raise HTTPException(status_code=400, detail="No active conversation")
+    return resolved
 
 @app.post("/conversation/start")
 async def start_conversation(request: StartConversationRequest):
     """Start a new multi-AI conversation"""
-    global active_conversation, conversation_task
+    global current_conversation_id
 
     try:
-        logger.info(f"Starting conversation with topic: {request.topic}")
+        for document_id in request.documents:
+            document_store.get(document_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        # Set up event callback to connect LangGraph to the streamer
-        async def handle_conversation_event(event):
-            await conversation_streamer.handle_langgraph_event(event)
+    conversation_id = uuid.uuid4().hex
+    try:
+        admission = await admission_controller.admit(conversation_id, wait=request.queue)
+    except AdmissionRejected as e:
+        raise admission_error(e)
 
-        conversation_graph.add_event_callback(handle_conversation_event)
+    try:
+        logger.info(f"Starting conversation {conversation_id} with topic: {request.topic}")
 
-        # Start conversation in background task
-        conversation_task = asyncio.create_task(
-            conversation_graph.start_conversation(request.topic, request.participants)
-        )
+        # Start conversation on the executor (in-process task or owning shard worker)
+        try:
+            await conversation_executor.start(
+                conversation_id, request.topic, request.participants, documents=request.documents
+            )
+        except BaseException:
+            # Also on cancellation, so a start that never ran cannot keep its slot
+            admission_controller.release(conversation_id)
+            raise
+        current_conversation_id = conversation_id
 
         # Broadcast conversation started status event
-        await conversation_streamer.handle_langgraph_event({
+        await publish_event({
             "type": "conversation_status",
+            "conversation_id": conversation_id,
             "data": {
                 "active": True,
                 "paused": False,
@@ -77,33 +166,100 @@ async def start_conversation(request: StartConversationRequest):
 
         return {
             "status": "started",
+            "conversation_id": conversation_id,
             "topic": request.topic,
-            "participants": request.participants
+            "participants": request.participants,
+            "admission": admission
         }
 
     except Exception as e:
         logger.error(f"Error starting conversation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/conversations/{conversation_id}/branches")
+async def branch_conversation(conversation_id: str, request: BranchConversationRequest):
+    """Fork a conversation at a message index into a new, independently running branch"""
+    try:
+        # Branch ids keep the root id as prefix so they are routed to the parent's shard
+        root_id = conversation_id.split(".", 1)[0]
+        branch_id = f"{root_id}.{uuid.uuid4().hex[:8]}"
+        admission = await admission_controller.admit(branch_id, wait=request.queue)
+
+        try:
+            # Indexed before the branch starts so its first committed message lands after the shared prefix
+            message_index.fork(conversation_id, branch_id, request.message_index)
+            branch = await conversation_executor.fork(
+                conversation_id, branch_id, request.message_index, request.participants
+            )
+        except BaseException:
+            # Every failure after admission gives the slot back (an out-of-range index included)
+            message_index.discard(branch_id)
+            admission_controller.release(branch_id)
+            raise
+        logger.info(f"Branched conversation {conversation_id} at message {request.message_index} into {branch_id}")
+
+        await publish_event({
+            "type": "conversation_status",
+            "conversation_id": branch_id,
+            "data": {
+                "active": True,
+                "paused": False,
+                "participants": branch["participants"],
+                "topic": branch["topic"]
+            }
+        })
+
+        return {
+            "status": "started",
+            "conversation_id": branch_id,
+            "branch_of": conversation_id,
+            "message_index": request.message_index,
+            "admission": admission,
+            **branch
+        }
+    except AdmissionRejected as e:
+        raise admission_error(e)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error branching conversation: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/conversation/stream")
-async def stream_conversation():
+async def stream_conversation(conversation_id: Optional[str] = None):
     """
     Stream conversation events to frontend using AI SDK compatible format
+    (one conversation's events if conversation_id is given, otherwise all)
     """
+    try:
+        admission_controller.open_subscriber(conversation_id)
+    except AdmissionRejected as e:
+        raise admission_error(e)
+
+    async def client_stream(client_queue: asyncio.Queue):
+        try:
+            async for payload in conversation_streamer.generate_sse_stream(client_queue):
+                yield payload
+        finally:
+            admission_controller.close_subscriber(conversation_id)
+
     try:
         # Create client queue
         client_queue = asyncio.Queue()
-        conversation_streamer.add_client(client_queue)
+        conversation_streamer.add_client(client_queue, conversation_id)
 
         logger.info("New SSE client connected")
 
         # Return SSE stream
         return EventSourceResponse(
-            conversation_streamer.generate_sse_stream(client_queue),
+            client_stream(client_queue),
             media_type="text/event-stream"
         )
 
     except Exception as e:
+        admission_controller.close_subscriber(conversation_id)
         logger.error(f"Error in conversation stream: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -111,19 +267,25 @@ async def stream_conversation():
 async def add_human_message(request: AddMessageRequest):
     """Add human message to active conversation"""
     try:
+        conversation_id = resolve_conversation_id(request.conversation_id)
+
         # Check if conversation is active
-        if not conversation_graph.is_active():
+        status = await conversation_executor.status(conversation_id)
+        if not status["active"]:
             raise HTTPException(status_code=400, detail="No active conversation")
 
         logger.info(f"Human message: {request.content}")
 
-        # Add human message to conversation state
-        success = conversation_graph.add_human_message_to_state(request.content)
+        # Queue human message; the graph ingests it at the next turn boundary
+        success = await conversation_executor.add_message(
+            conversation_id, request.content, request.interrupt
+        )
 
         if success:
             # Broadcast human message event
-            await conversation_streamer.handle_langgraph_event({
+            await publish_event({
                 "type": "human_message_added",
+                "conversation_id": conversation_id,
                 "data": {
                     "content": request.content,
                     "participant": "Human",
@@ -135,120 +297,448 @@ async def add_human_message(request: AddMessageRequest):
         else:
             raise HTTPException(status_code=400, detail="Failed to add message to conversation")
 
+    except HTTPException:
+        raise
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Conversation not found")
     except Exception as e:
         logger.error(f"Error adding human message: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/conversation/participants")
+async def update_conversation_participants(request: UpdateConversationParticipantsRequest):
+    """Add or remove participants; changes apply at the next turn boundary"""
+    try:
+        conversation_id = resolve_conversation_id(request.conversation_id)
+        success = await conversation_executor.update_participants(
+            conversation_id, request.add, request.remove
+        )
+        if success:
+            return {"status": "queued", "add": request.add, "remove": request.remove}
+        else:
+            raise HTTPException(status_code=400, detail="No active conversation")
+    except HTTPException:
+        raise
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error updating conversation participants: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/conversations/{conversation_id}/documents")
+async def attach_conversation_documents(conversation_id: str, request: AttachDocumentsRequest):
+    """Share uploaded documents with a running conversation from its next turn on"""
+    try:
+        await conversation_executor.attach_documents(conversation_id, request.document_ids)
+        return {"status": "attached", "conversation_id": conversation_id, "document_ids": request.document_ids}
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error attaching documents to {conversation_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/conversation/pause")
-async def pause_conversation():
+async def pause_conversation(conversation_id: Optional[str] = None):
     """Pause the active conversation"""
     try:
-        success = conversation_graph.pause_conversation()
+        conversation_id = resolve_conversation_id(conversation_id)
+        success = await conversation_executor.pause(conversation_id)
         if success:
+            status = await conversation_executor.status(conversation_id)
             # Broadcast pause event
-            await conversation_streamer.handle_langgraph_event({
+            await publish_event({
                 "type": "conversation_paused",
+                "conversation_id": conversation_id,
                 "data": {"message": "Conversation paused"}
             })
             # Broadcast status change event
-            await conversation_streamer.handle_langgraph_event({
+            await publish_event({
                 "type": "conversation_status",
+                "conversation_id": conversation_id,
                 "data": {
                     "active": True,
                     "paused": True,
-                    "participants": conversation_graph.current_participants or ["Alice", "Bob", "Charlie"],
-                    "topic": conversation_graph.current_topic or "Active conversation"
+                    "participants": status["participants"] or ["Alice", "Bob", "Charlie"],
+                    "topic": status["topic"] or "Active conversation"
                 }
             })
             return {"status": "paused", "message": "Conversation has been paused"}
         else:
             raise HTTPException(status_code=400, detail="No active conversation to pause")
+    except HTTPException:
+        raise
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Conversation not found")
     except Exception as e:
         logger.error(f"Error pausing conversation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/conversation/resume")
-async def resume_conversation():
+async def resume_conversation(conversation_id: Optional[str] = None):
     """Resume the paused conversation"""
     try:
-        success = conversation_graph.resume_conversation()
+        conversation_id = resolve_conversation_id(conversation_id)
+        success = await conversation_executor.resume(conversation_id)
         if success:
+            status = await conversation_executor.status(conversation_id)
             # Broadcast resume event
-            await conversation_streamer.handle_langgraph_event({
+            await publish_event({
                 "type": "conversation_resumed",
+                "conversation_id": conversation_id,
                 "data": {"message": "Conversation resumed"}
             })
             # Broadcast status change event
-            await conversation_streamer.handle_langgraph_event({
+            await publish_event({
                 "type": "conversation_status",
+                "conversation_id": conversation_id,
                 "data": {
                     "active": True,
                     "paused": False,
-                    "participants": conversation_graph.current_participants or ["Alice", "Bob", "Charlie"],
-                    "topic": conversation_graph.current_topic or "Active conversation"
+                    "participants": status["participants"] or ["Alice", "Bob", "Charlie"],
+                    "topic": status["topic"] or "Active conversation"
                 }
             })
             return {"status": "resumed", "message": "Conversation has been resumed"}
         else:
             raise HTTPException(status_code=400, detail="No paused conversation to resume")
+    except HTTPException:
+        raise
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Conversation not found")
     except Exception as e:
         logger.error(f"Error resuming conversation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/conversation/interrupt")
+async def interrupt_conversation(conversation_id: Optional[str] = None):
+    """Cut the in-flight AI response short; the conversation carries on with the next turn"""
+    try:
+        conversation_id = resolve_conversation_id(conversation_id)
+        success = await conversation_executor.interrupt(conversation_id)
+        if success:
+            return {"status": "interrupted", "message": "Current response has been interrupted"}
+        else:
+            raise HTTPException(status_code=400, detail="No active conversation to interrupt")
+    except HTTPException:
+        raise
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    except Exception as e:
+        logger.error(f"Error interrupting conversation: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/conversation/stop")
-async def stop_conversation():
+async def stop_conversation(conversation_id: Optional[str] = None):
     """Stop the active conversation and clean up resources"""
-    global conversation_task
+    global current_conversation_id
 
-    if not conversation_graph.is_active() and not conversation_graph.is_paused():
+    conversation_id = resolve_conversation_id(conversation_id)
+    status = await conversation_executor.status(conversation_id)
+    if not status["active"] and not status["paused"]:
         raise HTTPException(status_code=400, detail="No active conversation to stop")
 
     try:
-        snapshot_state = conversation_graph.current_state
-        participants_snapshot = list(conversation_graph.current_participants)
-        topic_snapshot = conversation_graph.current_topic
-
-        stopped = await conversation_graph.stop_conversation()
+        # The owning executor cancels the graph task and persists the transcript
+        stopped = await conversation_executor.stop(conversation_id)
         if not stopped:
             raise HTTPException(status_code=400, detail="No active conversation to stop")
 
-        # Cancel the running LangGraph task if it is still active
-        if conversation_task and not conversation_task.done():
-            conversation_task.cancel()
-            try:
-                await conversation_task
-            except asyncio.CancelledError:
-                logger.info("Conversation task cancelled successfully")
-
-        if snapshot_state:
-            transcript_store.persist(
-                topic=topic_snapshot,
-                participants=participants_snapshot,
-                messages=snapshot_state.get("messages", []),
-            )
-
-        conversation_task = None
-        conversation_graph.clear_state()
+        if current_conversation_id == conversation_id:
+            current_conversation_id = None
 
         return {"status": "stopped", "message": "Conversation has been stopped"}
     except HTTPException:
         raise
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Conversation not found")
     except Exception as e:
         logger.error(f"Error stopping conversation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/conversation/status")
-async def get_conversation_status():
+async def get_conversation_status(conversation_id: Optional[str] = None):
     """Get current conversation status"""
     try:
+        conversation_id = conversation_id or current_conversation_id
+        if not conversation_id:
+            return {"active": False, "paused": False}
+
+        status = await conversation_executor.status(conversation_id)
         return {
-            "active": conversation_graph.is_active(),
-            "paused": conversation_graph.is_paused()
+            "conversation_id": conversation_id,
+            "active": status["active"],
+            "paused": status["paused"],
+            "last_seq": message_index.last_seq(conversation_id),
+            "memory": status.get("memory"),
+            "analytics": live_analytics.snapshot(conversation_id)
         }
     except Exception as e:
         logger.error(f"Error getting conversation status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/metrics/memory")
+async def get_memory_metrics():
+    """Estimated message memory per conversation, resident or spilled to disk"""
+    try:
+        return await conversation_executor.memory_report()
+    except Exception as e:
+        logger.error(f"Error getting memory metrics: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/metrics/admission")
+async def get_admission_metrics():
+    """Conversation slots, start queue, stream subscribers and event-loop lag"""
+    return admission_controller.stats()
+
+@app.get("/metrics/sandbox")
+async def get_sandbox_metrics():
+    """Code-execution sandbox pool: workers, utilisation, run outcomes and queue wait"""
+    try:
+        return await conversation_executor.sandbox_report()
+    except Exception as e:
+        logger.error(f"Error getting sandbox metrics: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/conversations/{conversation_id}/analytics")
+async def get_conversation_analytics(conversation_id: str):
+    """Live per-conversation analytics, maintained incrementally from the event stream"""
+    snapshot = live_analytics.snapshot(conversation_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"No analytics for conversation: {conversation_id}")
+    return snapshot
+
+@app.get("/conversations/{conversation_id}/messages")
+async def get_conversation_messages(
+    conversation_id: str,
+    response: Response,
+    after: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    if_none_match: Optional[str] = Header(None),
+):
+    """Committed messages with seq > after, served from the in-memory message index"""
+    etag = message_index.etag(conversation_id, after, limit)
+    if etag is None:
+        raise HTTPException(status_code=404, detail=f"Unknown conversation: {conversation_id}")
+    if if_none_match and (if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return message_index.page(conversation_id, after, limit)
+
+# WebSocket subprotocols: JSON text frames (same payload as SSE) or msgpack binary frames
+WS_SUBPROTOCOL_JSON = "conversaition.json"
+WS_SUBPROTOCOL_MSGPACK = "conversaition.msgpack"
+
+# In-band control operations: op -> handler(args) reusing the HTTP endpoint logic
+WS_CONTROL_OPS = {
+    "message": lambda args: add_human_message(AddMessageRequest(**args)),
+    "participants": lambda args: update_conversation_participants(UpdateConversationParticipantsRequest(**args)),
+    "pause": lambda args: pause_conversation(args.get("conversation_id")),
+    "resume": lambda args: resume_conversation(args.get("conversation_id")),
+    "interrupt": lambda args: interrupt_conversation(args.get("conversation_id")),
+    "stop": lambda args: stop_conversation(args.get("conversation_id")),
+    "status": lambda args: get_conversation_status(args.get("conversation_id")),
+}
+
+async def run_ws_command(command: dict) -> dict:
+    """Execute one in-band control command and build its reply"""
+    op = command.get("op")
+    reply = {"id": command.get("id"), "op": op}
+    handler = WS_CONTROL_OPS.get(op)
+    if handler is None:
+        return {**reply, "ok": False, "status": 400, "error": f"Unknown operation: {op}"}
+
+    args = {key: value for key, value in command.items() if key not in ("op", "id")}
+    try:
+        return {**reply, "ok": True, "result": await handler(args)}
+    except HTTPException as e:
+        return {**reply, "ok": False, "status": e.status_code, "error": e.detail}
+    except ValidationError as e:
+        return {**reply, "ok": False, "status": 422, "error": str(e)}
+
+def export_response(transcripts, export_format: str, file_stem: str) -> StreamingResponse:
+    media_type, extension = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        stream_export(transcript_store, transcripts, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{file_stem}.{extension}"'},
+    )
+
+@app.get("/conversations/{conversation_id}/export")
+async def export_conversation(
+    conversation_id: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv|markdown)$"),
+):
+    """Stream a stored (stopped) conversation's transcript as NDJSON, CSV or Markdown"""
+    path = await asyncio.to_thread(transcript_store.find, conversation_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="No stored transcript for this conversation")
+    header = await asyncio.to_thread(transcript_store.read_header, path)
+    return export_response([(path, header)], format, conversation_id)
+
+@app.get("/transcripts/export")
+async def export_transcripts(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|markdown)$"),
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    participant: Optional[str] = None,
+):
+    """Stream every stored transcript created in [since, until) (ISO dates, UTC), optionally with a participant"""
+    try:
+        transcript_filter = TranscriptFilter(parse_bound(since), parse_bound(until), participant)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {e}")
+    return export_response(select_transcripts(transcript_store, transcript_filter), format, "transcripts")
+
+@app.websocket("/conversation/ws")
+async def conversation_websocket(websocket: WebSocket, conversation_id: Optional[str] = None):
+    """
+    Event stream and control commands over one connection.
+
+    Events are the same frames /conversation/stream broadcasts (one
+    conversation's events if conversation_id is given, otherwise all); the
+    connection stays open for commands after that conversation ends. Clients send
+    {"op": "pause" | "resume" | "stop" | "interrupt" | "message" | "participants" | "status",
+    "id": <correlation id>, ...arguments} and receive a control-result frame.
+    Per-message compression (permessage-deflate) is negotiated by the server.
+    """
+    offered = websocket.scope.get("subprotocols", [])
+    binary = WS_SUBPROTOCOL_MSGPACK in offered
+    subprotocol = WS_SUBPROTOCOL_MSGPACK if binary else (WS_SUBPROTOCOL_JSON if WS_SUBPROTOCOL_JSON in offered else None)
+    try:
+        admission_controller.open_subscriber(conversation_id)
+    except AdmissionRejected as e:
+        # 1013: try again later
+        await websocket.close(code=1013, reason=e.reason)
+        return
+    await websocket.accept(subprotocol=subprotocol)
+
+    if binary:
+        import ormsgpack
+
+    send_lock = asyncio.Lock()
+
+    async def send_frame(frame):
+        async with send_lock:
+            if binary:
+                await websocket.send_bytes(frame.packed())
+            else:
+                await websocket.send_text(frame.payload)
+
+    async def forward_events(client_queue: asyncio.Queue):
+        while True:
+            frame = await client_queue.get()
+            if frame is None:
+                # Server shutting down
+                await websocket.close(code=1001)
+                return
+            await send_frame(frame)
+
+    client_queue = asyncio.Queue()
+    conversation_streamer.add_client(client_queue, conversation_id)
+    forwarder = asyncio.create_task(forward_events(client_queue))
+    logger.info(f"New WebSocket client connected ({subprotocol or 'json'})")
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            try:
+                if message.get("bytes") is not None:
+                    command = ormsgpack.unpackb(message["bytes"]) if binary else json.loads(message["bytes"])
+                else:
+                    command = json.loads(message["text"])
+            except Exception as e:
+                reply = {"id": None, "op": None, "ok": False, "status": 400, "error": f"Malformed command: {e}"}
+            else:
+                reply = await run_ws_command(command if isinstance(command, dict) else {})
+            await send_frame(encode_frame("control-result", reply))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        forwarder.cancel()
+        conversation_streamer.remove_client(client_queue)
+        admission_controller.close_subscriber(conversation_id)
+        logger.info("WebSocket client disconnected")
+
+@app.post("/documents")
+async def upload_document(request: Request, name: str = Query(..., min_length=1)):
+    """Upload a text document as the raw request body; it is streamed to disk, chunked and indexed once"""
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > document_store.config.max_bytes:
+        raise HTTPException(status_code=413, detail=f"Document exceeds {document_store.config.max_bytes} bytes")
+    try:
+        return await document_store.save(request.stream(), name)
+    except DocumentTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
+@app.get("/documents")
+async def list_documents():
+    """List stored documents"""
+    return {"documents": document_store.list()}
+
+@app.get("/documents/{document_id}")
+async def get_document(document_id: str):
+    """Get a stored document's size and chunking"""
+    try:
+        return document_store.get(document_id).info()
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.delete("/documents/{document_id}")
+async def delete_document(document_id: str):
+    """Delete a stored document"""
+    try:
+        document_store.delete(document_id)
+        return {"status": "deleted", "document_id": document_id}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.get("/participants")
+async def list_participants():
+    """List the reusable participant pool"""
+    return participant_registry.list()
+
+@app.get("/participants/{name}")
+async def get_participant(name: str):
+    """Get one participant from the pool"""
+    try:
+        return participant_registry.get(name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.post("/participants")
+async def create_participant(request: CreateParticipantRequest):
+    """Add a participant to the pool"""
+    try:
+        return participant_registry.create(request.name, request.model_dump(exclude={"name"}))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.put("/participants/{name}")
+async def update_participant(name: str, request: UpdateParticipantRequest):
+    """Edit a participant; running conversations pick it up on its next turn"""
+    try:
+        return participant_registry.update(name, request.model_dump(exclude_none=True))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.delete("/participants/{name}")
+async def delete_participant(name: str):
+    """Remove a participant from the pool"""
+    try:
+        participant_registry.delete(name)
+        return {"status": "deleted", "name": name}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "message": "Backend is running"}
@@ -0,0 +1,86 @@
+"""
+Incremental @mention detection
+
+Participants address each other with `@Name`. Rather than rescanning the full
+response once it has finished, StreamingMentionDetector is fed chunks as they
+arrive so the scheduler learns the preferred next speaker while the current
+turn is still streaming. Mentions split across chunk boundaries ("@Cha" +
+"rlie") are carried over to the next chunk.
+"""
+
+import re
+from typing import FrozenSet, Iterable, Optional, Tuple
+
+MENTION_PATTERN = re.compile(r"@([A-Za-z0-9_-]+)")
+_NAME_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-")
+
+
+class ParticipantNameIndex:
+    """Set of mentionable names, rebuilt only when the participant list changes."""
+
+    __slots__ = ("_key", "names")
+
+    def __init__(self) -> None:
+        self._key: Tuple[str, ...] = ()
+        self.names: FrozenSet[str] = frozenset()
+
+    def resolve(self, participants: Iterable[str]) -> FrozenSet[str]:
+        key = tuple(participants)
+        if key != self._key:
+            self._key = key
+            self.names = frozenset(key)
+        return self.names
+
+
+class StreamingMentionDetector:
+    """Finds the first @mention of a known participant across a stream of chunks."""
+
+    __slots__ = ("_names", "_exclude", "_carry", "target")
+
+    def __init__(self, names: FrozenSet[str], exclude: Optional[str] = None) -> None:
+        self._names = names
+        self._exclude = exclude
+        self._carry = ""
+        self.target: Optional[str] = None
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Scan one chunk; returns the detected target (once found, scanning stops)."""
+        if self.target is not None or not chunk:
+            return self.target
+
+        text = self._carry + chunk
+        self._carry = ""
+
+        # A mention running to the end of the chunk may continue in the next one
+        at = text.rfind("@")
+        if at != -1 and all(char in _NAME_CHARS for char in text[at + 1:]):
+            self._carry = text[at:]
+            text = text[:at]
+
+        self._scan(text)
+        return self.target
+
+    def flush(self) -> Optional[str]:
+        """Resolve any mention held back at the end of the stream."""
+        if self.target is None and self._carry:
+            self._scan(self._carry)
+        self._carry = ""
+        return self.target
+
+    def _scan(self, text: str) -> None:
+        if "@" not in text:
+            return
+        for match in MENTION_PATTERN.finditer(text):
+            name = match.group(1)
+            if name in self._names and name != self._exclude:
+                self.target = name
+                return
+
+
+def find_mention(content: Optional[str], names: FrozenSet[str], exclude: Optional[str] = None) -> Optional[str]:
+    """Detect the first valid mention in a complete message."""
+    if not content:
+        return None
+    detector = StreamingMentionDetector(names, exclude)
+    detector.feed(content)
+    return detector.flush()
@@ -0,0 +1,116 @@
+"""
+In-memory Conversation Message Index
+
+Committed messages are indexed per conversation as they are announced on the
+event stream (messages_committed), so snapshot requests never touch graph
+state. Every message has a stable sequence number: its 1-based position in the
+conversation. Branches share their parent's indexed prefix copy-on-write, the
+same way their message logs do, so sequence numbers below the fork point are
+identical in parent and branch.
+
+Pages are addressed by (after, limit). The conversation is append-only, so a
+page only changes while it is not yet full; its ETag is the highest sequence
+number it can contain at the moment, which lets late-joining viewers poll with
+If-None-Match and receive 304 until new messages arrive.
+
+Conversations that have ended (conversation_end or conversation_finished) stay
+indexed for late viewers, but only the MESSAGE_INDEX_RETAIN_ENDED most
+recently ended ones; older ones are dropped (their transcripts are on disk).
+
+Configuration (environment):
+- MESSAGE_INDEX_RETAIN_ENDED: ended conversations kept in the index
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional
+
+from branching import MessageLog
+
+logger = logging.getLogger(__name__)
+
+# Events after which a conversation commits no further messages (except a stopped response's tail)
+ENDING_EVENTS = frozenset({"conversation_end", "conversation_finished"})
+
+
+class MessageIndex:
+    """Sequence-numbered committed messages per conversation."""
+
+    def __init__(self, retain_ended: Optional[int] = None) -> None:
+        self.conversations: Dict[str, MessageLog] = {}
+        self.retain_ended = int(os.getenv("MESSAGE_INDEX_RETAIN_ENDED", "100")) if retain_ended is None else retain_ended
+        # Ended conversations still indexed, least recently ended first
+        self.ended: OrderedDict[str, None] = OrderedDict()
+
+    async def handle_event(self, event: Mapping[str, Any]) -> None:
+        event_type = event.get("type")
+        if event_type in ENDING_EVENTS:
+            self.end(event.get("conversation_id"))
+            return
+        if event_type != "messages_committed":
+            return
+        data = event["data"]
+        self.append(event.get("conversation_id"), data["first_seq"], data["messages"])
+
+    def end(self, conversation_id: str) -> None:
+        """Mark a conversation ended, dropping the oldest ended ones beyond retain_ended"""
+        if conversation_id not in self.conversations:
+            return
+        self.ended[conversation_id] = None
+        self.ended.move_to_end(conversation_id)
+        while len(self.ended) > self.retain_ended:
+            evicted, _ = self.ended.popitem(last=False)
+            # Branches keep their own reference to any prefix they share with it
+            self.conversations.pop(evicted, None)
+
+    def append(self, conversation_id: str, first_seq: int, messages: List[Mapping[str, Any]]) -> None:
+        log = self.conversations.get(conversation_id, MessageLog())
+        if first_seq != len(log) + 1:
+            # Indexed from the live stream only; a gap means events were missed
+            logger.warning(
+                f"Message index for {conversation_id} expected seq {len(log) + 1}, got {first_seq}"
+            )
+            if first_seq <= len(log):
+                return
+        entries = [{"seq": first_seq + offset, **message} for offset, message in enumerate(messages)]
+        self.conversations[conversation_id] = log + entries
+
+    def fork(self, conversation_id: str, branch_id: str, message_index: int) -> None:
+        """Index a branch as sharing the first message_index messages of its parent"""
+        parent = self.conversations.get(conversation_id, MessageLog())
+        self.conversations[branch_id] = parent.fork(min(message_index, len(parent)))
+
+    def page(self, conversation_id: str, after: int = 0, limit: int = 100) -> Optional[Dict[str, Any]]:
+        """Messages with seq > after, at most limit of them; None for unknown conversations"""
+        log = self.conversations.get(conversation_id)
+        if log is None:
+            return None
+        total = len(log)
+        start = max(after, 0)
+        messages = log[start:start + limit]
+        return {
+            "conversation_id": conversation_id,
+            "messages": messages,
+            "total": total,
+            "next_after": messages[-1]["seq"] if messages else start,
+            "has_more": start + limit < total,
+        }
+
+    def etag(self, conversation_id: str, after: int = 0, limit: int = 100) -> Optional[str]:
+        log = self.conversations.get(conversation_id)
+        if log is None:
+            return None
+        return f'"{conversation_id}-{min(len(log), max(after, 0) + limit)}"'
+
+    def last_seq(self, conversation_id: str) -> int:
+        return len(self.conversations.get(conversation_id, ()))
+
+    def discard(self, conversation_id: str) -> None:
+        self.conversations.pop(conversation_id, None)
+        self.ended.pop(conversation_id, None)
+
+
+message_index = MessageIndex()
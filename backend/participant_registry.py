@@ -0,0 +1,238 @@
+"""
+Participant Pool Registry
+
+CRUD over the reusable participant pool, persisted to local storage. The
+built-in PARTICIPANTS seed the pool the first time it is created.
+
+Each participant is compiled once into an immutable CompiledParticipant
+holding the resolved LLM client, the prompt prefix and the token budget, so
+a conversation turn is a single cache hit. A participant may list fallbacks
+(provider/model pairs, inheriting its prompt and settings) that are compiled
+alongside it and used for failover and hedged requests. Tools a participant
+may use (e.g. "python", see sandbox.py) add their instructions to the prompt
+prefix. Editing or deleting a participant
+invalidates its compiled object; the pool file's mtime is checked so edits
+made by another process (e.g. the API process while a shard worker runs the
+conversation) are picked up as well.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import os
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from participants import PARTICIPANTS, create_llm
+from providers import PROVIDERS
+from sandbox import TOOL_PROMPTS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledParticipant:
+    """Runtime view of a participant, built once per configuration version."""
+
+    name: str
+    provider: str
+    model: str
+    prompt_prefix: Tuple[BaseMessage, ...]
+    temperature: float
+    max_tokens: int
+    llm: Any
+    fallbacks: Tuple["CompiledParticipant", ...] = ()
+    tools: Tuple[str, ...] = ()
+
+
+class ParticipantRegistry:
+    """Reusable participant pool backed by a JSON file."""
+
+    def __init__(self, pool_path: Path | None = None) -> None:
+        self.pool_path = pool_path or Path(__file__).resolve().parent.parent / "data" / "participants.json"
+        self._pool: Dict[str, Dict[str, Any]] = {}
+        self._compiled: Dict[str, CompiledParticipant] = {}
+        self._pool_mtime: float | None = None
+        self._load()
+
+    def _load(self) -> None:
+        if self.pool_path.exists():
+            self._pool = json.loads(self.pool_path.read_text())
+            self._pool_mtime = self.pool_path.stat().st_mtime
+        else:
+            self._pool = copy.deepcopy(PARTICIPANTS)
+            self._persist()
+        self._compiled.clear()
+
+    def _persist(self) -> None:
+        self.pool_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.pool_path.with_suffix(".json.tmp")
+        temp_path.write_text(json.dumps(self._pool, ensure_ascii=True, indent=2))
+        os.replace(temp_path, self.pool_path)
+        self._pool_mtime = self.pool_path.stat().st_mtime
+
+    def _refresh_if_changed(self) -> None:
+        try:
+            mtime = self.pool_path.stat().st_mtime
+        except FileNotFoundError:
+            return
+        if mtime != self._pool_mtime:
+            logger.info("Participant pool changed on disk, reloading")
+            self._load()
+
+    @staticmethod
+    def _validate_model(config: Mapping[str, Any]) -> None:
+        provider = config.get("provider")
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unsupported provider: {provider}")
+        if not config.get("model"):
+            raise ValueError("Participant model is required")
+
+    def _validate(self, config: Mapping[str, Any]) -> Dict[str, Any]:
+        self._validate_model(config)
+
+        settings = dict(config.get("config") or {})
+        settings.setdefault("temperature", 0.7)
+        settings.setdefault("max_tokens", 250)
+
+        fallbacks = []
+        for fallback in config.get("fallbacks") or []:
+            self._validate_model(fallback)
+            fallbacks.append({
+                "provider": fallback["provider"],
+                "model": fallback["model"],
+                "config": dict(fallback.get("config") or {}),
+            })
+
+        tools = list(dict.fromkeys(config.get("tools") or []))
+        for tool in tools:
+            if tool not in TOOL_PROMPTS:
+                raise ValueError(f"Unsupported tool: {tool}")
+
+        validated = {
+            "provider": config["provider"],
+            "model": config["model"],
+            "system_prompt": config.get("system_prompt", ""),
+            "config": settings,
+        }
+        if fallbacks:
+            validated["fallbacks"] = fallbacks
+        if tools:
+            validated["tools"] = tools
+        return validated
+
+    def list(self) -> Dict[str, Dict[str, Any]]:
+        """Get all participant configurations in the pool"""
+        self._refresh_if_changed()
+        return copy.deepcopy(self._pool)
+
+    def providers_in_use(self) -> List[str]:
+        """Providers referenced by the pool, fallbacks included"""
+        self._refresh_if_changed()
+        providers = []
+        for config in self._pool.values():
+            providers.append(config["provider"])
+            providers.extend(fallback["provider"] for fallback in config.get("fallbacks", []))
+        return list(dict.fromkeys(providers))
+
+    def tools_in_use(self) -> List[str]:
+        """Tools enabled for at least one participant in the pool"""
+        self._refresh_if_changed()
+        return list(dict.fromkeys(tool for config in self._pool.values() for tool in config.get("tools", [])))
+
+    def get(self, name: str) -> Dict[str, Any]:
+        """Get a participant configuration"""
+        self._refresh_if_changed()
+        if name not in self._pool:
+            raise ValueError(f"Unknown participant: {name}")
+        return copy.deepcopy(self._pool[name])
+
+    def create(self, name: str, config: Mapping[str, Any]) -> Dict[str, Any]:
+        """Add a new participant to the pool"""
+        self._refresh_if_changed()
+        if name in self._pool:
+            raise ValueError(f"Participant already exists: {name}")
+        self._pool[name] = self._validate(config)
+        self._persist()
+        return self.get(name)
+
+    def update(self, name: str, changes: Mapping[str, Any]) -> Dict[str, Any]:
+        """Edit a participant; its compiled runtime object is rebuilt on next use"""
+        self._refresh_if_changed()
+        if name not in self._pool:
+            raise ValueError(f"Unknown participant: {name}")
+
+        merged = {**self._pool[name], **changes}
+        merged["config"] = {**self._pool[name].get("config", {}), **(changes.get("config") or {})}
+        self._pool[name] = self._validate(merged)
+        self._compiled.pop(name, None)
+        self._persist()
+        return self.get(name)
+
+    def delete(self, name: str) -> None:
+        """Remove a participant from the pool"""
+        self._refresh_if_changed()
+        if name not in self._pool:
+            raise ValueError(f"Unknown participant: {name}")
+        del self._pool[name]
+        self._compiled.pop(name, None)
+        self._persist()
+
+    def compiled(self, name: str) -> CompiledParticipant:
+        """Get the compiled runtime object for a participant, building it on first use"""
+        self._refresh_if_changed()
+        compiled = self._compiled.get(name)
+        if compiled is not None:
+            return compiled
+
+        if name not in self._pool:
+            raise ValueError(f"Unknown participant: {name}")
+
+        config = self._pool[name]
+        instructions = [config["system_prompt"], *(TOOL_PROMPTS[tool] for tool in config.get("tools", []))]
+        prompt_prefix = (HumanMessage(content="\n\n".join(text for text in instructions if text)),)
+        compiled = self._compile(name, config, prompt_prefix)
+
+        fallbacks = []
+        for fallback in config.get("fallbacks", []):
+            fallback_config = {**config, **fallback, "config": {**config["config"], **fallback["config"]}}
+            try:
+                fallbacks.append(self._compile(name, fallback_config, prompt_prefix))
+            except Exception as e:
+                # A misconfigured fallback must not take the primary model down with it
+                logger.warning(f"Skipping fallback {fallback['provider']}:{fallback['model']} for {name}: {e}")
+
+        if fallbacks:
+            compiled = replace(compiled, fallbacks=tuple(fallbacks))
+        self._compiled[name] = compiled
+        return compiled
+
+    @staticmethod
+    def _compile(
+        name: str, config: Mapping[str, Any], prompt_prefix: Tuple[BaseMessage, ...]
+    ) -> CompiledParticipant:
+        return CompiledParticipant(
+            name=name,
+            provider=config["provider"],
+            model=config["model"],
+            prompt_prefix=prompt_prefix,
+            temperature=config["config"]["temperature"],
+            max_tokens=config["config"]["max_tokens"],
+            llm=create_llm(config),
+            tools=tuple(config.get("tools", ())),
+        )
+
+    def prewarm(self, name: str) -> None:
+        """Compile a participant ahead of its turn, ignoring failures"""
+        try:
+            self.compiled(name)
+        except Exception as e:
+            logger.warning(f"Could not pre-warm participant {name}: {e}")
+
+
+participant_registry = ParticipantRegistry()
@@ -7,11 +7,9 @@ This module defines the three core AI participants for the MVP:
 - Charlie: Devil's advocate, contrarian (Gemini)
 """
 
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain_google_genai import ChatGoogleGenerativeAI
 from typing import Dict, Any
-import os
+
+from providers import get_provider
 
 PARTICIPANTS = {
     "Alice": {
@@ -73,36 +71,17 @@ In conversations with other AI participants and humans:
     }
 }
 
+def create_llm(config: Dict[str, Any]):
+    """Create LangChain LLM instance from a participant configuration"""
+    # The provider's SDK is imported here on first use, not at module load
+    return get_provider(config["provider"]).create(config)
+
 def create_participant_llm(participant_name: str):
     """Create LangChain LLM instance for a participant"""
     if participant_name not in PARTICIPANTS:
         raise ValueError(f"Unknown participant: {participant_name}")
 
-    config = PARTICIPANTS[participant_name]
-
-    if config["provider"] == "openai":
-        return ChatOpenAI(
-            model=config["model"],
-            temperature=config["config"]["temperature"],
-            max_tokens=config["config"]["max_tokens"],
-            api_key=os.getenv("OPENAI_API_KEY")
-        )
-    elif config["provider"] == "anthropic":
-        return ChatAnthropic(
-            model=config["model"],
-            temperature=config["config"]["temperature"],
-            max_tokens=config["config"]["max_tokens"],
-            api_key=os.getenv("ANTHROPIC_API_KEY")
-        )
-    elif config["provider"] == "gemini":
-        return ChatGoogleGenerativeAI(
-            model=config["model"],
-            temperature=config["config"]["temperature"],
-            max_output_tokens=config["config"]["max_tokens"],
-            api_key=os.getenv("GOOGLE_API_KEY")
-        )
-    else:
-        raise ValueError(f"Unsupported provider: {config['provider']}")
+    return create_llm(PARTICIPANTS[participant_name])
 
 def get_participant_info(participant_name: str) -> Dict[str, Any]:
     """Get participant configuration info"""
@@ -0,0 +1,113 @@
+"""
+LLM Provider Plugins
+
+Providers are registered by name and their LangChain integration is imported
+only when a participant first needs it, so a worker whose pool uses a single
+provider never pays for the other SDKs. After startup the providers the pool
+actually uses (and the conversation graph) are pre-warmed on a background
+thread so the first turn does not pay for the import either.
+
+Usage:
+    python providers.py --report   # cold import time of every provider, in fresh interpreters
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class ProviderPlugin:
+    """How to build a chat model for one provider, resolved on first use."""
+
+    name: str
+    module: str
+    class_name: str
+    api_key_env: str
+    max_tokens_param: str = "max_tokens"
+    # class_name names a factory taking the participant config instead of a chat model class
+    factory: bool = False
+
+    def load(self) -> Any:
+        """Import the integration module and return its chat model class (or factory)"""
+        return getattr(importlib.import_module(self.module), self.class_name)
+
+    def create(self, config: Mapping[str, Any]) -> Any:
+        if self.factory:
+            return self.load()(config)
+        chat_model = self.load()
+        return chat_model(**{
+            "model": config["model"],
+            "temperature": config["config"]["temperature"],
+            self.max_tokens_param: config["config"]["max_tokens"],
+            "api_key": os.getenv(self.api_key_env),
+        })
+
+
+PROVIDERS: Dict[str, ProviderPlugin] = {}
+
+
+def register_provider(plugin: ProviderPlugin) -> None:
+    PROVIDERS[plugin.name] = plugin
+
+
+def get_provider(name: str) -> ProviderPlugin:
+    plugin = PROVIDERS.get(name)
+    if plugin is None:
+        raise ValueError(f"Unsupported provider: {name}")
+    return plugin
+
+
+register_provider(ProviderPlugin("openai", "langchain_openai", "ChatOpenAI", "OPENAI_API_KEY"))
+register_provider(ProviderPlugin("anthropic", "langchain_anthropic", "ChatAnthropic", "ANTHROPIC_API_KEY"))
+register_provider(ProviderPlugin(
+    "gemini", "langchain_google_genai", "ChatGoogleGenerativeAI", "GOOGLE_API_KEY",
+    max_tokens_param="max_output_tokens",
+))
+# Self-hosted OpenAI-compatible servers (see local_provider.py)
+register_provider(ProviderPlugin("local", "local_provider", "create_local_llm", "LOCAL_LLM_API_KEY", factory=True))
+
+
+def prewarm(provider_names: Iterable[str], modules: Iterable[str] = ()) -> None:
+    """Import provider integrations and other heavy modules ahead of first use (blocking)"""
+    targets = [get_provider(name).module for name in dict.fromkeys(provider_names) if name in PROVIDERS]
+    for module in [*targets, *modules]:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            logger.warning(f"Could not pre-warm {module}: {e}")
+            continue
+        logger.info(f"Pre-warmed {module} in {time.perf_counter() - started:.2f}s")
+
+
+def _cold_import_seconds(module: str) -> float:
+    script = f"import time; started = time.perf_counter(); import {module}; print(time.perf_counter() - started)"
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, cwd=Path(__file__).resolve().parent
+    )
+    return round(float(result.stdout.strip().splitlines()[-1]), 3) if result.returncode == 0 else float("nan")
+
+
+def import_report(modules: Iterable[str] = ("conversation_graph", "main")) -> Dict[str, float]:
+    """Cold import time per provider integration and per app module, each in a fresh interpreter"""
+    report = {plugin.module: _cold_import_seconds(plugin.module) for plugin in PROVIDERS.values()}
+    for module in modules:
+        report[module] = _cold_import_seconds(module)
+    return report
+
+
+if __name__ == "__main__":
+    if "--report" in sys.argv[1:]:
+        for module, seconds in import_report().items():
+            print(f"{module:28} {seconds:.3f}s")
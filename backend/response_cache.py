@@ -0,0 +1,201 @@
+"""
+Content-addressed LLM response cache with record/replay
+
+Responses are keyed on a hash of the participant configuration plus the
+normalized prompt and stored on local disk, one JSON file per entry, with TTL
+expiry and LRU eviction. Cached responses are replayed chunk by chunk with the
+recorded inter-chunk timing so the SSE path behaves exactly like a live call.
+
+Modes (LLM_CACHE_MODE):
+- off: always call the provider (default)
+- readwrite: replay hits, record misses
+- record: always call the provider and overwrite the entry
+- replay: replay-only; a miss raises CacheMissError instead of calling out
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterable, List, Optional, Tuple
+
+from langchain_core.messages import AIMessageChunk, BaseMessage
+
+logger = logging.getLogger(__name__)
+
+CACHE_MODES = ("off", "readwrite", "record", "replay")
+
+
+class CacheMissError(RuntimeError):
+    """Raised in replay-only mode when a prompt has no recorded response."""
+
+
+class ReplayStream:
+    """A cached response stream; `replayed` keeps it out of first-token latency history."""
+
+    replayed = True
+
+    def __init__(self, chunks: AsyncIterator[AIMessageChunk]) -> None:
+        self._chunks = chunks
+
+    def __aiter__(self) -> "ReplayStream":
+        return self
+
+    async def __anext__(self) -> AIMessageChunk:
+        return await self._chunks.__anext__()
+
+    async def aclose(self) -> None:
+        await self._chunks.aclose()
+
+
+class ResponseCache:
+    """Local record/replay cache for streamed participant responses."""
+
+    def __init__(
+        self,
+        base_directory: Path | None = None,
+        mode: str = "off",
+        ttl_seconds: float = 86400.0,
+        max_entries: int = 1000,
+        replay_speed: float = 1.0,
+    ) -> None:
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unsupported cache mode: {mode}")
+        self.mode = mode
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.replay_speed = replay_speed
+        self.base_path = base_directory or Path(__file__).resolve().parent.parent / "data" / "response_cache"
+        # key -> created_at, ordered from least to most recently used
+        self._index: "OrderedDict[str, float]" = OrderedDict()
+        self._index_loaded = False
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        return cls(
+            mode=os.getenv("LLM_CACHE_MODE", "off"),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400")),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000")),
+            replay_speed=float(os.getenv("LLM_CACHE_REPLAY_SPEED", "1.0")),
+        )
+
+    @staticmethod
+    def _normalize(content: Any) -> str:
+        if not isinstance(content, str):
+            content = json.dumps(content, sort_keys=True)
+        return " ".join(content.split())
+
+    def key_for(self, participant: Any, messages: Iterable[BaseMessage]) -> str:
+        """Hash of participant config plus the normalized prompt."""
+        payload = {
+            "provider": participant.provider,
+            "model": participant.model,
+            "temperature": participant.temperature,
+            "max_tokens": participant.max_tokens,
+            "messages": [[message.type, self._normalize(message.content)] for message in messages],
+        }
+        encoded = json.dumps(payload, ensure_ascii=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.base_path / key[:2] / f"{key}.json"
+
+    def _load_index(self) -> None:
+        if self._index_loaded:
+            return
+        self._index_loaded = True
+        if not self.base_path.exists():
+            return
+
+        entries = []
+        for path in self.base_path.glob("*/*.json"):
+            stat = path.stat()
+            # Oldest access first so the LRU order survives a restart
+            entries.append((stat.st_atime, path.stem, stat.st_mtime))
+        for _, key, created_at in sorted(entries):
+            self._index[key] = created_at
+
+    def _evict(self, key: str) -> None:
+        self._index.pop(key, None)
+        try:
+            self._entry_path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def lookup(self, key: str) -> Optional[List[Tuple[float, str]]]:
+        """Return recorded (offset_seconds, text) chunks, or None on a miss."""
+        self._load_index()
+        created_at = self._index.get(key)
+        if created_at is None:
+            return None
+        if time.time() - created_at > self.ttl_seconds:
+            self._evict(key)
+            return None
+
+        try:
+            entry = json.loads(self._entry_path(key).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._evict(key)
+            return None
+
+        self._index.move_to_end(key)
+        return [(offset, text) for offset, text in entry["chunks"]]
+
+    def store(self, key: str, chunks: List[Tuple[float, str]]) -> None:
+        self._load_index()
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"chunks": chunks}, ensure_ascii=True))
+
+        self._index[key] = time.time()
+        self._index.move_to_end(key)
+        while len(self._index) > self.max_entries:
+            oldest_key = next(iter(self._index))
+            self._evict(oldest_key)
+
+    def astream(self, participant: Any, messages: List[BaseMessage]) -> AsyncIterator[Any]:
+        """Stream a participant response through the cache according to the mode."""
+        if self.mode == "off":
+            return participant.llm.astream(messages)
+
+        key = self.key_for(participant, messages)
+        if self.mode != "record":
+            chunks = self.lookup(key)
+            if chunks is not None:
+                return ReplayStream(self._replay(chunks))
+            if self.mode == "replay":
+                raise CacheMissError(f"No cached response for {participant.name} ({key[:12]})")
+
+        return self._record(key, participant.llm.astream(messages))
+
+    async def _replay(self, chunks: List[Tuple[float, str]]) -> AsyncIterator[AIMessageChunk]:
+        previous_offset = 0.0
+        for offset, text in chunks:
+            delay = (offset - previous_offset) * self.replay_speed
+            previous_offset = offset
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield AIMessageChunk(content=text)
+
+    async def _record(self, key: str, stream: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        started = time.monotonic()
+        recorded: List[Tuple[float, str]] = []
+        try:
+            async for chunk in stream:
+                if chunk.content:
+                    recorded.append((round(time.monotonic() - started, 4), chunk.content))
+                yield chunk
+        finally:
+            await stream.aclose()
+
+        # Only complete responses are cached; cancelled streams never reach this point
+        self.store(key, recorded)
+
+
+response_cache = ResponseCache.from_env()
@@ -0,0 +1,403 @@
+"""
+Warm Sandbox Pool for the Code-Execution Tool
+
+Participants with the "python" tool can run the fenced ```python blocks of
+their responses. Starting an interpreter per call would add the interpreter
+start-up to every turn, so code runs on a pool of pre-started worker
+processes (sandbox_worker.py):
+- each worker runs in isolated mode (python -I) with an address-space cap,
+  a per-run CPU-time cap, a file-size cap and no core dumps
+- a run that exceeds SANDBOX_WALL_SECONDS (e.g. sleeping rather than
+  computing) or crashes its worker gets the worker killed and replaced
+- workers are recycled after SANDBOX_MAX_RUNS runs, so state leaked through
+  imported modules does not accumulate
+- output is streamed back line by line while the code runs
+- workers get a minimal environment (none of the server's variables, so no
+  provider API keys) and a throwaway working and home directory of their
+  own, removed with the worker; with SANDBOX_USER set they also run as that
+  (unprivileged) user
+- the pool starts all of its workers or none; if no worker is left and none
+  can be replaced, waiting runs fail and the next run starts the pool again
+
+Apart from SANDBOX_USER these are resource limits, not a security boundary:
+submitted code can still read whatever files the worker's user can. Pool
+utilisation and queue wait time are reported by stats().
+
+Configuration (environment):
+- SANDBOX_WORKERS: pool size (0 disables the tool)
+- SANDBOX_MAX_RUNS: runs per worker before it is recycled
+- SANDBOX_CPU_SECONDS, SANDBOX_WALL_SECONDS: per-run CPU and wall-clock limits
+- SANDBOX_MEMORY_MB: address-space limit per worker
+- SANDBOX_MAX_OUTPUT_BYTES: output kept per run
+- SANDBOX_PRELOAD: modules imported by every worker at start-up
+- SANDBOX_USER: user name or uid the workers run as (the server must be allowed to switch to it)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from analytics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = Path(__file__).resolve().parent / "sandbox_worker.py"
+
+# Tool name -> instruction appended to the system prompt of participants that have it
+TOOL_PROMPTS: Dict[str, str] = {
+    "python": (
+        "You can run Python code: put it in a fenced ```python block and it will be executed after your "
+        "message, with its output shared in the conversation. Use print() to show results."
+    ),
+}
+
+DEFAULT_PRELOAD = "math,json,re,itertools,collections,statistics,random,datetime"
+
+CODE_BLOCK = re.compile(r"```(?:python|py)[ \t]*\r?\n(.*?)```", re.DOTALL)
+
+# Output frames from the worker are forwarded as (stream, text)
+OutputCallback = Callable[[str, str], Awaitable[None]]
+
+
+def extract_code_blocks(content: str, limit: int) -> List[str]:
+    """The first `limit` non-empty fenced python blocks of a message"""
+    blocks = [block for block in CODE_BLOCK.findall(content) if block.strip()]
+    return blocks[:limit]
+
+
+@dataclass(frozen=True, slots=True)
+class SandboxConfig:
+    workers: int = 2
+    max_runs: int = 50
+    cpu_seconds: int = 5
+    wall_seconds: float = 10.0
+    memory_bytes: int = 512 * 1024 * 1024
+    file_bytes: int = 10 * 1024 * 1024
+    max_output_bytes: int = 16 * 1024
+    max_blocks_per_message: int = 2
+    preload: str = DEFAULT_PRELOAD
+    user: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "SandboxConfig":
+        return cls(
+            workers=int(os.getenv("SANDBOX_WORKERS", "2")),
+            max_runs=int(os.getenv("SANDBOX_MAX_RUNS", "50")),
+            cpu_seconds=int(os.getenv("SANDBOX_CPU_SECONDS", "5")),
+            wall_seconds=float(os.getenv("SANDBOX_WALL_SECONDS", "10")),
+            memory_bytes=int(float(os.getenv("SANDBOX_MEMORY_MB", "512")) * 1024 * 1024),
+            max_output_bytes=int(os.getenv("SANDBOX_MAX_OUTPUT_BYTES", str(16 * 1024))),
+            preload=os.getenv("SANDBOX_PRELOAD", DEFAULT_PRELOAD),
+            user=os.getenv("SANDBOX_USER") or None,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+
+@dataclass(slots=True)
+class SandboxResult:
+    status: str  # ok | error | timeout | cpu_limit | memory_limit | crashed
+    output: str
+    error: Optional[str]
+    truncated: bool
+    duration: float
+    queue_wait: float
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "output": self.output,
+            "error": self.error,
+            "truncated": self.truncated,
+            "duration": round(self.duration, 4),
+            "queue_wait": round(self.queue_wait, 4),
+        }
+
+
+class WorkerExited(Exception):
+    pass
+
+
+@dataclass(eq=False, slots=True)
+class SandboxWorker:
+    process: asyncio.subprocess.Process
+    # Working and home directory, removed once the process has exited
+    directory: Path
+    runs: int = 0
+
+    async def read_frame(self) -> Dict[str, Any]:
+        line = await self.process.stdout.readline()
+        if not line:
+            raise WorkerExited(f"Sandbox worker {self.process.pid} exited")
+        return json.loads(line)
+
+    def kill(self) -> None:
+        if self.process.returncode is None:
+            self.process.kill()
+        self.process.stdin.close()
+
+    def remove_directory(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+@dataclass(slots=True)
+class _PoolCounters:
+    runs: int = 0
+    recycled: int = 0
+    killed: int = 0
+    busy_seconds: float = 0.0
+    statuses: Dict[str, int] = field(default_factory=dict)
+
+
+class SandboxPool:
+    """Pre-started, resource-limited Python workers shared by every conversation on this host."""
+
+    def __init__(self, config: Optional[SandboxConfig] = None) -> None:
+        self.config = config or sandbox_config
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: Set[SandboxWorker] = set()
+        self._spawning: Set[asyncio.Task] = set()
+        # Killed workers whose process has not been reaped yet
+        self._retired: Set[SandboxWorker] = set()
+        self._busy: Dict[SandboxWorker, float] = {}
+        self._waiting = 0
+        self._started_at: Optional[float] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self.counters = _PoolCounters()
+        self.queue_wait = LatencyHistogram()
+
+    @property
+    def started(self) -> bool:
+        return self._idle is not None
+
+    async def start(self) -> None:
+        """Pre-start the workers (idempotent)"""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self.started:
+                return
+            results = await asyncio.gather(*(self._spawn() for _ in range(self.config.workers)), return_exceptions=True)
+            errors = [result for result in results if isinstance(result, BaseException)]
+            if errors:
+                # All or nothing: a partly started pool stays stopped, so the next run tries again
+                started = [result for result in results if not isinstance(result, BaseException)]
+                for worker in started:
+                    worker.kill()
+                    self._workers.discard(worker)
+                await asyncio.gather(*(worker.process.wait() for worker in started), return_exceptions=True)
+                for worker in started:
+                    worker.remove_directory()
+                raise errors[0]
+            self._idle = asyncio.Queue()
+            self._started_at = time.monotonic()
+            for worker in results:
+                self._idle.put_nowait(worker)
+            logger.info(f"Sandbox pool started with {len(results)} workers")
+
+    def _environment(self, directory: Path) -> Dict[str, str]:
+        """Everything a worker sees of the environment: nothing inherited from the server"""
+        return {"PATH": os.defpath, "HOME": str(directory), "TMPDIR": str(directory), "LANG": "C.UTF-8"}
+
+    async def _spawn(self) -> SandboxWorker:
+        directory = Path(tempfile.mkdtemp(prefix="sandbox-"))
+        try:
+            if self.config.user:
+                shutil.chown(directory, user=self.config.user)
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, "-I", "-u", str(WORKER_SCRIPT),
+                str(self.config.memory_bytes), str(self.config.cpu_seconds), str(self.config.file_bytes),
+                self.config.preload,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                env=self._environment(directory),
+                cwd=directory,
+                user=self.config.user,
+            )
+        except BaseException:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+        worker = SandboxWorker(process, directory)
+        try:
+            frame = await worker.read_frame()
+        except BaseException:
+            worker.kill()
+            await process.wait()
+            worker.remove_directory()
+            raise
+        if frame.get("type") != "ready":
+            worker.kill()
+            await process.wait()
+            worker.remove_directory()
+            raise WorkerExited(f"Unexpected frame from new sandbox worker: {frame}")
+        self._workers.add(worker)
+        return worker
+
+    def _replace(self, worker: SandboxWorker) -> None:
+        """Retire a worker and start its replacement in the background"""
+        worker.kill()
+        self._workers.discard(worker)
+        self._retired.add(worker)
+
+        async def respawn() -> None:
+            try:
+                try:
+                    await worker.process.wait()
+                    self._retired.discard(worker)
+                finally:
+                    worker.remove_directory()
+                self._idle.put_nowait(await self._spawn())
+            except Exception as e:
+                logger.error(f"Could not start a sandbox worker: {e}")
+                if not self._workers and not self._spawning - {asyncio.current_task()}:
+                    self._stop_empty_pool()
+
+        task = asyncio.create_task(respawn())
+        self._spawning.add(task)
+        task.add_done_callback(self._spawning.discard)
+
+    def _stop_empty_pool(self) -> None:
+        """No worker is left or coming: fail the runs waiting for one and let the next run start over"""
+        idle, self._idle, self._started_at = self._idle, None, None
+        for _ in range(self._waiting):
+            idle.put_nowait(None)
+
+    async def run(self, code: str, on_output: Optional[OutputCallback] = None) -> SandboxResult:
+        """Run code on an idle worker, waiting for one if all are busy"""
+        await self.start()
+        queued_at = time.monotonic()
+        self._waiting += 1
+        try:
+            worker: Optional[SandboxWorker] = await self._idle.get()
+        finally:
+            self._waiting -= 1
+        if worker is None:
+            raise WorkerExited("No sandbox worker could be started")
+        started_at = time.monotonic()
+        queue_wait = started_at - queued_at
+        self.queue_wait.record(queue_wait)
+        self._busy[worker] = started_at
+
+        output: List[str] = []
+        frame: Dict[str, Any] = {"status": "crashed", "error": None, "truncated": False}
+        healthy = False
+        try:
+            worker.runs += 1
+            worker.process.stdin.write(
+                (json.dumps({"code": code, "max_output": self.config.max_output_bytes}) + "\n").encode("utf-8")
+            )
+            await worker.process.stdin.drain()
+            frame = await asyncio.wait_for(self._collect(worker, output, on_output), self.config.wall_seconds)
+            healthy = True
+        except asyncio.TimeoutError:
+            frame = {"status": "timeout", "error": f"Wall-clock limit of {self.config.wall_seconds}s exceeded"}
+        except (WorkerExited, ConnectionError) as e:
+            # Most often the address-space limit killing the interpreter outside user code
+            frame = {"status": "crashed", "error": str(e)}
+        finally:
+            # Also reached on cancellation (conversation stopped mid-run): the worker state is unknown
+            self.counters.busy_seconds += time.monotonic() - self._busy.pop(worker)
+            if not healthy:
+                self.counters.killed += 1
+                self._replace(worker)
+            elif worker.runs >= self.config.max_runs:
+                self.counters.recycled += 1
+                self._replace(worker)
+            else:
+                self._idle.put_nowait(worker)
+
+        status = frame.get("status", "crashed")
+        error = frame.get("error")
+        self.counters.runs += 1
+        self.counters.statuses[status] = self.counters.statuses.get(status, 0) + 1
+        return SandboxResult(
+            status=status,
+            output="".join(output),
+            error=error[-self.config.max_output_bytes:] if error else None,
+            truncated=bool(frame.get("truncated")),
+            duration=time.monotonic() - started_at,
+            queue_wait=queue_wait,
+        )
+
+    @staticmethod
+    async def _collect(worker: SandboxWorker, output: List[str], on_output: Optional[OutputCallback]) -> Dict[str, Any]:
+        while True:
+            frame = await worker.read_frame()
+            if frame["type"] == "done":
+                return frame
+            output.append(frame["text"])
+            if on_output is not None:
+                await on_output(frame["stream"], frame["text"])
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        busy_seconds = self.counters.busy_seconds + sum(now - since for since in self._busy.values())
+        capacity_seconds = self.config.workers * (now - self._started_at) if self._started_at else 0
+        return {
+            "enabled": self.config.enabled,
+            "started": self.started,
+            "workers": len(self._workers),
+            "busy": len(self._busy),
+            "queued": self._waiting,
+            "utilisation": round(busy_seconds / capacity_seconds, 4) if capacity_seconds else 0.0,
+            "runs": self.counters.runs,
+            "recycled": self.counters.recycled,
+            "killed": self.counters.killed,
+            "statuses": dict(self.counters.statuses),
+            "queue_wait": self.queue_wait.snapshot(),
+        }
+
+    async def close(self) -> None:
+        for task in self._spawning:
+            task.cancel()
+        await asyncio.gather(*self._spawning, return_exceptions=True)
+        for worker in self._workers:
+            worker.kill()
+        # Retired workers are reaped too, or their transports outlive the loop
+        workers = self._workers | self._retired
+        await asyncio.gather(*(worker.process.wait() for worker in workers), return_exceptions=True)
+        for worker in workers:
+            worker.remove_directory()
+        self._workers.clear()
+        self._retired.clear()
+        self._busy.clear()
+        self._idle = None
+        self._started_at = None
+
+
+def merge_stats(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine the stats() of several pools (one per shard process)"""
+    statuses: Dict[str, int] = {}
+    for report in reports:
+        for status, count in report["statuses"].items():
+            statuses[status] = statuses.get(status, 0) + count
+    started = [report for report in reports if report["started"]]
+    return {
+        "enabled": any(report["enabled"] for report in reports),
+        "started": bool(started),
+        **{
+            key: sum(report[key] for report in reports)
+            for key in ("workers", "busy", "queued", "runs", "recycled", "killed")
+        },
+        "utilisation": round(sum(report["utilisation"] for report in started) / len(started), 4) if started else 0.0,
+        "statuses": statuses,
+        "shards": reports,
+    }
+
+
+sandbox_config = SandboxConfig.from_env()
+sandbox_pool = SandboxPool(sandbox_config)
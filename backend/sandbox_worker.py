@@ -0,0 +1,154 @@
+"""
+Sandbox worker process (started by sandbox.SandboxPool, not imported)
+
+Runs one job at a time from stdin and answers on its original stdout with
+newline-delimited JSON frames:
+    {"type": "ready"}                                   once, after start-up
+    {"type": "output", "stream": "stdout", "text": ...} while a job prints
+    {"type": "done", "status": ..., "error": ..., "truncated": ...}
+
+Each job executes in fresh globals, so nothing leaks between jobs except
+imported modules (kept warm on purpose). Memory is capped for the whole
+process (RLIMIT_AS); CPU time is capped per job by moving the soft RLIMIT_CPU
+just ahead of the time already used, and SIGXCPU is turned into an exception.
+
+Usage:
+    python -I -u sandbox_worker.py <memory_bytes> <cpu_seconds> <file_bytes> [preload,modules]
+"""
+
+import builtins
+import importlib
+import json
+import os
+import signal
+import sys
+import traceback
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - non-POSIX hosts run without limits
+    resource = None
+
+
+class CPULimitExceeded(Exception):
+    pass
+
+
+def _on_sigxcpu(signum, frame):
+    raise CPULimitExceeded("CPU time limit exceeded")
+
+
+class FrameWriter:
+    """sys.stdout/sys.stderr replacement that forwards output as frames, line by line."""
+
+    def __init__(self, channel, stream, budget):
+        self.channel = channel
+        self.stream = stream
+        self.budget = budget
+        self.buffer = ""
+
+    def write(self, text):
+        self.buffer += text
+        if "\n" in self.buffer or len(self.buffer) >= 1024:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if not self.buffer:
+            return
+        text, self.buffer = self.buffer, ""
+        remaining = self.budget["remaining"]
+        if remaining <= 0:
+            self.budget["truncated"] = True
+            return
+        if len(text) > remaining:
+            text = text[:remaining]
+            self.budget["truncated"] = True
+        self.budget["remaining"] -= len(text)
+        send(self.channel, {"type": "output", "stream": self.stream, "text": text})
+
+    def isatty(self):
+        return False
+
+
+def send(channel, frame):
+    channel.write(json.dumps(frame) + "\n")
+    channel.flush()
+
+
+def cpu_seconds_used():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_job(channel, job, cpu_seconds):
+    budget = {"remaining": job.get("max_output", 65536), "truncated": False}
+    stdout = FrameWriter(channel, "stdout", budget)
+    stderr = FrameWriter(channel, "stderr", budget)
+    sys.stdout, sys.stderr = stdout, stderr
+    status, error = "ok", None
+
+    if resource is not None and cpu_seconds > 0:
+        soft = int(cpu_seconds_used() + cpu_seconds) + 1
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, resource.getrlimit(resource.RLIMIT_CPU)[1]))
+    try:
+        exec(compile(job["code"], "<sandbox>", "exec"), {"__name__": "__main__", "__builtins__": builtins})
+    except CPULimitExceeded as e:
+        status, error = "cpu_limit", str(e)
+    except MemoryError:
+        status, error = "memory_limit", "Memory limit exceeded"
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            status, error = "error", f"SystemExit: {e.code}"
+    except BaseException:
+        status = "error"
+        # Drop this module's frame so the traceback starts in the submitted code
+        kind, value, trace = sys.exc_info()
+        error = "".join(traceback.format_exception(kind, value, trace.tb_next))
+    finally:
+        stdout.flush()
+        stderr.flush()
+        sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+        if resource is not None and cpu_seconds > 0:
+            resource.setrlimit(resource.RLIMIT_CPU, (resource.RLIM_INFINITY, resource.getrlimit(resource.RLIMIT_CPU)[1]))
+
+    send(channel, {"type": "done", "status": status, "error": error, "truncated": budget["truncated"]})
+
+
+def main():
+    memory_bytes, cpu_seconds, file_bytes = (int(value) for value in sys.argv[1:4])
+    preload = [name for name in (sys.argv[4] if len(sys.argv) > 4 else "").split(",") if name]
+
+    # Keep the protocol on private descriptors so submitted code cannot read jobs or
+    # write frames through fds 0-2, which are pointed at /dev/null instead
+    jobs = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    channel = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+    sys.stdin = open(os.devnull, "r")
+
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+    if resource is not None:
+        if memory_bytes > 0:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+        if file_bytes > 0:
+            resource.setrlimit(resource.RLIMIT_FSIZE, (file_bytes, file_bytes))
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+        signal.signal(signal.SIGXCPU, _on_sigxcpu)
+
+    send(channel, {"type": "ready"})
+    for line in jobs:
+        if not line.strip():
+            continue
+        run_job(channel, json.loads(line), cpu_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Latency-SLO Adaptive Generation Controller
+
+Keeps conversations inside configured latency and budget targets when a
+provider slows down, instead of relying only on fixed max_tokens and the hard
+turn cap:
+- tracks observed throughput (tokens/s) and time to first token per model as
+  exponentially weighted moving averages, shared by all conversations
+- before each turn, lowers that turn's max_tokens so the expected turn latency
+  fits the per-turn budget and the turn's share of the token budget
+- after each turn, lowers the conversation's turn cap so the remaining turns
+  fit the whole-conversation time and token budgets
+
+Every decision is logged and returned to the caller, which publishes it as a
+generation_decision event. All budgets are off (0) unless configured:
+- SLO_TURN_LATENCY_SECONDS: target wall time of one response
+- SLO_CONVERSATION_SECONDS: target wall time of a whole conversation
+- SLO_CONVERSATION_TOKENS: generated-token budget of a whole conversation
+- SLO_MIN_TURN_TOKENS: never cut a turn below this many tokens
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from analytics import estimate_tokens
+from hedging import model_key
+from providers import get_provider
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest observation in the moving averages
+EWMA_ALPHA = 0.3
+
+
+@dataclass(frozen=True, slots=True)
+class SLOConfig:
+    turn_latency_seconds: float = 0.0
+    conversation_seconds: float = 0.0
+    conversation_tokens: int = 0
+    min_turn_tokens: int = 64
+
+    @classmethod
+    def from_env(cls) -> "SLOConfig":
+        return cls(
+            turn_latency_seconds=float(os.getenv("SLO_TURN_LATENCY_SECONDS", "0")),
+            conversation_seconds=float(os.getenv("SLO_CONVERSATION_SECONDS", "0")),
+            conversation_tokens=int(os.getenv("SLO_CONVERSATION_TOKENS", "0")),
+            min_turn_tokens=int(os.getenv("SLO_MIN_TURN_TOKENS", "64")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.turn_latency_seconds or self.conversation_seconds or self.conversation_tokens)
+
+
+def _ewma(previous: Optional[float], value: float) -> float:
+    return value if previous is None else previous + EWMA_ALPHA * (value - previous)
+
+
+class ModelThroughput:
+    """Moving averages of tokens/s and time to first token per provider model."""
+
+    def __init__(self) -> None:
+        # model key -> (tokens per second, first-token seconds)
+        self.models: Dict[str, Tuple[float, float]] = {}
+
+    def observe(self, key: str, tokens: int, first_token_seconds: float, total_seconds: float) -> None:
+        streaming_seconds = total_seconds - first_token_seconds
+        if tokens <= 0 or streaming_seconds <= 0:
+            return
+        previous_rate, previous_ttft = self.models.get(key, (None, None))
+        self.models[key] = (
+            _ewma(previous_rate, tokens / streaming_seconds),
+            _ewma(previous_ttft, first_token_seconds),
+        )
+
+    def estimate(self, key: str) -> Optional[Tuple[float, float]]:
+        return self.models.get(key)
+
+
+@dataclass(frozen=True, slots=True)
+class TurnPlan:
+    """Token budget for one turn and why it was chosen."""
+
+    max_tokens: int
+    configured_max_tokens: int
+    reasons: Tuple[str, ...]
+
+    @property
+    def adjusted(self) -> bool:
+        return self.max_tokens != self.configured_max_tokens
+
+
+class GenerationController:
+    """Per-conversation budget tracking; throughput estimates are shared."""
+
+    def __init__(
+        self,
+        max_turns: int,
+        config: Optional[SLOConfig] = None,
+        throughput: Optional[ModelThroughput] = None,
+    ) -> None:
+        self.config = config or slo_config
+        self.throughput = throughput or model_throughput
+        self.max_turns = max_turns
+        self.turn_cap = max_turns
+        self.started_at = time.monotonic()
+        self.turns = 0
+        self.tokens_used = 0
+        self.turn_seconds: Optional[float] = None
+        self.turn_tokens: Optional[float] = None
+        # Recent decisions, newest last, for inspection alongside the log
+        self.decisions: Deque[Dict[str, Any]] = deque(maxlen=100)
+
+    def start(self) -> None:
+        self.turn_cap = self.max_turns
+        self.started_at = time.monotonic()
+        self.turns = 0
+        self.tokens_used = 0
+        self.turn_seconds = None
+        self.turn_tokens = None
+        self.decisions.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Budget counters for a conversation that is being spilled to disk"""
+        return {
+            "turn_cap": self.turn_cap,
+            "turns": self.turns,
+            "tokens_used": self.tokens_used,
+            "elapsed_seconds": time.monotonic() - self.started_at,
+            "turn_seconds": self.turn_seconds,
+            "turn_tokens": self.turn_tokens,
+        }
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        # Time spent on disk does not count against the conversation time budget
+        self.turn_cap = snapshot["turn_cap"]
+        self.turns = snapshot["turns"]
+        self.tokens_used = snapshot["tokens_used"]
+        self.started_at = time.monotonic() - snapshot["elapsed_seconds"]
+        self.turn_seconds = snapshot["turn_seconds"]
+        self.turn_tokens = snapshot["turn_tokens"]
+
+    def _log(self, decision: Dict[str, Any]) -> Dict[str, Any]:
+        logger.info(f"Generation decision: {decision}")
+        self.decisions.append(decision)
+        return decision
+
+    def plan_turn(self, participant: Any) -> TurnPlan:
+        """Token budget for the next response of this participant"""
+        configured = participant.max_tokens
+        budget = configured
+        reasons: List[str] = []
+
+        estimate = self.throughput.estimate(model_key(participant))
+        if self.config.turn_latency_seconds and estimate:
+            tokens_per_second, first_token_seconds = estimate
+            fits = int(tokens_per_second * (self.config.turn_latency_seconds - first_token_seconds))
+            if fits < budget:
+                budget = fits
+                reasons.append(f"turn_latency: {tokens_per_second:.1f} tok/s, ttft {first_token_seconds:.2f}s")
+
+        if self.config.conversation_tokens:
+            remaining_turns = max(1, self.turn_cap - self.turns)
+            share = (self.config.conversation_tokens - self.tokens_used) // remaining_turns
+            if share < budget:
+                budget = share
+                reasons.append(f"token_budget: {share} tokens per remaining turn")
+
+        if budget < self.config.min_turn_tokens:
+            budget = self.config.min_turn_tokens
+            reasons.append(f"floor: min_turn_tokens {budget}")
+        return TurnPlan(min(configured, budget), configured, tuple(reasons))
+
+    def describe_plan(self, participant: Any, plan: TurnPlan) -> Dict[str, Any]:
+        return self._log({
+            "kind": "turn_budget",
+            "participant": participant.name,
+            "model": participant.model,
+            "turn": self.turns,
+            "max_tokens": plan.max_tokens,
+            "configured_max_tokens": plan.configured_max_tokens,
+            "reasons": list(plan.reasons),
+        })
+
+    @staticmethod
+    def apply(participant: Any, plan: TurnPlan) -> Any:
+        """Participant view whose model (and fallbacks) generate at most plan.max_tokens"""
+        if not plan.adjusted:
+            return participant
+
+        def limited(candidate: Any) -> Any:
+            parameter = get_provider(candidate.provider).max_tokens_param
+            return replace(
+                candidate,
+                max_tokens=plan.max_tokens,
+                llm=candidate.llm.bind(**{parameter: plan.max_tokens}),
+                fallbacks=tuple(limited(fallback) for fallback in candidate.fallbacks),
+            )
+
+        return limited(participant)
+
+    def record_turn(
+        self,
+        turn: int,
+        key: str,
+        content: str,
+        first_token_seconds: Optional[float],
+        total_seconds: float,
+        completed: bool,
+    ) -> Optional[Dict[str, Any]]:
+        """Account for finished turn number `turn`; returns a decision when the turn cap changes"""
+        tokens = estimate_tokens(content)
+        self.turns = turn
+        self.tokens_used += tokens
+        self.turn_seconds = _ewma(self.turn_seconds, total_seconds)
+        self.turn_tokens = _ewma(self.turn_tokens, tokens)
+        if completed and first_token_seconds is not None:
+            self.throughput.observe(key, tokens, first_token_seconds, total_seconds)
+
+        cap = self.max_turns
+        reasons = []
+        if self.config.conversation_seconds and self.turn_seconds:
+            remaining_seconds = self.config.conversation_seconds - (time.monotonic() - self.started_at)
+            fits = self.turns + max(0, math.floor(remaining_seconds / self.turn_seconds))
+            if fits < cap:
+                cap = fits
+                reasons.append(f"time_budget: {remaining_seconds:.1f}s left at {self.turn_seconds:.1f}s per turn")
+        if self.config.conversation_tokens and self.turn_tokens:
+            remaining_tokens = self.config.conversation_tokens - self.tokens_used
+            fits = self.turns + max(0, math.floor(remaining_tokens / self.turn_tokens))
+            if fits < cap:
+                cap = fits
+                reasons.append(f"token_budget: {remaining_tokens} tokens left at {self.turn_tokens:.0f} per turn")
+
+        if cap == self.turn_cap:
+            return None
+        previous, self.turn_cap = self.turn_cap, cap
+        return self._log({
+            "kind": "turn_cap",
+            "turn": self.turns,
+            "turn_cap": cap,
+            "previous_turn_cap": previous,
+            "reasons": reasons,
+        })
+
+
+slo_config = SLOConfig.from_env()
+model_throughput = ModelThroughput()
@@ -0,0 +1,155 @@
+"""
+Conversation Memory Accounting and Spill-to-Disk
+
+Every resident conversation keeps its full state, LangChain message objects
+included, in RAM. This module measures that footprint and lets the host move
+idle conversations to local storage:
+- MemoryMeter: estimated bytes of each conversation's messages, updated
+  incrementally as messages are appended. Branches are charged only for their
+  divergent suffix; the shared prefix is charged to the parent
+- SpillStore: one JSON snapshot per spilled conversation under data/spill
+- SpillConfig: when the host spills (see ConversationHost.sweep)
+
+A conversation is idle when its graph task has finished or it is parked in
+the pause wait. Idle conversations are spilled once they have not been
+accessed for SPILL_IDLE_SECONDS, and least recently used ones first whenever
+resident conversations exceed SPILL_MAX_RESIDENT_MB. A spilled conversation
+is rehydrated by the next control call; a paused one stays on disk, at no RAM
+cost, until then. A rehydrated branch owns a private copy of its prefix.
+
+Configuration (environment):
+- SPILL_IDLE_SECONDS: idle time before a conversation is spilled (0 = never)
+- SPILL_MAX_RESIDENT_MB: resident message budget (0 = unlimited)
+- SPILL_INTERVAL_SECONDS: how often the host checks
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+
+from branching import MessageLog
+
+logger = logging.getLogger(__name__)
+
+# Measured size of an empty LangChain message object with its pydantic fields
+MESSAGE_OVERHEAD_BYTES = 1600
+
+
+@dataclass(frozen=True, slots=True)
+class SpillConfig:
+    idle_seconds: float = 120.0
+    max_resident_bytes: int = 0
+    interval_seconds: float = 5.0
+
+    @classmethod
+    def from_env(cls) -> "SpillConfig":
+        return cls(
+            idle_seconds=float(os.getenv("SPILL_IDLE_SECONDS", "120")),
+            max_resident_bytes=int(float(os.getenv("SPILL_MAX_RESIDENT_MB", "0")) * 1024 * 1024),
+            interval_seconds=float(os.getenv("SPILL_INTERVAL_SECONDS", "5")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.idle_seconds or self.max_resident_bytes)
+
+
+def message_bytes(message: BaseMessage) -> int:
+    """Estimated resident size of one message"""
+    metadata = getattr(message, "additional_kwargs", {})
+    return (
+        MESSAGE_OVERHEAD_BYTES
+        + sys.getsizeof(message.content)
+        + sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in metadata.items())
+    )
+
+
+class MemoryMeter:
+    """Per-conversation message memory, measured incrementally (messages are append-only)."""
+
+    def __init__(self) -> None:
+        # conversation id -> (messages counted, bytes)
+        self.counted: Dict[str, Tuple[int, int]] = {}
+
+    def measure(self, conversation_id: str, messages: Iterable[BaseMessage]) -> Dict[str, int]:
+        shared = messages.shared_prefix_length if isinstance(messages, MessageLog) else 0
+        owned = messages.suffix() if isinstance(messages, MessageLog) else list(messages)
+
+        counted, total = self.counted.get(conversation_id, (0, 0))
+        if counted > len(owned):
+            counted, total = 0, 0
+        total += sum(message_bytes(message) for message in owned[counted:])
+        self.counted[conversation_id] = (len(owned), total)
+        return {"messages": shared + len(owned), "shared_messages": shared, "bytes": total}
+
+    def discard(self, conversation_id: str) -> None:
+        self.counted.pop(conversation_id, None)
+
+
+def memory_summary(conversations: Mapping[str, Mapping[str, Any]]) -> Dict[str, Any]:
+    """Totals over per-conversation memory entries (MemoryMeter.measure plus residency)"""
+    resident = [memory for memory in conversations.values() if memory["resident"]]
+    return {
+        "resident_conversations": len(resident),
+        "spilled_conversations": len(conversations) - len(resident),
+        "resident_bytes": sum(memory["bytes"] for memory in resident),
+        "spilled_bytes": sum(memory.get("spilled_bytes", 0) for memory in conversations.values()),
+        "conversations": dict(conversations),
+    }
+
+
+def encode_snapshot(snapshot: Mapping[str, Any]) -> Dict[str, Any]:
+    """JSON-safe form of ConversationGraph.snapshot()"""
+    return {
+        **snapshot,
+        "state": {**snapshot["state"], "messages": messages_to_dict(snapshot["state"]["messages"])},
+        "human_inbox": messages_to_dict(snapshot["human_inbox"]),
+    }
+
+
+def decode_snapshot(payload: Mapping[str, Any]) -> Dict[str, Any]:
+    return {
+        **payload,
+        "state": {**payload["state"], "messages": messages_from_dict(payload["state"]["messages"])},
+        "human_inbox": messages_from_dict(payload["human_inbox"]),
+    }
+
+
+class SpillStore:
+    """Snapshots of spilled conversations, one JSON file each."""
+
+    def __init__(self, base_directory: Path | None = None) -> None:
+        self.base_path = base_directory or Path(__file__).resolve().parent.parent / "data" / "spill"
+        self.base_path.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, conversation_id: str) -> Path:
+        return self.base_path / f"{conversation_id}.json"
+
+    def save(self, conversation_id: str, snapshot: Mapping[str, Any]) -> int:
+        """Write a snapshot atomically; returns its size in bytes"""
+        path = self._path(conversation_id)
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(encode_snapshot(snapshot), ensure_ascii=True))
+        temporary.replace(path)
+        return path.stat().st_size
+
+    def load(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        path = self._path(conversation_id)
+        if not path.exists():
+            return None
+        return decode_snapshot(json.loads(path.read_text()))
+
+    def discard(self, conversation_id: str) -> None:
+        self._path(conversation_id).unlink(missing_ok=True)
+
+
+spill_config = SpillConfig.from_env()
+spill_store = SpillStore()
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
 import json
+import re
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable, Mapping, Any
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional
 
 from langchain_core.messages import BaseMessage
 
+CONVERSATION_ID_PATTERN = re.compile(r"[\w.-]+")
+
+# persist() writes a transcript's metadata on the first line, ending with this opener,
+# then one message per line; the file stays a single valid JSON document
+MESSAGES_OPENER = ',"messages":['
+
 
 class TranscriptStore:
     """Persist conversation transcripts to disk for future analytics/export."""
@@ -23,18 +30,102 @@ class TranscriptStore:
             "metadata": getattr(message, "additional_kwargs", {}),
         }
 
-    def persist(self, *, topic: str | None, participants: Iterable[str], messages: Iterable[BaseMessage]) -> Path:
+    def persist(
+        self,
+        *,
+        topic: str | None,
+        participants: Iterable[str],
+        messages: Iterable[BaseMessage],
+        conversation_id: str | None = None,
+        branch_of: str | None = None,
+        fork_index: int | None = None,
+    ) -> Path:
         timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
-        payload = {
+        header = {
+            "conversation_id": conversation_id,
             "topic": topic,
             "participants": list(participants),
             "created_at": timestamp,
-            "messages": [self._serialise_message(message) for message in messages],
         }
+        if branch_of is not None:
+            # Branch transcripts hold only their divergent suffix; the prefix lives with the parent
+            header["branch_of"] = branch_of
+            header["fork_index"] = fork_index
+
+        suffix = f"-{conversation_id}" if conversation_id else ""
+        file_path = self.base_path / f"conversation-{timestamp}{suffix}.json"
+        with file_path.open("w", encoding="utf-8") as handle:
+            # Line-oriented so exports can stream it (iter_messages) without loading the whole file
+            handle.write(json.dumps(header, ensure_ascii=True)[:-1] + MESSAGES_OPENER + "\n")
+            for index, message in enumerate(messages):
+                line = json.dumps(self._serialise_message(message), ensure_ascii=True)
+                handle.write(("," if index else "") + line + "\n")
+            handle.write("]}\n")
+        return file_path
+
+    def transcript_paths(self) -> List[Path]:
+        """Stored conversation transcripts, oldest first (file names start with the UTC timestamp)"""
+        return sorted(self.base_path.glob("conversation-*.json"))
 
-        file_path = self.base_path / f"conversation-{timestamp}.json"
-        file_path.write_text(json.dumps(payload, ensure_ascii=True, indent=2))
+    def find(self, conversation_id: str) -> Optional[Path]:
+        """The latest transcript stored for a conversation"""
+        if not CONVERSATION_ID_PATTERN.fullmatch(conversation_id):
+            return None
+        # The glob also matches ids ending in "-<conversation_id>"; the stem is conversation-<timestamp>-<id>
+        matches = sorted(
+            path for path in self.base_path.glob(f"conversation-*-{conversation_id}.json")
+            if path.stem.split("-", 2)[2:] == [conversation_id]
+        )
+        return matches[-1] if matches else None
+
+    def read_header(self, path: Path) -> Dict[str, Any]:
+        """A transcript's metadata (everything but its messages), read from the first line"""
+        with path.open("r", encoding="utf-8") as handle:
+            first_line = handle.readline().rstrip()
+        if first_line.endswith(MESSAGES_OPENER):
+            return json.loads(first_line[:-len(MESSAGES_OPENER)] + "}")
+        # Pretty-printed transcript from before the line-oriented layout: it has to be loaded whole
+        payload = json.loads(path.read_text())
+        payload.pop("messages", None)
+        return payload
+
+    def iter_messages(self, path: Path) -> Iterator[dict]:
+        """Stream a transcript's messages one line at a time"""
+        with path.open("r", encoding="utf-8") as handle:
+            first_line = handle.readline()
+            if not first_line.rstrip().endswith(MESSAGES_OPENER):
+                yield from json.loads(first_line + handle.read()).get("messages", [])
+                return
+            for line in handle:
+                line = line.strip()
+                if line == "]}":
+                    return
+                if line:
+                    yield json.loads(line.lstrip(","))
+
+    def serialise_messages(self, messages: Iterable[BaseMessage]) -> list[Mapping[str, Any]]:
+        return [self._serialise_message(message) for message in messages]
+
+    def append_jsonl(self, file_name: str | Path, record: Mapping[str, Any]) -> Path:
+        """Append one record as a JSON line; relative names live under the transcript directory."""
+        file_path = self.base_path / file_name
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with file_path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record, ensure_ascii=True) + "\n")
+            handle.flush()
         return file_path
 
+    def iter_jsonl(self, file_name: str | Path) -> Iterator[dict]:
+        """Stream records back from a JSONL file, skipping a torn final line after a crash."""
+        file_path = self.base_path / file_name
+        if not file_path.exists():
+            return
+        with file_path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
 
 transcript_store = TranscriptStore()
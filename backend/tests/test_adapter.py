@@ -0,0 +1,96 @@
+import asyncio
+import json
+import pickle
+import unittest
+
+SKIP_REASON = None
+
+try:
+    from backend.adapter import ConversationEventStreamer, LangGraphToAISDKAdapter
+    from backend.events import ConversationEvent, TextDelta
+    from backend.benchmarks.event_pipeline import run as run_pipeline_benchmark
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    LangGraphToAISDKAdapter = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+
+@unittest.skipIf(LangGraphToAISDKAdapter is None, SKIP_REASON or "adapter unavailable")
+class EventEncodingTests(unittest.IsolatedAsyncioTestCase):
+    async def test_text_delta_frame_matches_dict_form(self):
+        adapter = LangGraphToAISDKAdapter()
+        frame = adapter.encode_event(TextDelta("Alice", 'say "hi"\n', 1.0, "c1"))
+
+        self.assertEqual(frame.type, "text-delta")
+        self.assertEqual(json.loads(frame.payload), {
+            "type": "text-delta",
+            "conversation_id": "c1",
+            "data": {"textDelta": 'say "hi"\n', "participant": "Alice"},
+        })
+        self.assertEqual(json.loads(adapter.encode_event(TextDelta("Alice", "x", 1.0)).payload)["data"]["textDelta"], "x")
+
+    async def test_typed_and_dict_events_share_the_dispatch_table(self):
+        adapter = LangGraphToAISDKAdapter()
+        typed = ConversationEvent("ai_response_complete", {"participant": "Bob", "content": "Done"}, 1.0)
+        plain = {"type": "human_message_added", "data": {"content": "Hello"}}
+
+        self.assertEqual((await adapter.convert_event(typed))["data"]["finishReason"], "stop")
+        self.assertEqual(await adapter.convert_event(plain), {"type": "user-message", "data": {"content": "Hello"}})
+        self.assertEqual((await adapter.convert_event({"type": "custom"}))["data"]["eventType"], "custom")
+
+    async def test_streamer_shares_one_frame_across_clients(self):
+        streamer = ConversationEventStreamer()
+        queues = [asyncio.Queue(), asyncio.Queue()]
+        for queue in queues:
+            streamer.add_client(queue)
+
+        await streamer.handle_langgraph_event(TextDelta("Alice", "token", 1.0))
+
+        first, second = (queue.get_nowait() for queue in queues)
+        self.assertIs(first, second)
+
+    async def test_frames_carry_their_conversation(self):
+        adapter = LangGraphToAISDKAdapter()
+        typed = ConversationEvent("tool_call", {"tool_call_id": "t1"}, 1.0, "c2")
+        plain = {"type": "custom", "conversation_id": "c3", "data": {}}
+
+        self.assertEqual((await adapter.convert_event(typed))["conversation_id"], "c2")
+        self.assertEqual((await adapter.convert_event(plain))["conversation_id"], "c3")
+
+    async def test_only_scoped_streams_end_with_their_conversation(self):
+        streamer = ConversationEventStreamer()
+        scoped, unscoped = asyncio.Queue(), asyncio.Queue()
+        streamer.add_client(scoped, "c1")
+        streamer.add_client(unscoped)
+
+        await streamer.handle_langgraph_event(ConversationEvent("conversation_end", {}, 1.0, "c1"))
+        await streamer.handle_langgraph_event(ConversationEvent("turn_complete", {"turn": 1}, 1.0, "c2"))
+        scoped_frames = [json.loads(payload)["type"] async for payload in streamer.generate_sse_stream(scoped)]
+
+        unscoped_stream = streamer.generate_sse_stream(unscoped)
+        unscoped_frames = [json.loads(await anext(unscoped_stream))["type"] for _ in range(2)]
+        await streamer.close()
+        self.assertEqual([payload async for payload in unscoped_stream], [])
+
+        self.assertEqual(scoped_frames, ["conversation-end"])
+        self.assertEqual(unscoped_frames, ["conversation-end", "turn-complete"])
+        self.assertEqual(streamer.clients, [])
+
+    def test_events_support_mapping_access_and_pickle(self):
+        event = TextDelta("Alice", "token", 2.5, "c1")
+        restored = pickle.loads(pickle.dumps(event))
+
+        self.assertEqual(restored["type"], "ai_response_stream")
+        self.assertEqual(restored.get("data"), {"participant": "Alice", "content": "token"})
+        self.assertEqual(restored.get("conversation_id"), "c1")
+        self.assertIsNone(restored.get("missing"))
+        with self.assertRaises(KeyError):
+            restored["missing"]
+
+    async def test_per_token_allocation_budget(self):
+        result = await run_pipeline_benchmark(tokens=2000, clients=2)
+        # One shared (type, payload) frame per token while it waits in client queues
+        self.assertLessEqual(result["retained_allocations_per_token"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import asyncio
+import time
+import unittest
+
+SKIP_REASON = None
+
+try:
+    from backend.admission import AdmissionConfig, AdmissionController, AdmissionRejected
+    from backend.executor import ConversationHost
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    AdmissionController = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+
+def make_controller(**overrides):
+    settings = {"max_conversations": 1, "max_queue": 2, "queue_timeout_seconds": 1.0, "shed_lag_seconds": 0.05}
+    return AdmissionController(AdmissionConfig(**{**settings, **overrides}))
+
+
+@unittest.skipIf(AdmissionController is None, SKIP_REASON or "admission unavailable")
+class AdmissionControllerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_freed_slots_go_to_waiters_in_arrival_order(self):
+        controller = make_controller()
+        self.assertFalse((await controller.admit("a"))["queued"])
+
+        second = asyncio.create_task(controller.admit("b"))
+        third = asyncio.create_task(controller.admit("c"))
+        await asyncio.sleep(0)
+        self.assertEqual(controller.stats()["queued"], 2)
+
+        await controller.handle_event({"type": "conversation_finished", "conversation_id": "a"})
+        admitted = await second
+        self.assertFalse(third.done())
+        self.assertEqual((admitted["queued"], admitted["position"]), (True, 1))
+
+        controller.release("b")
+        self.assertEqual((await third)["position"], 2)
+        self.assertEqual(list(controller.running), ["c"])
+
+    async def test_excess_starts_are_rejected_with_retry_after(self):
+        controller = make_controller(max_queue=1, queue_timeout_seconds=0.05)
+        await controller.admit("a")
+
+        with self.assertRaises(AdmissionRejected) as at_capacity:
+            await controller.admit("b", wait=False)
+        waiting = asyncio.create_task(controller.admit("c"))
+        await asyncio.sleep(0)
+        with self.assertRaises(AdmissionRejected) as queue_full:
+            await controller.admit("d")
+        with self.assertRaises(AdmissionRejected) as timed_out:
+            await waiting
+
+        self.assertEqual(at_capacity.exception.reason, "at_capacity")
+        self.assertEqual(queue_full.exception.as_dict()["position"], 2)
+        self.assertGreaterEqual(queue_full.exception.retry_after, 1)
+        self.assertEqual(timed_out.exception.reason, "queue_timeout")
+        self.assertEqual(controller.stats()["queued"], 0)
+
+    async def test_cancelled_waiters_leave_the_queue(self):
+        controller = make_controller()
+        await controller.admit("a")
+        gone = asyncio.create_task(controller.admit("b"))
+        next_in_line = asyncio.create_task(controller.admit("c"))
+        await asyncio.sleep(0)
+
+        gone.cancel()
+        await asyncio.gather(gone, return_exceptions=True)
+        controller.release("a")
+
+        self.assertTrue((await next_in_line)["queued"])
+        self.assertEqual(list(controller.running), ["c"])
+        self.assertEqual(controller.reserved, 0)
+
+    async def test_subscriber_caps_and_lag_shedding(self):
+        controller = make_controller(max_subscribers=2, max_subscribers_per_conversation=1, shed_lag_seconds=0.02)
+        controller.open_subscriber("a")
+        with self.assertRaises(AdmissionRejected):
+            controller.open_subscriber("a")
+        controller.open_subscriber()
+        with self.assertRaises(AdmissionRejected):
+            controller.open_subscriber("b")
+        controller.close_subscriber("a")
+        controller.open_subscriber("b")
+
+        controller.start()
+        try:
+            await asyncio.sleep(0.15)
+            time.sleep(0.3)  # block the event loop
+            await asyncio.sleep(0.05)
+            self.assertTrue(controller.shedding)
+            with self.assertRaises(AdmissionRejected) as shed:
+                await controller.admit("a")
+        finally:
+            await controller.close()
+        self.assertEqual(shed.exception.reason, "overloaded")
+        self.assertEqual(controller.stats()["shed"], 1)
+
+
+@unittest.skipIf(AdmissionController is None, SKIP_REASON or "admission unavailable")
+class ConversationFinishedTests(unittest.IsolatedAsyncioTestCase):
+    async def test_host_announces_conversations_that_end_by_themselves(self):
+        events = []
+
+        async def record(event):
+            events.append(event)
+
+        host = ConversationHost(record)
+
+        async def failing():
+            raise RuntimeError("provider down")
+
+        host._track("done", asyncio.create_task(asyncio.sleep(0)))
+        host._track("failed", asyncio.create_task(failing()))
+        stopped = asyncio.create_task(asyncio.sleep(0))
+        host._track("stopped", stopped)
+        host.tasks.pop("stopped")
+        await asyncio.sleep(0.05)
+
+        finished = {event.conversation_id: event["data"]["reason"] for event in events}
+        self.assertEqual(finished, {"done": "completed", "failed": "error"})
+        self.assertEqual({event.type for event in events}, {"conversation_finished"})
+
+
+if __name__ == "__main__":
+    unittest.main()
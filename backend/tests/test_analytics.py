@@ -0,0 +1,122 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+SKIP_REASON = None
+
+try:
+    from backend.analytics import LiveAnalytics, batch_report, participation_balance
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    LiveAnalytics = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+
+def event(event_type, timestamp, **data):
+    return {"type": event_type, "conversation_id": "c1", "timestamp": timestamp, "data": data}
+
+
+@unittest.skipIf(LiveAnalytics is None, SKIP_REASON or "analytics unavailable")
+class LiveAnalyticsTests(unittest.IsolatedAsyncioTestCase):
+    async def test_aggregates_update_from_events(self):
+        analytics = LiveAnalytics()
+        stream = [
+            event("ai_response_start", 10.0, participant="Alice"),
+            event("ai_response_stream", 10.4, participant="Alice", content="Hi "),
+            event("ai_response_stream", 10.5, participant="Alice", content="@Bob"),
+            event("next_speaker_detected", 10.5, participant="Alice", next_speaker="Bob"),
+            event("ai_response_complete", 11.0, participant="Alice", content="Hi @Bob"),
+            event("speaker_scheduled", 11.1, next_speaker="Bob", turn=1),
+            event("ai_response_start", 12.0, participant="Bob"),
+            event("ai_response_stream", 14.0, participant="Bob", content="Hello Alice"),
+            event("ai_response_complete", 15.0, participant="Bob", content="Hello Alice"),
+        ]
+        for item in stream:
+            await analytics.handle_event(item)
+
+        snapshot = analytics.snapshot("c1")
+
+        self.assertEqual(snapshot["turns_per_speaker"], {"Alice": 1, "Bob": 1})
+        self.assertEqual(snapshot["tokens_per_speaker"], {"Alice": 2, "Bob": 3})
+        self.assertEqual(snapshot["participation_balance"], 1.0)
+        self.assertEqual(snapshot["mention_graph"], [{"from": "Alice", "to": "Bob", "count": 1}])
+        self.assertEqual(snapshot["time_to_first_token"]["count"], 2)
+        self.assertAlmostEqual(snapshot["time_to_first_token"]["max"], 2.0)
+        self.assertAlmostEqual(snapshot["response_time"]["mean"], 2.0)
+        self.assertIsNone(analytics.snapshot("unknown"))
+
+    async def test_topic_drift_is_aggregated_per_speaker(self):
+        analytics = LiveAnalytics()
+        for item in (
+            event("topic_drift", 1.0, participant="Alice", drift=0.2, centroid_drift=0.2, off_topic=False),
+            event("topic_drift", 2.0, participant="Alice", drift=0.6, centroid_drift=0.35, off_topic=False),
+        ):
+            await analytics.handle_event(item)
+
+        drift = analytics.snapshot("c1")["topic_drift"]
+
+        self.assertEqual(drift["centroid_drift"], 0.35)
+        self.assertAlmostEqual(drift["mean_drift_per_speaker"]["Alice"], 0.4)
+        self.assertFalse(drift["off_topic"])
+
+    def test_participation_balance(self):
+        self.assertAlmostEqual(participation_balance([5, 5, 5]), 1.0)
+        self.assertAlmostEqual(participation_balance([6, 0, 0]), 0.0)
+        self.assertAlmostEqual(participation_balance([10], participants=3), 0.0)
+        self.assertAlmostEqual(participation_balance([5, 5], participants=4), 0.5)
+        self.assertAlmostEqual(participation_balance([10]), 1.0)
+
+    async def test_balance_counts_silent_participants_and_ended_conversations_are_dropped(self):
+        analytics = LiveAnalytics(retain_ended=1)
+        await analytics.handle_event(event("conversation_start", 0.0, participants=["Alice", "Bob", "Charlie"]))
+        for timestamp in (1.0, 2.0):
+            await analytics.handle_event(event("ai_response_start", timestamp, participant="Alice"))
+            await analytics.handle_event(event("ai_response_complete", timestamp + 0.5, participant="Alice", content="x"))
+        self.assertEqual(analytics.snapshot("c1")["participation_balance"], 0.0)
+
+        await analytics.handle_event(event("participants_changed", 3.0, participants=["Alice"]))
+        self.assertEqual(analytics.snapshot("c1")["participation_balance"], 1.0)
+
+        await analytics.handle_event({"type": "conversation_end", "conversation_id": "c1", "data": {}})
+        self.assertIsNotNone(analytics.snapshot("c1"))
+        await analytics.handle_event({"type": "ai_response_start", "conversation_id": "c2", "data": {}})
+        await analytics.handle_event({"type": "conversation_finished", "conversation_id": "c2", "data": {}})
+        self.assertIsNone(analytics.snapshot("c1"))
+        self.assertIsNotNone(analytics.snapshot("c2"))
+
+
+@unittest.skipIf(LiveAnalytics is None, SKIP_REASON or "analytics unavailable")
+class BatchReportTests(unittest.TestCase):
+    def test_report_over_stored_transcripts(self):
+        def message(speaker, content):
+            return {"role": "ai", "content": content, "metadata": {"participant": speaker}}
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first = Path(temp_dir) / "conversation-1.json"
+            first.write_text(json.dumps({"messages": [
+                {"role": "human", "content": "topic", "metadata": {}},
+                message("Alice", "abcd"),
+                message("Bob", "abcdefgh"),
+            ]}))
+            second = Path(temp_dir) / "batch.jsonl"
+            second.write_text(json.dumps({"messages": [message("Alice", "ab"), message("Alice", "ab")]}) + "\n")
+            monologue = Path(temp_dir) / "conversation-2.json"
+            monologue.write_text(json.dumps({"participants": ["Alice", "Bob"], "messages": [
+                message("Alice", "print(1)"),
+                {"role": "human", "content": "1", "metadata": {"participant": "Sandbox"}},
+            ]}))
+
+            report = batch_report([first, second])
+            with_monologue = batch_report([first, monologue])
+
+        self.assertEqual(report["conversations"], 2)
+        self.assertEqual(report["messages"], 4)
+        self.assertEqual(report["speakers"]["Alice"]["turns"], 3)
+        self.assertEqual(report["speakers"]["Bob"]["approx_tokens"], 2)
+        self.assertEqual(report["participation_balance"]["min"], 1.0)
+        self.assertNotIn("Sandbox", with_monologue["speakers"])
+        self.assertEqual(with_monologue["participation_balance"]["min"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
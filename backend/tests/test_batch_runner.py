@@ -0,0 +1,99 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+SKIP_REASON = None
+
+try:
+    from langchain_core.messages import AIMessageChunk
+    from backend import conversation_graph as conversation_graph_module
+    from backend.batch_runner import build_jobs, run_batch
+    from backend.participant_registry import CompiledParticipant
+    from backend.storage import TranscriptStore
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    run_batch = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+
+class EchoLLM:
+    def __init__(self):
+        self.calls = 0
+
+    async def astream(self, messages):
+        self.calls += 1
+        await asyncio.sleep(0)
+        yield AIMessageChunk(content=f"reply {self.calls}")
+
+
+class FailingLLM:
+    async def astream(self, messages):
+        raise RuntimeError("provider unavailable")
+        yield  # pragma: no cover - makes this an async generator
+
+
+@unittest.skipIf(run_batch is None, SKIP_REASON or "batch runner unavailable")
+class BatchRunnerTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = TranscriptStore(Path(self.temp_dir.name))
+        self.llm = EchoLLM()
+        participant = CompiledParticipant(
+            name="Alice", provider="openai", model="fake", prompt_prefix=(),
+            temperature=0.0, max_tokens=50, llm=self.llm,
+        )
+        self.patcher = mock.patch.object(
+            conversation_graph_module.participant_registry, "compiled", return_value=participant
+        )
+        self.patcher.start()
+
+    def tearDown(self) -> None:
+        self.patcher.stop()
+        self.temp_dir.cleanup()
+
+    async def test_runs_every_job_and_resumes_after_crash(self):
+        jobs = build_jobs(["Topic A", "Topic B"], [["Alice", "Bob"], ["Bob", "Charlie"]])
+        progress = []
+
+        summary = await run_batch(
+            jobs[:3], "sweep.jsonl", concurrency=2, max_turns=2, store=self.store,
+            on_progress=lambda done, total, record: progress.append((done, total)),
+        )
+
+        self.assertEqual(summary, {"total": 3, "skipped": 0, "ok": 3, "error": 0})
+        self.assertEqual(progress[-1], (3, 3))
+        records = list(self.store.iter_jsonl("sweep.jsonl"))
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0]["turns"], 2)
+        self.assertEqual(len(records[0]["messages"]), 3)
+
+        # Simulate a crash that left a torn line, then resume the full sweep
+        with (Path(self.temp_dir.name) / "sweep.jsonl").open("a") as handle:
+            handle.write('{"job_id": "torn')
+        calls_before = self.llm.calls
+
+        resumed = await run_batch(jobs, "sweep.jsonl", concurrency=2, max_turns=2, store=self.store)
+
+        self.assertEqual(resumed, {"total": 4, "skipped": 3, "ok": 1, "error": 0})
+        self.assertEqual(self.llm.calls - calls_before, 2)
+
+    async def test_jobs_whose_turns_all_failed_are_errors_and_rerun(self):
+        jobs = build_jobs(["Topic A"], [["Alice"]])
+        failing = CompiledParticipant(
+            name="Alice", provider="openai", model="fake", prompt_prefix=(),
+            temperature=0.0, max_tokens=50, llm=FailingLLM(),
+        )
+
+        with mock.patch.object(conversation_graph_module.participant_registry, "compiled", return_value=failing):
+            summary = await run_batch(jobs, "failing.jsonl", max_turns=2, store=self.store)
+
+        record = next(self.store.iter_jsonl("failing.jsonl"))
+        self.assertEqual(summary["error"], 1)
+        self.assertEqual(record["status"], "error")
+        self.assertIn("provider unavailable", record["error"])
+        self.assertEqual((await run_batch(jobs, "failing.jsonl", max_turns=2, store=self.store))["ok"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+SKIP_REASON = None
+
+try:
+    from langchain_core.messages import AIMessage, HumanMessage
+    from backend.branching import MessageLog
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    MessageLog = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+
+def contents(log):
+    return [message.content for message in log]
+
+
+@unittest.skipIf(MessageLog is None, SKIP_REASON or "MessageLog unavailable")
+class MessageLogTests(unittest.TestCase):
+    def test_append_returns_new_view_without_changing_old_one(self):
+        first = MessageLog([HumanMessage(content="topic")])
+        second = first + [AIMessage(content="a")]
+        third = second + [AIMessage(content="b")]
+
+        self.assertEqual(contents(first), ["topic"])
+        self.assertEqual(contents(second), ["topic", "a"])
+        self.assertEqual(contents(third), ["topic", "a", "b"])
+        # Appending to an older view must not clobber the newer one sharing its storage
+        diverged = second + [AIMessage(content="c")]
+        self.assertEqual(contents(diverged), ["topic", "a", "c"])
+        self.assertEqual(contents(third), ["topic", "a", "b"])
+
+    def test_branches_share_the_parent_prefix(self):
+        parent = MessageLog([HumanMessage(content=f"m{i}") for i in range(100)])
+        branch = parent.fork(40) + [AIMessage(content="branch reply")]
+        nested = branch.fork(10)
+
+        self.assertEqual(len(branch), 41)
+        self.assertIs(branch[39], parent[39])
+        self.assertEqual(branch[-1].content, "branch reply")
+        self.assertEqual(contents(branch.suffix()), ["branch reply"])
+        self.assertEqual(branch.shared_prefix_length, 40)
+        # Forking inside the shared prefix points straight at the original parent
+        self.assertEqual(nested.shared_prefix_length, 10)
+        self.assertEqual(contents(nested), [f"m{i}" for i in range(10)])
+
+        # Parent keeps growing without affecting the branch
+        parent = parent + [AIMessage(content="parent reply")]
+        self.assertEqual(len(branch), 41)
+        self.assertEqual(contents(branch[40:]), ["branch reply"])
+
+    def test_prompt_building_and_bounds(self):
+        log = MessageLog([HumanMessage(content="hello")])
+
+        self.assertEqual(contents([HumanMessage(content="system")] + log), ["system", "hello"])
+        self.assertEqual(log, [HumanMessage(content="hello")])
+        with self.assertRaises(ValueError):
+            log.fork(5)
+        with self.assertRaises(IndexError):
+            log[3]
+
+
+if __name__ == "__main__":
+    unittest.main()
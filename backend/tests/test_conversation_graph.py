@@ -1,9 +1,13 @@
+import asyncio
 import unittest
+from unittest import mock
 
 SKIP_REASON = None
 
 try:
+    from backend import conversation_graph as conversation_graph_module
     from backend.conversation_graph import ConversationGraph, ConversationState
+    from backend.participant_registry import CompiledParticipant
 except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
     ConversationGraph = None  # type: ignore
     ConversationState = dict  # type: ignore
@@ -81,6 +85,120 @@ class ConversationGraphTests(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(self.graph.current_participants, [])
         self.assertIsNone(self.graph.current_topic)
 
+    async def test_human_messages_are_drained_in_one_ordered_batch(self):
+        state: ConversationState = {
+            "messages": [],
+            "participants": ["Alice", "Bob", "Charlie"],
+            "current_speaker": "Alice",
+            "turn_count": 1,
+            "conversation_active": True,
+            "human_input_pending": False,
+            "conversation_paused": False,
+            "topic": "AI Ethics",
+            "preferred_next_speaker": None,
+            "preferred_bias_remaining": 0,
+            "round_robin_pointer": 1,
+        }
+        self.graph.current_state = state
+
+        self.assertTrue(self.graph.add_human_message_to_state("First point"))
+        self.assertTrue(self.graph.add_human_message_to_state("@Charlie what do you think?", interrupt=True))
+
+        # Queued messages must not touch the state the graph is iterating over
+        self.assertEqual(state["messages"], [])
+        self.assertEqual(self.graph.stream_cancel_reason, "interrupted")
+
+        drained_state = await self.graph._check_human_input(state)
+
+        self.assertEqual(
+            [message.content for message in drained_state["messages"]],
+            ["First point", "@Charlie what do you think?"],
+        )
+        self.assertEqual(drained_state["preferred_next_speaker"], "Charlie")
+        self.assertFalse(drained_state["human_input_pending"])
+        self.assertIsNone(self.graph.stream_cancel_reason)
+        self.assertEqual(len(self.graph.human_inbox), 0)
+        ingested = [event for event in self.emitted_events if event["type"] == "human_messages_ingested"]
+        self.assertEqual(ingested[0]["data"]["sequences"], [1, 2])
+
+    async def test_pause_closes_the_provider_stream_and_keeps_partial_content(self):
+        stream_closed = asyncio.Event()
+        first_chunk_sent = asyncio.Event()
+
+        class SlowLLM:
+            async def astream(self, messages):
+                try:
+                    yield mock.Mock(content="Partial ")
+                    first_chunk_sent.set()
+                    await asyncio.sleep(60)
+                    yield mock.Mock(content="never sent")
+                finally:
+                    stream_closed.set()
+
+        state: ConversationState = {
+            "messages": [],
+            "participants": ["Alice", "Bob"],
+            "current_speaker": "Alice",
+            "turn_count": 0,
+            "conversation_active": True,
+            "human_input_pending": False,
+            "conversation_paused": False,
+            "topic": "Cancellation",
+            "preferred_next_speaker": None,
+            "preferred_bias_remaining": 0,
+            "round_robin_pointer": 1,
+        }
+        self.graph.current_state = state
+        participant = CompiledParticipant(
+            name="Alice",
+            provider="openai",
+            model="fake-model",
+            prompt_prefix=(),
+            temperature=0.3,
+            max_tokens=250,
+            llm=SlowLLM(),
+        )
+
+        with mock.patch.object(conversation_graph_module.participant_registry, "compiled", return_value=participant):
+            response_task = asyncio.create_task(self.graph._generate_ai_response(dict(state)))
+            await asyncio.wait_for(first_chunk_sent.wait(), 1)
+            self.assertTrue(self.graph.pause_conversation())
+            result = await asyncio.wait_for(response_task, 1)
+
+        self.assertTrue(stream_closed.is_set())
+        self.assertEqual(result["messages"][-1].content, "Partial ")
+        self.assertEqual(result["messages"][-1].additional_kwargs["finish_reason"], "paused")
+        self.assertTrue(result["conversation_paused"])
+        complete = [event for event in self.emitted_events if event["type"] == "ai_response_complete"]
+        self.assertEqual(complete[0]["data"]["finish_reason"], "paused")
+
+    async def test_participant_changes_apply_at_turn_boundary(self):
+        state: ConversationState = {
+            "messages": [],
+            "participants": ["Alice", "Bob", "Charlie"],
+            "current_speaker": "Bob",
+            "turn_count": 2,
+            "conversation_active": True,
+            "human_input_pending": False,
+            "conversation_paused": False,
+            "topic": "Pools",
+            "preferred_next_speaker": None,
+            "preferred_bias_remaining": 0,
+            "round_robin_pointer": 2,
+        }
+        self.graph.current_state = state
+
+        self.assertTrue(self.graph.update_participants(add=[], remove=["Alice"]))
+        with self.assertRaises(ValueError):
+            self.graph.update_participants(add=["Nobody"], remove=[])
+        self.assertEqual(state["participants"], ["Alice", "Bob", "Charlie"])
+
+        updated_state = await self.graph._check_human_input(state)
+
+        self.assertEqual(updated_state["participants"], ["Bob", "Charlie"])
+        # Charlie was next in line before Alice left and still is
+        self.assertEqual(updated_state["participants"][updated_state["round_robin_pointer"]], "Charlie")
+
 
 if __name__ == "__main__":
     unittest.main()
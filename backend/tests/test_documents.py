@@ -0,0 +1,146 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+SKIP_REASON = None
+
+try:
+    from langchain_core.messages import HumanMessage
+    from backend import conversation_graph as conversation_graph_module
+    from backend.conversation_graph import ConversationGraph
+    from backend import documents as documents_module
+    from backend.documents import DocumentConfig, DocumentStore, DocumentTooLarge, chunk_offsets
+    from fastapi.testclient import TestClient
+    from backend import main as main_module
+    import conversation_graph as running_graph_module  # the module the executor imports (flat, via PYTHONPATH)
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    DocumentStore = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+REPORT = "\n\n".join([
+    "Quarterly revenue grew twelve percent, driven by subscription renewals in Europe. "
+    "Renewals were strongest among mid-sized accounts.",
+    "The warehouse migration slipped by two weeks because of delayed forklift deliveries. "
+    "Inventory counts resume once racking is installed.",
+    "Customer churn fell after the onboarding redesign shipped in March. "
+    "New accounts now reach their first report within a day.",
+] * 4)
+
+
+async def upload(data: bytes, block_size: int = 64):
+    for start in range(0, len(data), block_size):
+        yield data[start:start + block_size]
+
+
+@unittest.skipIf(DocumentStore is None, SKIP_REASON or "documents unavailable")
+class DocumentStoreTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = DocumentStore(Path(self.temp_dir.name), DocumentConfig(max_bytes=4096, chunk_tokens=64))
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    async def test_uploads_are_chunked_once_and_shared_by_content(self):
+        first = await self.store.save(upload(REPORT.encode()), "report.txt")
+        second = await self.store.save(upload(REPORT.encode(), block_size=1000), "copy.txt")
+
+        self.assertEqual(first["id"], second["id"])
+        self.assertEqual(second["name"], "report.txt")
+        self.assertGreater(first["chunks"], 1)
+        self.assertEqual([info["id"] for info in self.store.list()], [first["id"]])
+        self.assertEqual(list(Path(self.temp_dir.name).glob("*.tmp")), [])
+
+        document = self.store.get(first["id"])
+        self.assertEqual("".join(document.text(chunk) for chunk in range(first["chunks"])), REPORT)
+
+    async def test_retrieval_ranks_relevant_chunks_within_the_budget(self):
+        report = await self.store.save(upload(REPORT.encode()), "report.txt")
+
+        excerpts = self.store.retrieve([report["id"]], "Why did the warehouse migration slip?", budget_tokens=80)
+
+        self.assertTrue(excerpts)
+        self.assertLessEqual(sum(excerpt.tokens for excerpt in excerpts), 80)
+        self.assertIn("warehouse", excerpts[0].text)
+        self.assertEqual(self.store.retrieve([report["id"]], "unrelated astronomy question", 80), [])
+
+    async def test_uploads_are_written_in_batches(self):
+        with mock.patch.object(documents_module, "UPLOAD_FLUSH_BYTES", 100):
+            report = await self.store.save(upload(REPORT.encode(), block_size=64), "report.txt")
+
+        document = self.store.get(report["id"])
+        self.assertEqual("".join(document.text(chunk) for chunk in range(report["chunks"])), REPORT)
+
+    async def test_deletes_by_another_process_drop_cached_documents(self):
+        report = await self.store.save(upload(REPORT.encode()), "report.txt")
+        self.assertTrue(self.store.retrieve([report["id"]], "warehouse migration", 80))
+
+        # Another process (e.g. the API process while this one is a shard) deletes it
+        other = DocumentStore(Path(self.temp_dir.name), self.store.config)
+        other.delete(report["id"])
+
+        self.assertEqual(self.store.retrieve([report["id"]], "warehouse migration", 80), [])
+        with self.assertRaises(ValueError):
+            self.store.get(report["id"])
+
+    async def test_oversized_and_binary_uploads_are_rejected(self):
+        with self.assertRaises(DocumentTooLarge):
+            await self.store.save(upload(b"x" * 5000), "big.txt")
+        with self.assertRaises(ValueError):
+            await self.store.save(upload(b"\x89PNG\r\n\x1a\n\0\0"), "image.png")
+        self.assertEqual(list(Path(self.temp_dir.name).iterdir()), [])
+
+    def test_long_lines_are_not_split_inside_characters(self):
+        data = ("é" * 300).encode()
+        offsets = chunk_offsets(data, 101)
+        self.assertEqual(b"".join(data[start:end] for start, end in offsets), data)
+        for start, end in offsets:
+            data[start:end].decode("utf-8")
+
+
+@unittest.skipIf(DocumentStore is None, SKIP_REASON or "documents unavailable")
+class DocumentContextTests(unittest.IsolatedAsyncioTestCase):
+    async def test_prompt_gets_only_relevant_excerpts_of_attached_documents(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = DocumentStore(Path(temp_dir), DocumentConfig(chunk_tokens=64, context_tokens=60))
+            report = await store.save(upload(REPORT.encode()), "report.txt")
+            graph = ConversationGraph()
+            state = {"topic": "Customer churn", "messages": [HumanMessage(content="What about onboarding?")]}
+
+            with mock.patch.object(conversation_graph_module, "document_store", store):
+                self.assertIsNone(graph._document_context(state))
+                graph.attach_documents([report["id"]])
+                context = graph._document_context(state)
+                with self.assertRaises(ValueError):
+                    graph.attach_documents(["missing"])
+            store.close()
+
+        self.assertIn("report.txt", context.content)
+        self.assertIn("onboarding redesign", context.content)
+        self.assertNotIn("warehouse", context.content)
+        self.assertEqual(graph.documents, [report["id"]])
+
+
+@unittest.skipIf(DocumentStore is None, SKIP_REASON or "documents unavailable")
+class StartWithDocumentsTests(unittest.TestCase):
+    def test_started_conversations_get_the_topic_message_and_their_documents(self):
+        seen = []
+
+        async def run(graph, state):
+            seen.append(([message.content for message in state["messages"]], list(graph.documents)))
+
+        with mock.patch.object(running_graph_module.ConversationGraph, "_run", run), \
+                mock.patch.object(main_module.document_store, "get"), \
+                mock.patch.object(main_module.transcript_store, "persist"), \
+                TestClient(main_module.app) as client:
+            plain = client.post("/conversation/start", json={"topic": "Tides"})
+            with_documents = client.post("/conversation/start", json={"topic": "Tides", "documents": ["doc-1"]})
+
+        self.assertEqual((plain.status_code, with_documents.status_code), (200, 200))
+        self.assertEqual(seen, [(["Let's discuss: Tides"], []), (["Let's discuss: Tides"], ["doc-1"])])
+
+
+if __name__ == "__main__":
+    unittest.main()
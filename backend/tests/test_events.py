@@ -0,0 +1,77 @@
+import asyncio
+import time
+import unittest
+
+SKIP_REASON = None
+
+try:
+    from backend.events import ConversationEvent, EventBus, TextDelta
+    from backend.conversation_graph import ConversationGraph
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    EventBus = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+
+@unittest.skipIf(EventBus is None, SKIP_REASON or "events unavailable")
+class EventBusTests(unittest.IsolatedAsyncioTestCase):
+    async def test_filtered_subscriptions_and_disposable_handles(self):
+        bus = EventBus()
+        everything, turns = [], []
+
+        async def record_all(event):
+            everything.append(event.type)
+
+        async def record_turns(event):
+            turns.append(event.type)
+
+        handle = bus.subscribe(record_all)
+        with bus.subscribe(record_turns, ["turn_complete"]):
+            self.assertTrue(bus.wants("turn_complete"))
+            await bus.publish(ConversationEvent("turn_complete", {}, 0.0))
+            await bus.publish(TextDelta("Alice", "hi", 0.0))
+        await bus.publish(ConversationEvent("turn_complete", {}, 1.0))
+        handle.unsubscribe()
+        handle.unsubscribe()
+
+        self.assertEqual(everything, ["turn_complete", "ai_response_stream", "turn_complete"])
+        self.assertEqual(turns, ["turn_complete"])
+        self.assertFalse(bus.wants("turn_complete"))
+        self.assertEqual(len(bus), 0)
+
+    async def test_subscribers_run_concurrently_and_failures_are_isolated(self):
+        bus = EventBus()
+        delivered = []
+
+        async def slow(event):
+            await asyncio.sleep(0.1)
+            delivered.append(event.type)
+
+        async def broken(event):
+            raise RuntimeError("subscriber failed")
+
+        for callback in (slow, slow, broken):
+            bus.subscribe(callback)
+        started = time.perf_counter()
+        await bus.publish(ConversationEvent("conversation_start", {}, 0.0))
+
+        self.assertLess(time.perf_counter() - started, 0.18)
+        self.assertEqual(delivered, ["conversation_start", "conversation_start"])
+
+    async def test_graph_skips_events_nobody_subscribed_to(self):
+        graph = ConversationGraph()
+        received = []
+
+        async def record(event):
+            received.append(event.type)
+
+        graph.add_event_callback(record, ["turn_complete"])
+        await graph._commit_messages([], [])
+        await graph._emit_event("speaker_scheduled", {"speaker": "Alice"})
+        await graph._emit_event("turn_complete", {"turn": 1})
+
+        self.assertEqual(received, ["turn_complete"])
+        self.assertFalse(graph.events.wants(TextDelta.type))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import asyncio
+import unittest
+from unittest import mock
+
+SKIP_REASON = None
+
+try:
+    from langchain_core.messages import HumanMessage
+    from backend import executor as executor_module
+    from backend.executor import ConversationHost, ShardedConversationExecutor
+    from fastapi.testclient import TestClient
+    from backend import main as main_module
+    from backend.conversation_graph import ConversationGraph
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    ConversationHost = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+
+async def _discard(event):
+    return None
+
+
+@unittest.skipIf(ConversationHost is None, SKIP_REASON or "executor unavailable")
+class ConversationHostTests(unittest.IsolatedAsyncioTestCase):
+    async def test_control_calls_target_the_owning_graph(self):
+        host = ConversationHost(_discard)
+        graph = ConversationGraph()
+        graph.current_state = {"conversation_active": True, "conversation_paused": False, "messages": []}
+        graph.current_participants = ["Alice", "Bob"]
+        graph.current_topic = "Sharding"
+        host.graphs["abc"] = graph
+
+        self.assertTrue(await host.pause("abc"))
+        status = await host.status("abc")
+
+        self.assertTrue(status["paused"])
+        self.assertEqual(status["participants"], ["Alice", "Bob"])
+        self.assertEqual(await host.status("missing"), {
+            "active": False, "paused": False, "participants": [], "topic": None,
+        })
+        with self.assertRaises(KeyError):
+            await host.pause("missing")
+
+    async def test_conversations_that_end_by_themselves_are_persisted_and_dropped(self):
+        events = []
+
+        async def record(event):
+            events.append(event)
+
+        host = ConversationHost(record)
+        graph = host._create_graph("done")
+        graph.current_state = {"messages": [HumanMessage(content="Let's discuss: endings")]}
+        graph.current_participants = ["Alice"]
+        graph.current_topic = "endings"
+
+        with mock.patch.object(executor_module.transcript_store, "persist") as persist:
+            host._track("done", asyncio.create_task(asyncio.sleep(0)))
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(persist.call_args.kwargs["topic"], "endings")
+        self.assertEqual(len(persist.call_args.kwargs["messages"]), 1)
+        for registry in (host.graphs, host.tasks, host.subscriptions, host.last_access):
+            self.assertNotIn("done", registry)
+        self.assertIsNone(graph.current_state)
+        self.assertEqual([event.type for event in events], ["conversation_finished"])
+        self.assertFalse(await host.stop("done"))
+
+
+@unittest.skipIf(ConversationHost is None, SKIP_REASON or "executor unavailable")
+class ShardedConversationExecutorTests(unittest.IsolatedAsyncioTestCase):
+    def test_shard_routing_is_stable(self):
+        executor = ShardedConversationExecutor(4, _discard)
+        shards = {executor.shard_for(f"conversation-{i}") for i in range(64)}
+
+        self.assertEqual(executor.shard_for("abc"), executor.shard_for("abc"))
+        self.assertTrue(shards.issubset(set(range(4))))
+        self.assertGreater(len(shards), 1)
+
+    async def test_calls_round_trip_through_worker_processes(self):
+        executor = ShardedConversationExecutor(2, _discard)
+        await executor.open()
+        try:
+            status = await executor.status("unknown")
+            self.assertFalse(status["active"])
+            with self.assertRaises(KeyError):
+                await executor.pause("unknown")
+        finally:
+            await executor.close()
+
+    async def test_dead_shards_fail_their_calls_and_are_replaced(self):
+        executor = ShardedConversationExecutor(1, _discard, call_timeout=0.001)
+        await executor.open()
+        try:
+            # Still starting up, so the reply cannot arrive in time
+            with self.assertRaises(RuntimeError):
+                await executor.status("abc")
+            executor.call_timeout = 30
+
+            first = executor._processes[0]
+            first.kill()
+            with self.assertRaises(RuntimeError):
+                await executor.status("abc")
+            self.assertEqual(executor._pending, {})
+
+            for _ in range(100):
+                if executor._processes[0] is not first:
+                    break
+                await asyncio.sleep(0.05)
+            self.assertIsNot(executor._processes[0], first)
+            self.assertFalse((await executor.status("abc"))["active"])
+        finally:
+            await executor.close()
+
+
+@unittest.skipIf(ConversationHost is None, SKIP_REASON or "executor unavailable")
+class ControlEndpointTests(unittest.TestCase):
+    def test_unknown_conversations_are_not_found(self):
+        with TestClient(main_module.app) as client:
+            responses = [
+                client.post(f"/conversation/{operation}", params={"conversation_id": "missing"})
+                for operation in ("pause", "resume", "interrupt")
+            ]
+            responses.append(client.post("/conversation/participants", json={"conversation_id": "missing"}))
+
+        self.assertEqual([response.status_code for response in responses], [404] * 4)
+
+    def test_rejected_branches_give_their_admission_slot_back(self):
+        with TestClient(main_module.app) as client:
+            response = client.post("/conversations/abc/branches", json={"message_index": -1})
+            running = list(main_module.admission_controller.running)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([conversation_id for conversation_id in running if conversation_id.startswith("abc.")], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
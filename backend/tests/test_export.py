@@ -0,0 +1,129 @@
+import csv
+import io
+import json
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+SKIP_REASON = None
+
+try:
+    from langchain_core.messages import AIMessage, HumanMessage
+    from backend.export import TranscriptFilter, parse_bound, select_transcripts, stream_export
+    from backend.storage import TranscriptStore
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    TranscriptStore = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+
+def conversation(turns: int):
+    messages = [HumanMessage(content="Debate: tabs or spaces?")]
+    for turn in range(turns):
+        speaker = "Alice" if turn % 2 == 0 else "Bob"
+        messages.append(AIMessage(
+            content=f"Turn {turn}, with a comma, a \"quote\"\nand a newline",
+            additional_kwargs={"participant": speaker, "model": "gpt-4o-mini"},
+        ))
+    return messages
+
+
+async def collect(chunks):
+    return "".join([chunk async for chunk in chunks])
+
+
+@unittest.skipIf(TranscriptStore is None, SKIP_REASON or "export unavailable")
+class TranscriptExportTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = TranscriptStore(Path(self.temp_dir.name))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def persist(self, conversation_id, messages, **kwargs):
+        return self.store.persist(
+            topic="Tabs vs spaces",
+            participants=["Alice", "Bob"],
+            messages=messages,
+            conversation_id=conversation_id,
+            **kwargs,
+        )
+
+    async def test_transcripts_stream_line_by_line_and_remain_valid_json(self):
+        path = self.persist("main", conversation(600))
+
+        payload = json.loads(path.read_text())
+        self.assertEqual(len(payload["messages"]), 601)
+        header = self.store.read_header(path)
+        self.assertNotIn("messages", header)
+        self.assertEqual(header["conversation_id"], "main")
+        self.assertEqual(list(self.store.iter_messages(path)), payload["messages"])
+        self.assertEqual(self.store.find("main"), path)
+        self.assertIsNone(self.store.find("*"))
+
+        lines = (await collect(stream_export(self.store, [(path, header)], "ndjson"))).splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row["seq"] for row in rows], list(range(1, 602)))
+        self.assertEqual((rows[1]["participant"], rows[1]["model"]), ("Alice", "gpt-4o-mini"))
+        self.assertEqual(rows[0]["role"], "human")
+
+    async def test_find_matches_the_whole_conversation_id(self):
+        path = self.persist("debate-main", conversation(1))
+
+        self.assertIsNone(self.store.find("main"))
+        self.assertEqual(self.store.find("debate-main"), path)
+
+    async def test_csv_and_markdown_exports(self):
+        parent = self.persist("main", conversation(3))
+        branch = self.persist("branch", conversation(2)[2:], branch_of="main", fork_index=2)
+        transcripts = [(path, self.store.read_header(path)) for path in (parent, branch)]
+
+        rows = list(csv.DictReader(io.StringIO(await collect(stream_export(self.store, transcripts, "csv")))))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["content"], "Debate: tabs or spaces?")
+        self.assertIn('"quote"\nand', rows[1]["content"])
+        # Branch numbering continues after the shared prefix
+        self.assertEqual([(row["conversation_id"], row["seq"]) for row in rows[4:]], [("branch", "3")])
+        self.assertEqual(rows[4]["branch_of"], "main")
+
+        markdown = await collect(stream_export(self.store, transcripts[1:], "markdown"))
+        self.assertTrue(markdown.startswith("# Tabs vs spaces"))
+        self.assertIn("Branch of: `main` at message 2", markdown)
+        self.assertIn("**Bob** (3):", markdown)
+
+    async def test_bulk_selection_by_date_and_participant(self):
+        self.persist("main", conversation(1))
+        self.store.persist(topic="Other", participants=["Carol"], messages=conversation(1), conversation_id="other")
+
+        selected = list(select_transcripts(self.store, TranscriptFilter(participant="Carol")))
+        self.assertEqual([header["conversation_id"] for _, header in selected], ["other"])
+
+        self.assertEqual(len(list(select_transcripts(self.store, TranscriptFilter(since=parse_bound("2000-01-01"))))), 2)
+        future = TranscriptFilter(since=datetime(2100, 1, 1, tzinfo=timezone.utc))
+        self.assertEqual(list(select_transcripts(self.store, future)), [])
+        with self.assertRaises(ValueError):
+            parse_bound("last tuesday")
+
+    async def test_legacy_pretty_printed_transcripts_are_still_exported(self):
+        path = Path(self.temp_dir.name) / "conversation-20240101T000000Z-legacy.json"
+        messages = [{"role": "human", "content": "Hello", "metadata": {}}]
+        path.write_text(json.dumps({
+            "conversation_id": "legacy",
+            "topic": "Old",
+            "participants": [],
+            "created_at": "20240101T000000Z",
+            "messages": messages,
+        }, indent=2))
+
+        header = self.store.read_header(path)
+        self.assertEqual(header["topic"], "Old")
+        self.assertEqual(list(self.store.iter_messages(path)), messages)
+        until = TranscriptFilter(until=parse_bound("2024-06-01"))
+        self.assertEqual([found for found, _ in select_transcripts(self.store, until)], [path])
+        rows = (await collect(stream_export(self.store, [(path, header)], "ndjson"))).splitlines()
+        self.assertEqual(json.loads(rows[0])["content"], "Hello")
+
+
+if __name__ == "__main__":
+    unittest.main()
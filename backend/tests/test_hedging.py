@@ -0,0 +1,133 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+SKIP_REASON = None
+
+try:
+    from backend.hedging import FirstTokenLatencyTracker, HedgedStream
+    from backend.response_cache import ReplayStream
+    from langchain_core.messages import AIMessageChunk
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    HedgedStream = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+
+def candidate(model, fallbacks=()):
+    return SimpleNamespace(name="Alice", provider="openai", model=model, fallbacks=fallbacks)
+
+
+class FakeProvider:
+    """Streams per model: ("fail",) raises, ("delay", seconds, text) sleeps then streams."""
+
+    def __init__(self, behaviour):
+        self.behaviour = behaviour
+        self.closed = []
+
+    def open_stream(self, participant, messages):
+        return self._stream(participant.model)
+
+    async def _stream(self, model):
+        kind, *args = self.behaviour[model]
+        try:
+            if kind == "fail":
+                raise ConnectionError(f"{model} unavailable")
+            delay, text = args
+            await asyncio.sleep(delay)
+            for word in text.split():
+                yield AIMessageChunk(content=word)
+        finally:
+            self.closed.append(model)
+
+
+@unittest.skipIf(HedgedStream is None, SKIP_REASON or "hedging unavailable")
+class HedgedStreamTests(unittest.IsolatedAsyncioTestCase):
+    async def test_fails_over_to_next_candidate_before_first_token(self):
+        provider = FakeProvider({"primary": ("fail",), "local": ("delay", 0, "hello there")})
+        switches = []
+
+        async def on_switch(reason, target, error):
+            switches.append((reason, target.model, type(error).__name__))
+
+        stream = HedgedStream(
+            candidate("primary", (candidate("local"),)), [], provider.open_stream,
+            tracker=FirstTokenLatencyTracker(), on_switch=on_switch,
+        )
+        chunks = [chunk.content async for chunk in stream]
+
+        self.assertEqual(chunks, ["hello", "there"])
+        self.assertEqual(stream.winner.model, "local")
+        self.assertEqual(switches, [("failover", "local", "ConnectionError")])
+
+    async def test_raises_when_every_candidate_fails(self):
+        provider = FakeProvider({"primary": ("fail",), "local": ("fail",)})
+        stream = HedgedStream(
+            candidate("primary", (candidate("local"),)), [], provider.open_stream,
+            tracker=FirstTokenLatencyTracker(),
+        )
+
+        with self.assertRaises(ConnectionError):
+            async for _ in stream:
+                pass
+
+    async def test_slow_first_token_hedges_and_cancels_loser(self):
+        provider = FakeProvider({"primary": ("delay", 5, "late"), "local": ("delay", 0, "fast reply")})
+        tracker = FirstTokenLatencyTracker(percentile=0.5, min_samples=1, min_delay=0.01)
+        tracker.record("openai:primary", 0.02)
+
+        stream = HedgedStream(candidate("primary", (candidate("local"),)), [], provider.open_stream, tracker=tracker)
+        chunks = [chunk.content async for chunk in stream]
+
+        self.assertEqual(chunks, ["fast", "reply"])
+        self.assertEqual(stream.winner.model, "local")
+        self.assertIn("primary", provider.closed)
+        self.assertEqual(len(tracker.samples["openai:local"]), 1)
+
+    async def test_hedged_primary_latency_is_recorded_as_censored(self):
+        provider = FakeProvider({"primary": ("delay", 5, "late"), "local": ("delay", 0.05, "fast reply")})
+        tracker = FirstTokenLatencyTracker(percentile=0.5, min_samples=1, min_delay=0.01)
+        tracker.record("openai:primary", 0.02)
+
+        stream = HedgedStream(candidate("primary", (candidate("local"),)), [], provider.open_stream, tracker=tracker)
+        [chunk async for chunk in stream]
+
+        # The cancelled primary had waited at least until the hedge's first token
+        self.assertEqual(len(tracker.samples["openai:primary"]), 2)
+        self.assertGreaterEqual(tracker.samples["openai:primary"][-1], 0.05)
+
+    async def test_empty_response_does_not_beat_a_running_hedge(self):
+        provider = FakeProvider({"primary": ("delay", 0.05, ""), "local": ("delay", 0.1, "real reply")})
+        tracker = FirstTokenLatencyTracker(percentile=0.5, min_samples=1, min_delay=0.01)
+        tracker.record("openai:primary", 0.02)
+
+        stream = HedgedStream(candidate("primary", (candidate("local"),)), [], provider.open_stream, tracker=tracker)
+        chunks = [chunk.content async for chunk in stream]
+
+        self.assertEqual(chunks, ["real", "reply"])
+        self.assertEqual(stream.winner.model, "local")
+
+    async def test_cache_replays_are_not_recorded(self):
+        provider = FakeProvider({"primary": ("delay", 0, "cached reply")})
+        tracker = FirstTokenLatencyTracker()
+
+        def open_replay(participant, messages):
+            return ReplayStream(provider.open_stream(participant, messages))
+
+        stream = HedgedStream(candidate("primary"), [], open_replay, tracker=tracker)
+        chunks = [chunk.content async for chunk in stream]
+
+        self.assertEqual(chunks, ["cached", "reply"])
+        self.assertNotIn("openai:primary", tracker.samples)
+
+    def test_no_hedging_without_enough_history(self):
+        tracker = FirstTokenLatencyTracker(percentile=0.9, min_samples=3, min_delay=0.1)
+        tracker.record("openai:gpt", 1.0)
+        self.assertIsNone(tracker.hedge_delay("openai:gpt"))
+
+        tracker.record("openai:gpt", 2.0)
+        tracker.record("openai:gpt", 3.0)
+        self.assertEqual(tracker.hedge_delay("openai:gpt"), 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
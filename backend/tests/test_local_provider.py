@@ -0,0 +1,119 @@
+import asyncio
+import json
+import unittest
+
+SKIP_REASON = None
+
+try:
+    import httpx
+    from langchain_core.messages import HumanMessage
+    from backend.local_provider import BatchedLocalChatModel, LocalSettings, create_local_llm
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    create_local_llm = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+CONFIG = {"provider": "local", "model": "llama", "config": {"temperature": 0.5, "max_tokens": 64}}
+
+
+class StubServer:
+    """In-process OpenAI-compatible server used through httpx.MockTransport."""
+
+    def __init__(self, batching=True, batch_status=200, drop_choices=0):
+        self.batching = batching
+        self.batch_status = batch_status
+        self.drop_choices = drop_choices
+        self.requests = []
+
+    def handle(self, request):
+        body = json.loads(request.content)
+        self.requests.append((request.url.path, body))
+        if request.url.path.endswith("/completions") and "chat" not in request.url.path:
+            if not self.batching:
+                return httpx.Response(404)
+            if self.batch_status != 200:
+                return httpx.Response(self.batch_status)
+            choices = [{"index": i, "text": f" reply {i}"} for i in range(len(body["prompt"]) - self.drop_choices)]
+            return httpx.Response(200, json={"choices": list(reversed(choices))})
+        if body.get("stream"):
+            chunks = [
+                {"id": "1", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                 "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]}
+                for word in ("Hello", " local")
+            ]
+            stream = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+            return httpx.Response(200, text=stream, headers={"content-type": "text/event-stream"})
+        return httpx.Response(200, json={"choices": [{"index": 0, "message": {"role": "assistant", "content": "single"}}]})
+
+    def client(self):
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handle))
+
+
+@unittest.skipIf(create_local_llm is None, SKIP_REASON or "local provider unavailable")
+class LocalProviderTests(unittest.IsolatedAsyncioTestCase):
+    async def collect(self, llm, text):
+        return "".join([chunk.content async for chunk in llm.astream([HumanMessage(content=text)])])
+
+    async def test_streams_through_shared_keep_alive_client(self):
+        server = StubServer()
+        settings = LocalSettings(base_url="http://stub/v1")
+        async with server.client() as client:
+            llm = create_local_llm(CONFIG, settings, client)
+            self.assertEqual(await self.collect(llm, "hi"), "Hello local")
+
+        path, body = server.requests[0]
+        self.assertEqual(path, "/v1/chat/completions")
+        self.assertEqual(body["model"], "llama")
+        self.assertEqual(body.get("max_completion_tokens", body.get("max_tokens")), 64)
+
+    async def test_concurrent_turns_are_batched(self):
+        server = StubServer()
+        settings = LocalSettings(base_url="http://stub/v1", batch_window_seconds=0.05)
+        async with server.client() as client:
+            llm = create_local_llm(CONFIG, settings, client)
+            self.assertIsInstance(llm, BatchedLocalChatModel)
+            replies = await asyncio.gather(*(self.collect(llm, f"prompt {i}") for i in range(3)))
+
+        self.assertEqual(replies, ["reply 0", "reply 1", "reply 2"])
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(len(server.requests[0][1]["prompt"]), 3)
+        self.assertEqual(server.requests[0][1]["stop"], ["\n\nUser:", "\n\nSystem:"])
+
+    async def test_missing_choices_fail_their_turns(self):
+        server = StubServer(drop_choices=1)
+        settings = LocalSettings(base_url="http://stub-short/v1", batch_window_seconds=0.05)
+        async with server.client() as client:
+            llm = create_local_llm(CONFIG, settings, client)
+            replies = await asyncio.wait_for(
+                asyncio.gather(*(self.collect(llm, f"prompt {i}") for i in range(2)), return_exceptions=True), 1
+            )
+
+        self.assertEqual(replies[0], "reply 0")
+        self.assertIsInstance(replies[1], RuntimeError)
+
+    async def test_rejected_batch_is_sent_individually_without_disabling_batching(self):
+        server = StubServer(batch_status=400)
+        settings = LocalSettings(base_url="http://stub-reject/v1", batch_window_seconds=0.01)
+        async with server.client() as client:
+            llm = create_local_llm(CONFIG, settings, client)
+            first = await asyncio.gather(self.collect(llm, "a"), self.collect(llm, "b"))
+            await self.collect(llm, "c")
+
+        self.assertEqual(first, ["single", "single"])
+        self.assertEqual([path for path, _ in server.requests].count("/v1/completions"), 2)
+
+    async def test_falls_back_to_single_requests_without_batch_support(self):
+        server = StubServer(batching=False)
+        settings = LocalSettings(base_url="http://stub-nobatch/v1", batch_window_seconds=0.01)
+        async with server.client() as client:
+            llm = create_local_llm(CONFIG, settings, client)
+            first = await asyncio.gather(self.collect(llm, "a"), self.collect(llm, "b"))
+            second = await self.collect(llm.bind(max_tokens=8), "c")
+
+        self.assertEqual(first, ["single", "single"])
+        self.assertEqual(second, "single")
+        self.assertEqual([path for path, _ in server.requests].count("/v1/completions"), 1)
+        self.assertEqual(server.requests[-1][1]["max_tokens"], 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
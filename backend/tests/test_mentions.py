@@ -0,0 +1,49 @@
+import unittest
+
+SKIP_REASON = None
+
+try:
+    from backend.mentions import ParticipantNameIndex, StreamingMentionDetector, find_mention
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    StreamingMentionDetector = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+NAMES = frozenset({"Alice", "Bob", "Charlie"})
+
+
+@unittest.skipIf(StreamingMentionDetector is None, SKIP_REASON or "mentions unavailable")
+class StreamingMentionDetectorTests(unittest.TestCase):
+    def test_mention_split_across_chunks_is_detected(self):
+        detector = StreamingMentionDetector(NAMES, exclude="Alice")
+
+        self.assertIsNone(detector.feed("What do you think, @Cha"))
+        self.assertEqual(detector.feed("rlie? I disagree."), "Charlie")
+
+    def test_partial_name_is_not_a_mention(self):
+        detector = StreamingMentionDetector(NAMES, exclude="Alice")
+
+        self.assertIsNone(detector.feed("Ask @Bo"))
+        self.assertIsNone(detector.feed("bby instead"))
+        self.assertIsNone(detector.flush())
+
+    def test_trailing_mention_resolves_on_flush(self):
+        detector = StreamingMentionDetector(NAMES, exclude="Alice")
+
+        self.assertIsNone(detector.feed("Over to you @"))
+        self.assertIsNone(detector.feed("Bob"))
+        self.assertEqual(detector.flush(), "Bob")
+
+    def test_current_speaker_and_unknown_names_are_skipped(self):
+        self.assertEqual(find_mention("@Alice and @Dave, then @Bob", NAMES, exclude="Alice"), "Bob")
+        self.assertIsNone(find_mention("no mentions here", NAMES))
+
+    def test_name_index_rebuilds_only_on_change(self):
+        index = ParticipantNameIndex()
+        first = index.resolve(["Alice", "Bob"])
+
+        self.assertIs(index.resolve(["Alice", "Bob"]), first)
+        self.assertEqual(index.resolve(["Alice", "Charlie"]), frozenset({"Alice", "Charlie"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import asyncio
+import unittest
+
+SKIP_REASON = None
+
+try:
+    from fastapi.testclient import TestClient
+    from backend import main as main_module
+    from backend.message_index import MessageIndex
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    MessageIndex = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+
+def committed(conversation_id, first_seq, *contents):
+    return {
+        "type": "messages_committed",
+        "conversation_id": conversation_id,
+        "data": {
+            "first_seq": first_seq,
+            "messages": [{"role": "ai", "content": content, "metadata": {}} for content in contents],
+        },
+    }
+
+
+@unittest.skipIf(MessageIndex is None, SKIP_REASON or "message index unavailable")
+class MessageIndexTests(unittest.TestCase):
+    def test_pages_by_sequence_number(self):
+        index = MessageIndex()
+        asyncio.run(index.handle_event(committed("c1", 1, "topic", "a", "b")))
+        asyncio.run(index.handle_event(committed("c1", 4, "c")))
+
+        page = index.page("c1", after=1, limit=2)
+
+        self.assertEqual([message["seq"] for message in page["messages"]], [2, 3])
+        self.assertEqual(page["next_after"], 3)
+        self.assertTrue(page["has_more"])
+        self.assertIsNone(index.page("unknown"))
+
+    def test_etag_changes_only_while_page_can_grow(self):
+        index = MessageIndex()
+        index.append("c1", 1, [{"content": "a"}, {"content": "b"}])
+        full_page, open_page = index.etag("c1", 0, 2), index.etag("c1", 1, 5)
+
+        index.append("c1", 3, [{"content": "c"}])
+
+        self.assertEqual(index.etag("c1", 0, 2), full_page)
+        self.assertNotEqual(index.etag("c1", 1, 5), open_page)
+
+    def test_branches_share_the_parent_prefix(self):
+        index = MessageIndex()
+        index.append("root", 1, [{"content": "a"}, {"content": "b"}, {"content": "c"}])
+        index.fork("root", "root.b1", 2)
+        index.append("root.b1", 3, [{"content": "branch"}])
+
+        self.assertEqual([m["content"] for m in index.page("root.b1")["messages"]], ["a", "b", "branch"])
+        self.assertEqual(index.last_seq("root"), 3)
+
+    def test_only_recently_ended_conversations_stay_indexed(self):
+        index = MessageIndex(retain_ended=1)
+        for conversation_id in ("old", "new", "live"):
+            asyncio.run(index.handle_event(committed(conversation_id, 1, "topic")))
+        index.fork("old", "old.b1", 1)
+
+        asyncio.run(index.handle_event({"type": "conversation_end", "conversation_id": "old"}))
+        # A stopped conversation's last partial response is committed after conversation_end
+        asyncio.run(index.handle_event(committed("old", 2, "partial")))
+        self.assertEqual(index.last_seq("old"), 2)
+
+        asyncio.run(index.handle_event({"type": "conversation_finished", "conversation_id": "new"}))
+
+        self.assertEqual(set(index.conversations), {"new", "live", "old.b1"})
+        self.assertEqual(index.page("old.b1")["messages"][0]["content"], "topic")
+
+
+@unittest.skipIf(MessageIndex is None, SKIP_REASON or "message index unavailable")
+class MessagesEndpointTests(unittest.TestCase):
+    def test_if_none_match_returns_not_modified(self):
+        main_module.message_index.append("api-test", 1, [{"role": "human", "content": "topic", "metadata": {}}])
+        self.addCleanup(main_module.message_index.discard, "api-test")
+
+        with TestClient(main_module.app) as client:
+            response = client.get("/conversations/api-test/messages", params={"after": 0})
+            etag = response.headers["ETag"]
+            cached = client.get("/conversations/api-test/messages", headers={"If-None-Match": etag})
+            missing = client.get("/conversations/unknown/messages")
+
+        self.assertEqual(response.json()["messages"][0]["seq"], 1)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(missing.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
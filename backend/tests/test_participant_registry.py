@@ -0,0 +1,67 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+SKIP_REASON = None
+
+try:
+    from backend import participant_registry as registry_module
+    from backend.participant_registry import ParticipantRegistry
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    ParticipantRegistry = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+
+@unittest.skipIf(ParticipantRegistry is None, SKIP_REASON or "ParticipantRegistry unavailable")
+class ParticipantRegistryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pool_path = Path(self.temp_dir.name) / "participants.json"
+        self.registry = ParticipantRegistry(self.pool_path)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_pool_is_seeded_and_persisted(self):
+        self.assertEqual(set(self.registry.list()), {"Alice", "Bob", "Charlie"})
+
+        self.registry.create("Dana", {
+            "provider": "openai",
+            "model": "gpt-4.1-mini",
+            "system_prompt": "You are Dana.",
+        })
+
+        reloaded = ParticipantRegistry(self.pool_path)
+        self.assertEqual(reloaded.get("Dana")["config"]["max_tokens"], 250)
+        with self.assertRaises(ValueError):
+            reloaded.create("Dana", {"provider": "openai", "model": "gpt-4.1-mini"})
+        with self.assertRaises(ValueError):
+            reloaded.create("Eve", {"provider": "unknown", "model": "x"})
+
+    def test_compiled_participant_is_cached_until_edited(self):
+        with mock.patch.object(registry_module, "create_llm", side_effect=lambda config: object()):
+            compiled = self.registry.compiled("Alice")
+
+            self.assertIs(self.registry.compiled("Alice"), compiled)
+            self.assertEqual(compiled.prompt_prefix[0].content, self.registry.get("Alice")["system_prompt"])
+            with self.assertRaises(AttributeError):
+                compiled.max_tokens = 10
+
+            self.registry.update("Alice", {"config": {"max_tokens": 120}})
+            recompiled = self.registry.compiled("Alice")
+
+        self.assertIsNot(recompiled, compiled)
+        self.assertEqual(recompiled.max_tokens, 120)
+        self.assertEqual(recompiled.temperature, compiled.temperature)
+
+    def test_delete_removes_participant(self):
+        self.registry.delete("Charlie")
+
+        self.assertNotIn("Charlie", self.registry.list())
+        with self.assertRaises(ValueError):
+            self.registry.compiled("Charlie")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+SKIP_REASON = None
+
+try:
+    from backend import providers as providers_module
+    from backend.providers import PROVIDERS, ProviderPlugin, get_provider, register_provider
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    providers_module = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@unittest.skipIf(providers_module is None, SKIP_REASON or "providers unavailable")
+class ProviderRegistryTests(unittest.TestCase):
+    def test_plugins_build_models_from_participant_config(self):
+        register_provider(ProviderPlugin("fake", "types", "SimpleNamespace", "FAKE_API_KEY", "max_output_tokens"))
+        self.addCleanup(PROVIDERS.pop, "fake")
+
+        with mock.patch.dict(os.environ, {"FAKE_API_KEY": "secret"}):
+            llm = get_provider("fake").create({"model": "m", "config": {"temperature": 0.1, "max_tokens": 9}})
+
+        self.assertEqual(vars(llm), {"model": "m", "temperature": 0.1, "max_output_tokens": 9, "api_key": "secret"})
+        with self.assertRaises(ValueError):
+            get_provider("unknown")
+
+    def test_provider_sdks_are_not_imported_at_startup(self):
+        script = (
+            "import sys, main; "
+            "print(sorted(m for m in ('langchain_openai', 'langchain_anthropic', 'langchain_google_genai', "
+            "'conversation_graph') if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, cwd=BACKEND_DIR, timeout=60
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
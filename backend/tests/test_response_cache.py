@@ -0,0 +1,92 @@
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+SKIP_REASON = None
+
+try:
+    from langchain_core.messages import AIMessageChunk, HumanMessage
+    from backend.response_cache import CacheMissError, ResponseCache
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    ResponseCache = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+
+class CountingLLM:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.calls = 0
+
+    async def astream(self, messages):
+        self.calls += 1
+        for chunk in self.chunks:
+            yield AIMessageChunk(content=chunk)
+
+
+def make_participant(llm, temperature=0.3):
+    return SimpleNamespace(
+        name="Alice", provider="openai", model="gpt-4.1-mini",
+        temperature=temperature, max_tokens=250, llm=llm,
+    )
+
+
+async def collect(stream):
+    return [chunk.content async for chunk in stream]
+
+
+@unittest.skipIf(ResponseCache is None, SKIP_REASON or "ResponseCache unavailable")
+class ResponseCacheTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_path = Path(self.temp_dir.name)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    async def test_miss_is_recorded_and_replayed_chunk_by_chunk(self):
+        llm = CountingLLM(["Hello ", "@Bob"])
+        cache = ResponseCache(self.base_path, mode="readwrite", replay_speed=0)
+        messages = [HumanMessage(content="Let's   discuss:\nAI")]
+
+        first = await collect(cache.astream(make_participant(llm), messages))
+        # Whitespace differences normalize to the same key
+        second = await collect(cache.astream(make_participant(llm), [HumanMessage(content="Let's discuss: AI")]))
+
+        self.assertEqual(first, ["Hello ", "@Bob"])
+        self.assertEqual(second, ["Hello ", "@Bob"])
+        self.assertEqual(llm.calls, 1)
+
+        changed_config = await collect(cache.astream(make_participant(llm, temperature=0.9), messages))
+        self.assertEqual(changed_config, ["Hello ", "@Bob"])
+        self.assertEqual(llm.calls, 2)
+
+    async def test_replay_only_mode_fails_on_miss(self):
+        llm = CountingLLM(["Hi"])
+        recorder = ResponseCache(self.base_path, mode="record")
+        await collect(recorder.astream(make_participant(llm), [HumanMessage(content="known")]))
+
+        replayer = ResponseCache(self.base_path, mode="replay", replay_speed=0)
+
+        self.assertEqual(await collect(replayer.astream(make_participant(llm), [HumanMessage(content="known")])), ["Hi"])
+        with self.assertRaises(CacheMissError):
+            replayer.astream(make_participant(llm), [HumanMessage(content="unknown")])
+        self.assertEqual(llm.calls, 1)
+
+    async def test_lru_eviction_and_ttl(self):
+        cache = ResponseCache(self.base_path, mode="readwrite", max_entries=2)
+        cache.store("a" * 64, [(0.0, "a")])
+        cache.store("b" * 64, [(0.0, "b")])
+        cache.lookup("a" * 64)
+        cache.store("c" * 64, [(0.0, "c")])
+
+        self.assertIsNone(cache.lookup("b" * 64))
+        self.assertIsNotNone(cache.lookup("a" * 64))
+
+        expired = ResponseCache(self.base_path, mode="readwrite", ttl_seconds=-1)
+        self.assertIsNone(expired.lookup("c" * 64))
+        self.assertFalse(expired._entry_path("c" * 64).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
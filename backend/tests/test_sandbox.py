@@ -0,0 +1,183 @@
+import asyncio
+import os
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+SKIP_REASON = None
+
+try:
+    from langchain_core.messages import AIMessage, HumanMessage
+    from backend import conversation_graph as conversation_graph_module
+    from backend.conversation_graph import ConversationGraph
+    from backend.participant_registry import CompiledParticipant
+    from backend.sandbox import SandboxConfig, SandboxPool, WorkerExited, extract_code_blocks
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    SandboxPool = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+
+def make_pool(**overrides):
+    settings = {"workers": 1, "max_runs": 2, "cpu_seconds": 2, "wall_seconds": 1.0, "preload": ""}
+    return SandboxPool(SandboxConfig(**{**settings, **overrides}))
+
+
+@unittest.skipIf(SandboxPool is None, SKIP_REASON or "sandbox unavailable")
+class SandboxPoolTests(unittest.IsolatedAsyncioTestCase):
+    async def test_output_is_streamed_and_workers_are_recycled(self):
+        pool = make_pool()
+        streamed = []
+
+        async def on_output(stream, text):
+            streamed.append((stream, text))
+
+        try:
+            first = await pool.run("print('hello')\nprint(sum(range(10)))", on_output)
+            await pool.run("x = 1")
+            stats = pool.stats()
+        finally:
+            await pool.close()
+
+        self.assertEqual(first.status, "ok")
+        self.assertEqual(first.output, "hello\n45\n")
+        self.assertEqual(streamed, [("stdout", "hello\n"), ("stdout", "45\n")])
+        self.assertEqual(stats["runs"], 2)
+        self.assertEqual(stats["recycled"], 1)
+        self.assertEqual(stats["statuses"], {"ok": 2})
+        self.assertEqual(stats["queue_wait"]["count"], 2)
+
+    async def test_errors_and_timeouts_are_reported_and_the_pool_recovers(self):
+        pool = make_pool(max_runs=10, max_output_bytes=64)
+        try:
+            error = await pool.run("raise ValueError('bad input')")
+            timeout = await pool.run("import time\ntime.sleep(5)")
+            truncated = await pool.run("print('x' * 100)")
+            killed = pool.counters.killed
+        finally:
+            await pool.close()
+
+        self.assertEqual(error.status, "error")
+        self.assertIn("ValueError: bad input", error.error)
+        self.assertEqual(timeout.status, "timeout")
+        self.assertEqual(killed, 1)
+        self.assertEqual((truncated.status, truncated.output, truncated.truncated), ("ok", "x" * 64, True))
+
+    async def test_jobs_do_not_see_the_server_environment_or_directory(self):
+        pool = make_pool()
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "sk-test-secret"}):
+            try:
+                result = await pool.run("import os\nprint(dict(os.environ))\nprint(os.getcwd())")
+                directory = next(iter(pool._workers)).directory
+            finally:
+                await pool.close()
+
+        self.assertEqual(result.status, "ok")
+        self.assertNotIn("OPENAI_API_KEY", result.output)
+        self.assertNotIn("sk-test-secret", result.output)
+        self.assertIn(str(directory), result.output)
+        self.assertNotIn(str(Path(__file__).resolve().parent.parent), result.output)
+        self.assertFalse(directory.exists())
+
+    async def test_a_failed_start_is_rolled_back_and_retried(self):
+        pool = make_pool(workers=2, user="no_such_user_xyz")
+        try:
+            for _ in range(2):
+                with self.assertRaises(LookupError):
+                    await asyncio.wait_for(pool.run("x = 1"), 5)
+                self.assertFalse(pool.started)
+                self.assertEqual(pool.stats()["workers"], 0)
+        finally:
+            await pool.close()
+
+    async def test_runs_fail_instead_of_waiting_when_no_worker_can_be_replaced(self):
+        pool = make_pool(max_runs=10)
+        try:
+            await pool.start()
+            with mock.patch.object(pool, "_spawn", side_effect=OSError("cannot start")):
+                timeout, waiting = await asyncio.wait_for(asyncio.gather(
+                    pool.run("import time\ntime.sleep(5)"), pool.run("x = 1"), return_exceptions=True,
+                ), 5)
+                self.assertFalse(pool.started)
+                with self.assertRaises(OSError):
+                    await asyncio.wait_for(pool.run("x = 1"), 5)
+        finally:
+            await pool.close()
+
+        self.assertEqual(timeout.status, "timeout")
+        self.assertIsInstance(waiting, WorkerExited)
+
+    def test_extracts_python_blocks_only(self):
+        content = "Let me check:\n```python\nprint(1)\n```\n```js\nlet a\n```\n```py\n\n```\n```py\nprint(2)\n```"
+        self.assertEqual(extract_code_blocks(content, 5), ["print(1)\n", "print(2)\n"])
+        self.assertEqual(extract_code_blocks(content, 1), ["print(1)\n"])
+
+
+@unittest.skipIf(SandboxPool is None, SKIP_REASON or "sandbox unavailable")
+class ToolExecutionNodeTests(unittest.IsolatedAsyncioTestCase):
+    async def test_code_blocks_of_tool_users_run_and_their_output_joins_the_conversation(self):
+        graph = ConversationGraph()
+        events = []
+
+        async def record(event):
+            events.append(event)
+
+        graph.add_event_callback(record, ["tool_call", "tool_output", "tool_result"])
+        response = AIMessage(
+            content="Quick check:\n```python\nprint(6 * 7)\n```",
+            additional_kwargs={"participant": "Alice", "finish_reason": "stop", "model": "fake-model"},
+        )
+        state = {
+            "messages": [HumanMessage(content="Let's discuss: arithmetic"), response],
+            "participants": ["Alice"],
+            "current_speaker": "Alice",
+            "turn_count": 1,
+            "conversation_active": True,
+            "human_input_pending": False,
+            "conversation_paused": False,
+            "topic": "arithmetic",
+            "preferred_next_speaker": None,
+            "preferred_bias_remaining": 0,
+            "round_robin_pointer": 0,
+        }
+        graph.current_state = state
+        participant = CompiledParticipant(
+            name="Alice", provider="openai", model="fake-model", prompt_prefix=(),
+            temperature=0.3, max_tokens=250, llm=SimpleNamespace(), tools=("python",),
+        )
+        pool = make_pool()
+
+        try:
+            with mock.patch.object(conversation_graph_module, "sandbox_pool", pool), \
+                    mock.patch.object(conversation_graph_module.participant_registry, "compiled", return_value=participant):
+                self.assertEqual(graph._route_after_ai_response(state), "tool_execution")
+                result = await graph._execute_tools(dict(state))
+                self.assertEqual(graph._route_after_ai_response(result), "human_check")
+        finally:
+            await pool.close()
+
+        output = result["messages"][-1]
+        self.assertEqual([event.type for event in events], ["tool_call", "tool_output", "tool_result"])
+        self.assertEqual(events[0]["data"]["args"], {"code": "print(6 * 7)\n"})
+        self.assertEqual(events[2]["data"]["status"], "ok")
+        self.assertIn("42", output.content)
+        self.assertEqual(output.additional_kwargs["participant"], "Sandbox")
+        self.assertEqual(output.additional_kwargs["tool_call_id"], events[0]["data"]["tool_call_id"])
+        self.assertEqual(result["turn_count"], 1)
+
+    def test_participants_without_the_tool_skip_execution(self):
+        graph = ConversationGraph()
+        response = AIMessage(
+            content="```python\nprint(1)\n```",
+            additional_kwargs={"participant": "Bob", "finish_reason": "stop"},
+        )
+        participant = CompiledParticipant(
+            name="Bob", provider="openai", model="fake-model", prompt_prefix=(),
+            temperature=0.3, max_tokens=250, llm=SimpleNamespace(),
+        )
+        with mock.patch.object(conversation_graph_module.participant_registry, "compiled", return_value=participant):
+            self.assertEqual(graph._route_after_ai_response({"messages": [response]}), "human_check")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+SKIP_REASON = None
+
+try:
+    from backend.participant_registry import CompiledParticipant
+    from backend.slo_controller import GenerationController, ModelThroughput, SLOConfig
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    GenerationController = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+
+class BindableLLM:
+    def __init__(self, bound=None):
+        self.bound = bound or {}
+
+    def bind(self, **kwargs):
+        return BindableLLM({**self.bound, **kwargs})
+
+
+def participant(max_tokens=250):
+    return CompiledParticipant(
+        name="Alice", provider="openai", model="gpt", prompt_prefix=(),
+        temperature=0.3, max_tokens=max_tokens, llm=BindableLLM(),
+    )
+
+
+@unittest.skipIf(GenerationController is None, SKIP_REASON or "controller unavailable")
+class GenerationControllerTests(unittest.TestCase):
+    def test_turn_budget_follows_observed_throughput(self):
+        throughput = ModelThroughput()
+        throughput.observe("openai:gpt", tokens=90, first_token_seconds=1.0, total_seconds=10.0)
+        controller = GenerationController(15, SLOConfig(turn_latency_seconds=6.0, min_turn_tokens=16), throughput)
+
+        plan = controller.plan_turn(participant())
+        limited = controller.apply(participant(), plan)
+
+        self.assertEqual(plan.max_tokens, 50)
+        self.assertEqual(limited.max_tokens, 50)
+        self.assertEqual(limited.llm.bound, {"max_tokens": 50})
+        self.assertEqual(controller.describe_plan(participant(), plan)["configured_max_tokens"], 250)
+
+    def test_unadjusted_plans_keep_the_compiled_participant(self):
+        controller = GenerationController(15, SLOConfig(turn_latency_seconds=6.0), ModelThroughput())
+        original = participant()
+
+        self.assertIs(controller.apply(original, controller.plan_turn(original)), original)
+
+    def test_token_budget_lowers_turn_cap(self):
+        controller = GenerationController(15, SLOConfig(conversation_tokens=300), ModelThroughput())
+        controller.start()
+
+        decision = controller.record_turn(1, "openai:gpt", "x" * 400, 0.5, 2.0, completed=True)
+
+        self.assertEqual(decision["kind"], "turn_cap")
+        self.assertEqual(controller.turn_cap, 3)
+        self.assertIsNone(controller.record_turn(2, "openai:gpt", "x" * 400, 0.5, 2.0, completed=True))
+        self.assertEqual(len(controller.decisions), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+SKIP_REASON = None
+
+try:
+    from langchain_core.messages import AIMessage, HumanMessage
+    from backend import conversation_graph as conversation_graph_module
+    from backend import executor as executor_module
+    from backend.participant_registry import CompiledParticipant
+    # MessageLog as the spill module sees it (flat import)
+    from backend.spill import MemoryMeter, MessageLog, SpillConfig, SpillStore
+    from backend.admission import AdmissionConfig, AdmissionController
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    executor_module = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+
+class ScriptedLLM:
+    async def astream(self, messages):
+        for word in ("Spill ", "me"):
+            await asyncio.sleep(0.01)
+            yield SimpleNamespace(content=word)
+
+
+async def _discard(event):
+    return None
+
+
+@unittest.skipIf(executor_module is None, SKIP_REASON or "spill unavailable")
+class MemoryMeterTests(unittest.TestCase):
+    def test_branches_are_charged_for_their_suffix_only(self):
+        meter = MemoryMeter()
+        parent = MessageLog([HumanMessage(content="topic"), AIMessage(content="x" * 1000)])
+        branch = parent.fork(2) + [AIMessage(content="branch reply")]
+
+        parent_memory = meter.measure("root", parent)
+        branch_memory = meter.measure("root.b1", branch)
+
+        self.assertEqual(branch_memory["messages"], 3)
+        self.assertEqual(branch_memory["shared_messages"], 2)
+        self.assertLess(branch_memory["bytes"], parent_memory["bytes"])
+        self.assertGreater(meter.measure("root", parent + [AIMessage(content="more")])["bytes"], parent_memory["bytes"])
+
+
+@unittest.skipIf(executor_module is None, SKIP_REASON or "spill unavailable")
+class SpillTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = SpillStore(Path(self.directory.name))
+        participant = CompiledParticipant(
+            name="Alice", provider="openai", model="m", prompt_prefix=(),
+            temperature=0.1, max_tokens=50, llm=ScriptedLLM(),
+        )
+        patches = [
+            mock.patch.object(conversation_graph_module.participant_registry, "compiled", return_value=participant),
+            mock.patch.object(executor_module.transcript_store, "persist"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.host = executor_module.ConversationHost(
+            _discard, SpillConfig(idle_seconds=0.01, interval_seconds=60), self.store
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self.host.close()
+        self.directory.cleanup()
+
+    async def wait_until(self, condition):
+        for _ in range(200):
+            if condition():
+                return
+            await asyncio.sleep(0.01)
+        self.fail("condition not reached")
+
+    def message_count(self, conversation_id):
+        state = self.host.graphs[conversation_id].current_state
+        return len(state["messages"]) if state else 0
+
+    async def test_paused_conversation_is_spilled_and_resumes_after_rehydration(self):
+        await self.host.start("abc", "Spilling", ["Alice", "Bob"])
+        await self.wait_until(lambda: self.message_count("abc") >= 2)
+        await self.host.pause("abc")
+        await self.wait_until(lambda: self.host.graphs["abc"].waiting_for_resume)
+        messages_before = self.message_count("abc")
+        await asyncio.sleep(0.02)
+
+        self.assertEqual(await self.host.sweep(), ["abc"])
+        self.assertNotIn("abc", self.host.graphs)
+        self.assertTrue((Path(self.directory.name) / "abc.json").exists())
+
+        # Status is served from the spill record without rehydrating
+        status = await self.host.status("abc")
+        self.assertTrue(status["paused"])
+        self.assertFalse(status["memory"]["resident"])
+        self.assertEqual(status["memory"]["messages"], messages_before)
+        self.assertNotIn("abc", self.host.graphs)
+
+        self.assertTrue(await self.host.resume("abc"))
+        self.assertFalse((Path(self.directory.name) / "abc.json").exists())
+        await self.wait_until(lambda: self.message_count("abc") > messages_before)
+
+        report = await self.host.memory_report()
+        self.assertEqual(report["resident_conversations"], 1)
+        self.assertGreater(report["conversations"]["abc"]["bytes"], 0)
+        self.assertTrue(await self.host.stop("abc"))
+
+    async def test_spilled_conversation_gives_up_its_admission_slot_until_resumed(self):
+        controller = AdmissionController(AdmissionConfig(max_conversations=1, shed_lag_seconds=0))
+        await self.host.close()
+        self.host = executor_module.ConversationHost(
+            controller.handle_event, SpillConfig(idle_seconds=0.01, interval_seconds=60), self.store
+        )
+        await controller.admit("abc")
+        await self.host.start("abc", "Spilling", ["Alice", "Bob"])
+        await self.wait_until(lambda: self.message_count("abc") >= 2)
+        await self.host.pause("abc")
+        await self.wait_until(lambda: self.host.graphs["abc"].waiting_for_resume)
+        await asyncio.sleep(0.02)
+
+        self.assertEqual(await self.host.sweep(), ["abc"])
+        self.assertNotIn("abc", controller.running)
+        self.assertFalse((await controller.admit("next", wait=False))["queued"])
+
+        self.assertTrue(await self.host.resume("abc"))
+        self.assertEqual(set(controller.running), {"abc", "next"})
+        self.assertTrue(await self.host.stop("abc"))
+        self.assertEqual(set(controller.running), {"next"})
+
+    async def test_running_conversation_is_not_spilled(self):
+        await self.host.start("busy", "Streaming", ["Alice"])
+        await asyncio.sleep(0.02)
+
+        self.assertEqual(await self.host.sweep(), [])
+        self.assertIn("busy", self.host.graphs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+SKIP_REASON = None
+
+try:
+    from langchain_core.messages import AIMessage, HumanMessage
+    from backend import conversation_graph as conversation_graph_module
+    from backend.conversation_graph import ConversationGraph
+    from backend.participant_registry import CompiledParticipant
+    from backend.topic_drift import ConversationDrift
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    ConversationDrift = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+TOPIC = "The ethics of artificial intelligence in healthcare"
+ON_TOPIC = "Artificial intelligence in healthcare raises ethics questions about patient consent."
+OFF_TOPIC = "My favourite pizza topping is pineapple and I go surfing on weekends."
+
+
+@unittest.skipIf(ConversationDrift is None, SKIP_REASON or "topic drift unavailable")
+class ConversationDriftTests(unittest.TestCase):
+    def test_off_topic_responses_drift_further(self):
+        drift = ConversationDrift(TOPIC)
+        on_topic = drift.observe(ON_TOPIC)
+        off_topic = drift.observe(OFF_TOPIC)
+
+        self.assertLess(on_topic["drift"], off_topic["drift"])
+        self.assertIsNone(on_topic["novelty"])
+        self.assertGreater(off_topic["centroid_drift"], on_topic["centroid_drift"])
+        self.assertEqual(off_topic["responses"], 2)
+
+    def test_history_replay_matches_incremental_scoring(self):
+        incremental = ConversationDrift(TOPIC)
+        for text in (ON_TOPIC, OFF_TOPIC):
+            incremental.observe(text)
+        history = [HumanMessage(content="Let's discuss"), AIMessage(content=ON_TOPIC), AIMessage(content=OFF_TOPIC)]
+        replayed = ConversationDrift.from_history(TOPIC, history)
+
+        self.assertEqual(replayed.observe(ON_TOPIC), incremental.observe(ON_TOPIC))
+
+    def test_text_without_content_words_has_no_score(self):
+        self.assertIsNone(ConversationDrift(TOPIC).observe("and the of")["drift"])
+
+
+@unittest.skipIf(ConversationDrift is None, SKIP_REASON or "topic drift unavailable")
+class GraphDriftTests(unittest.IsolatedAsyncioTestCase):
+    async def test_scores_are_streamed_and_stored_with_the_message(self):
+        class ScriptedLLM:
+            async def astream(self, messages):
+                yield SimpleNamespace(content=OFF_TOPIC)
+
+        graph = ConversationGraph()
+        events = []
+
+        async def record(event):
+            events.append(event)
+
+        graph.add_event_callback(record, ["topic_drift"])
+        graph.topic_drift = ConversationDrift(TOPIC)
+        state = {
+            "messages": [HumanMessage(content=f"Let's discuss: {TOPIC}")],
+            "participants": ["Alice"],
+            "current_speaker": "Alice",
+            "turn_count": 0,
+            "conversation_active": True,
+            "human_input_pending": False,
+            "conversation_paused": False,
+            "topic": TOPIC,
+            "preferred_next_speaker": None,
+            "preferred_bias_remaining": 0,
+            "round_robin_pointer": 0,
+        }
+        graph.current_state = state
+        participant = CompiledParticipant(
+            name="Alice", provider="openai", model="fake-model", prompt_prefix=(),
+            temperature=0.3, max_tokens=250, llm=ScriptedLLM(),
+        )
+
+        with mock.patch.object(conversation_graph_module.participant_registry, "compiled", return_value=participant):
+            result = await graph._generate_ai_response(dict(state))
+
+        stored = result["messages"][-1].additional_kwargs["topic_drift"]
+        self.assertEqual([event.type for event in events], ["topic_drift"])
+        self.assertEqual(events[0]["data"]["drift"], stored["drift"])
+        self.assertEqual(events[0]["data"]["turn"], 1)
+        self.assertGreater(stored["drift"], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
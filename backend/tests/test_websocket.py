@@ -0,0 +1,71 @@
+import json
+import unittest
+
+SKIP_REASON = None
+
+try:
+    import ormsgpack
+    from fastapi.testclient import TestClient
+    from backend import main as main_module
+    from backend.events import TextDelta
+except ModuleNotFoundError as exc:  # pragma: no cover - executed only when deps missing
+    main_module = None  # type: ignore
+    SKIP_REASON = f"Required dependency missing: {exc}"
+
+
+@unittest.skipIf(main_module is None, SKIP_REASON or "API unavailable")
+class ConversationWebSocketTests(unittest.TestCase):
+    def test_json_control_commands_reply_in_band(self):
+        with TestClient(main_module.app) as client:
+            with client.websocket_connect("/conversation/ws", subprotocols=["conversaition.json"]) as websocket:
+                self.assertEqual(websocket.accepted_subprotocol, "conversaition.json")
+
+                websocket.send_text(json.dumps({"op": "pause", "id": 7, "conversation_id": "missing"}))
+                reply = json.loads(websocket.receive_text())
+
+                self.assertEqual(reply["type"], "control-result")
+                self.assertEqual(reply["data"]["id"], 7)
+                self.assertFalse(reply["data"]["ok"])
+
+                websocket.send_text("not json")
+                self.assertEqual(json.loads(websocket.receive_text())["data"]["status"], 400)
+
+    def test_msgpack_clients_receive_broadcast_events(self):
+        with TestClient(main_module.app) as client:
+            with client.websocket_connect("/conversation/ws", subprotocols=["conversaition.msgpack"]) as websocket:
+                websocket.send_bytes(ormsgpack.packb({"op": "status", "id": 1}))
+                status = ormsgpack.unpackb(websocket.receive_bytes())
+                self.assertTrue(status["data"]["ok"])
+
+                client.portal.call(main_module.conversation_streamer.handle_langgraph_event, {
+                    "type": "human_message_added",
+                    "data": {"content": "Hello"},
+                })
+                event = ormsgpack.unpackb(websocket.receive_bytes())
+
+                self.assertEqual(event, {"type": "user-message", "data": {"content": "Hello"}})
+
+    def test_scoped_clients_receive_only_their_conversation(self):
+        def delta(conversation_id, content):
+            event = TextDelta("Alice", content, 0.0)
+            event.conversation_id = conversation_id
+            return event
+
+        with TestClient(main_module.app) as client:
+            with client.websocket_connect("/conversation/ws?conversation_id=c1",
+                                          subprotocols=["conversaition.msgpack"]) as websocket:
+                self.assertEqual(main_module.admission_controller.subscribers.get("c1"), 1)
+                client.portal.call(main_module.conversation_streamer.handle_langgraph_event, delta("c2", "other"))
+                client.portal.call(main_module.conversation_streamer.handle_langgraph_event, delta("c1", "mine"))
+                event = ormsgpack.unpackb(websocket.receive_bytes())
+
+                self.assertEqual(event, {
+                    "type": "text-delta",
+                    "conversation_id": "c1",
+                    "data": {"textDelta": "mine", "participant": "Alice"},
+                })
+            self.assertIsNone(main_module.admission_controller.subscribers.get("c1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Incremental Topic Drift
+
+Scores how far each AI response strays from the conversation topic, locally
+and without re-embedding history:
+- a hashing vectorizer (signed feature hashing of word unigrams into a fixed
+  number of buckets) with sublinear term frequency, so no vocabulary is kept
+- smoothed IDF from a running per-conversation document frequency over the
+  hashed buckets; the topic counts as the first document
+- a running centroid of response vectors, updated in place
+
+Scoring a response touches only its own buckets plus a few fixed-size NumPy
+vector operations, so it costs O(message length) however long the
+conversation is. Scores are cosine distances in [0, 1] (0 = on topic):
+- drift: this response against the topic
+- centroid_drift: the conversation so far (running centroid) against the topic
+- novelty: this response against the centroid of the earlier responses
+
+Configuration (environment):
+- TOPIC_DRIFT_DIMENSIONS: number of hash buckets
+- TOPIC_DRIFT_THRESHOLD: centroid_drift above which a conversation is flagged off topic
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from langchain_core.messages import BaseMessage
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9']*")
+
+# Function words carry no topic signal and would dominate short messages
+STOP_WORDS = frozenset("""
+a an and are as at be but by can could do does for from had has have he her his i if in into is it its
+just let me more my no not of on or our really she so some than that the their them then there these they
+this to us was we were what when which who will with would you your
+""".split())
+
+DRIFT_DIMENSIONS = int(os.getenv("TOPIC_DRIFT_DIMENSIONS", "4096"))
+DRIFT_THRESHOLD = float(os.getenv("TOPIC_DRIFT_THRESHOLD", "0.85"))
+
+
+def hashed_terms(text: str, dimensions: int = DRIFT_DIMENSIONS) -> Tuple[np.ndarray, np.ndarray]:
+    """(bucket indices, signed sublinear term frequencies) of the text's content words"""
+    counts: Counter = Counter()
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOP_WORDS or len(token) < 2:
+            continue
+        digest = zlib.crc32(token.encode("utf-8"))
+        # The top bit picks the sign so colliding words tend to cancel rather than add up
+        counts[(digest & 0x7FFFFFFF) % dimensions] += -1 if digest & 0x80000000 else 1
+
+    buckets = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    frequencies = np.fromiter(
+        (math.copysign(1 + math.log(abs(count)), count) if count else 0.0 for count in counts.values()),
+        dtype=np.float64,
+        count=len(counts),
+    )
+    return buckets, frequencies
+
+
+def _cosine_distance(a: np.ndarray, b: np.ndarray) -> Optional[float]:
+    norms = np.linalg.norm(a) * np.linalg.norm(b)
+    if norms == 0:
+        return None
+    return round(float(np.clip(1 - np.dot(a, b) / norms, 0.0, 1.0)), 4)
+
+
+class ConversationDrift:
+    """Topic vector, document frequencies and response centroid of one conversation."""
+
+    def __init__(self, topic: str, dimensions: int = DRIFT_DIMENSIONS, threshold: float = DRIFT_THRESHOLD) -> None:
+        self.dimensions = dimensions
+        self.threshold = threshold
+        self.documents = 0
+        self.document_frequency = np.zeros(dimensions, dtype=np.int32)
+        self.centroid_sum = np.zeros(dimensions, dtype=np.float64)
+        self.responses = 0
+        self.topic = self._vectorize(*self._count(topic))
+
+    @classmethod
+    def from_history(cls, topic: str, messages: Iterable[BaseMessage]) -> "ConversationDrift":
+        """Rebuild from existing AI responses (branch start or rehydration; scores are discarded)"""
+        drift = cls(topic)
+        for message in messages:
+            if message.type == "ai" and message.content:
+                drift.observe(message.content)
+        return drift
+
+    def _count(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        buckets, frequencies = hashed_terms(text, self.dimensions)
+        self.documents += 1
+        self.document_frequency[buckets] += 1
+        return buckets, frequencies
+
+    def _vectorize(self, buckets: np.ndarray, frequencies: np.ndarray) -> np.ndarray:
+        # Smoothed IDF as of now; earlier vectors keep the weights they were scored with
+        idf = np.log((1 + self.documents) / (1 + self.document_frequency[buckets])) + 1
+        vector = np.zeros(self.dimensions, dtype=np.float64)
+        vector[buckets] = frequencies * idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def observe(self, text: str) -> Dict[str, Any]:
+        """Score one completed response and fold it into the centroid"""
+        vector = self._vectorize(*self._count(text))
+        novelty = _cosine_distance(vector, self.centroid_sum) if self.responses else None
+
+        self.centroid_sum += vector
+        self.responses += 1
+        centroid_drift = _cosine_distance(self.centroid_sum, self.topic)
+        return {
+            "drift": _cosine_distance(vector, self.topic),
+            "centroid_drift": centroid_drift,
+            "novelty": novelty,
+            "responses": self.responses,
+            "off_topic": centroid_drift is not None and centroid_drift > self.threshold,
+        }
@@ -21,6 +21,7 @@ export interface AdapterMetaState {
 
 export interface AISDKBaseEvent<TType extends string, TData = Record<string, unknown>> {
   type: TType;
+  conversation_id?: string;
   data: TData;
 }
 